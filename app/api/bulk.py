@@ -1,6 +1,8 @@
 """Bulk API endpoints."""
-from flask import Blueprint, request, jsonify
-from app.auth import require_api_key
+from collections import Counter
+from flask import Blueprint, current_app, g, request, jsonify
+from app.auth import enforce_admission, enforce_rate_limit, require_api_key
+from app.metrics import record_rows
 from app.services.lead_service import LeadService
 from app.services.validation import validate_lead_data
 
@@ -13,7 +15,11 @@ def bulk_upload():
     """
     Bulk upload leads via API.
     
-    Requires X-API-Key header for authentication.
+    Requires X-API-Key header for authentication. Every submitted row
+    counts toward the key's row quota; a key issued to a company can only
+    upload leads for that company. While the processing queue is over its
+    high-water marks nothing is created and the response is 503 (queue)
+    or 429 (company backlog) with Retry-After.
     
     Expected JSON payload:
     {
@@ -42,13 +48,22 @@ def bulk_upload():
     if not data['leads']:
         return jsonify({'error': 'Leads array cannot be empty'}), 400
     
+    limited = enforce_rate_limit(requests=0, rows=len(data['leads']))
+    if limited is not None:
+        return limited
+    
     # Validate all leads
     valid_leads = []
     invalid_leads = []
+    key_company_id = g.api_key['company_id']
     
     for idx, lead_data in enumerate(data['leads']):
         validation_result = validate_lead_data(lead_data)
         
+        other_company = key_company_id is not None and str(lead_data.get('company_id')) != str(key_company_id)
+        if validation_result.is_valid and other_company:
+            validation_result.add_error('company_id', 'company_id does not match the API key')
+        
         if validation_result.is_valid:
             valid_leads.append(lead_data)
         else:
@@ -58,6 +73,12 @@ def bulk_upload():
                 'errors': validation_result.errors
             })
     
+    if valid_leads:
+        overloaded = enforce_admission(Counter(int(lead_data['company_id']) for lead_data in valid_leads))
+        if overloaded is not None:
+            record_rows('bulk', invalid=len(invalid_leads), rejected=len(valid_leads))
+            return overloaded
+    
     # Create and enqueue valid leads
     if valid_leads:
         enqueue_results = LeadService.create_and_enqueue_leads(valid_leads)
@@ -69,6 +90,9 @@ def bulk_upload():
             'job_ids': []
         }
     
+    record_rows('bulk', created=enqueue_results['created'], invalid=len(invalid_leads),
+                failed=len(valid_leads) - enqueue_results['created'])
+    
     return jsonify({
         'message': 'Bulk upload processed',
         'summary': {
@@ -82,3 +106,49 @@ def bulk_upload():
         'invalid_leads': invalid_leads,
         'job_ids': enqueue_results['job_ids']
     }), 200
+
+
+@bulk_bp.route('/leads/status', methods=['POST'])
+@require_api_key
+def lead_statuses():
+    """
+    Look up the state of many jobs and leads in one request.
+    
+    Requires X-API-Key header for authentication.
+    
+    Expected JSON payload (either list may be omitted):
+    {
+        "job_ids": ["db-1", "db-2"],
+        "lead_ids": [1, 2]
+    }
+    
+    At most STATUS_LOOKUP_MAX_IDS IDs in total are accepted per request.
+    Keys issued to a company only see that company's jobs and leads.
+    
+    Returns:
+        JSON with per-job and per-lead states
+    """
+    if not request.is_json:
+        return jsonify({'error': 'Content-Type must be application/json'}), 400
+    
+    data = request.get_json()
+    job_ids = data.get('job_ids', [])
+    lead_ids = data.get('lead_ids', [])
+    
+    if not isinstance(job_ids, list) or not all(isinstance(job_id, str) for job_id in job_ids):
+        return jsonify({'error': '"job_ids" must be an array of strings'}), 400
+    if not isinstance(lead_ids, list) or not all(
+        isinstance(lead_id, int) and not isinstance(lead_id, bool) for lead_id in lead_ids
+    ):
+        return jsonify({'error': '"lead_ids" must be an array of integers'}), 400
+    if not job_ids and not lead_ids:
+        return jsonify({'error': 'Request must contain "job_ids" or "lead_ids"'}), 400
+    
+    max_ids = current_app.config['STATUS_LOOKUP_MAX_IDS']
+    if len(job_ids) + len(lead_ids) > max_ids:
+        return jsonify({'error': f'At most {max_ids} IDs per request'}), 400
+    
+    statuses = LeadService.get_statuses(list(dict.fromkeys(job_ids)), list(dict.fromkeys(lead_ids)),
+                                        company_id=g.api_key['company_id'])
+    
+    return jsonify(statuses), 200
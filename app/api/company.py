@@ -1,6 +1,9 @@
 """Company API endpoints."""
 from flask import Blueprint, request, jsonify
+from app.auth import key_company_mismatch, require_api_key
+from app.services.api_key_service import ApiKeyService
 from app.services.company_service import CompanyService
+from app.services.retention_service import RetentionService
 
 company_bp = Blueprint('company', __name__, url_prefix='/company')
 
@@ -20,7 +23,8 @@ def register():
     }
     
     Returns:
-        JSON response with company ID or error messages
+        JSON response with company ID and its first API key (only returned
+        here), or error messages
     """
     if not request.is_json:
         return jsonify({'error': 'Content-Type must be application/json'}), 400
@@ -32,8 +36,160 @@ def register():
     if errors:
         return jsonify({'errors': errors}), 400
     
+    _, api_key, _ = ApiKeyService.create_key(company.id, 'Default')
+    
     return jsonify({
         'message': 'Company registered successfully',
         'company_id': company.id,
-        'company': company.to_dict()
+        'company': company.to_dict(),
+        'api_key': api_key
     }), 201
+
+
+@company_bp.route('/search', methods=['GET'])
+def search():
+    """
+    Search companies by name prefix for typeahead pickers.
+    
+    Query parameters:
+        q: Name prefix, case-insensitive (empty lists companies alphabetically)
+        limit: Maximum results (default 10, max 50)
+        
+    Returns:
+        JSON with matching companies ordered by name
+    """
+    limit = request.args.get('limit', CompanyService.SEARCH_DEFAULT_LIMIT, type=int)
+    limit = max(1, min(limit, CompanyService.SEARCH_MAX_LIMIT))
+    
+    companies = CompanyService.search_companies(request.args.get('q', ''), limit)
+    
+    return jsonify({'companies': companies}), 200
+
+
+@company_bp.route('/<int:company_id>/retention', methods=['GET'])
+@require_api_key
+def get_retention(company_id: int):
+    """
+    Get a company's retention period.
+    
+    Requires X-API-Key header with one of the company's keys.
+    
+    Returns:
+        JSON with retention_days (0 keeps leads forever)
+    """
+    forbidden = key_company_mismatch(company_id)
+    if forbidden:
+        return forbidden
+    
+    if not CompanyService.get_company(company_id):
+        return jsonify({'error': 'Company not found'}), 404
+    
+    return jsonify({
+        'company_id': company_id,
+        'retention_days': RetentionService.get_retention_days(company_id)
+    }), 200
+
+
+@company_bp.route('/<int:company_id>/retention', methods=['PUT'])
+@require_api_key
+def set_retention(company_id: int):
+    """
+    Set a company's retention period.
+    
+    Requires X-API-Key header with one of the company's keys.
+    
+    Expected JSON payload:
+    {
+        "retention_days": 365
+    }
+    
+    Leads older than the period are moved to the archive tables by the
+    archive-data job; 0 keeps them in the hot tables forever.
+    
+    Returns:
+        JSON with the policy or error messages
+    """
+    forbidden = key_company_mismatch(company_id)
+    if forbidden:
+        return forbidden
+    
+    if not request.is_json:
+        return jsonify({'error': 'Content-Type must be application/json'}), 400
+    
+    policy, errors = RetentionService.set_policy(company_id, request.get_json())
+    
+    if errors:
+        status_code = 404 if 'company_id' in errors else 400
+        return jsonify({'errors': errors}), status_code
+    
+    return jsonify(policy.to_dict()), 200
+
+
+@company_bp.route('/<int:company_id>/api-keys', methods=['GET'])
+@require_api_key
+def list_api_keys(company_id: int):
+    """
+    List a company's API keys (without the keys themselves).
+    
+    Requires X-API-Key header with one of the company's keys.
+    
+    Returns:
+        JSON with the company's keys, newest first
+    """
+    forbidden = key_company_mismatch(company_id)
+    if forbidden:
+        return forbidden
+    
+    return jsonify({'api_keys': [api_key.to_dict() for api_key in ApiKeyService.list_keys(company_id)]}), 200
+
+
+@company_bp.route('/<int:company_id>/api-keys', methods=['POST'])
+@require_api_key
+def create_api_key(company_id: int):
+    """
+    Issue another API key for a company, e.g. one per integration.
+    
+    Requires X-API-Key header with one of the company's keys.
+    
+    Expected JSON payload (optional):
+    {
+        "name": "CRM sync"
+    }
+    
+    Returns:
+        JSON with the key (only returned here) and its details
+    """
+    forbidden = key_company_mismatch(company_id)
+    if forbidden:
+        return forbidden
+    
+    data = request.get_json(silent=True) or {}
+    api_key, key, errors = ApiKeyService.create_key(company_id, data.get('name'))
+    
+    if errors:
+        status_code = 404 if 'company_id' in errors else 400
+        return jsonify({'errors': errors}), status_code
+    
+    return jsonify({'api_key': key, **api_key.to_dict()}), 201
+
+
+@company_bp.route('/<int:company_id>/api-keys/<int:key_id>', methods=['DELETE'])
+@require_api_key
+def revoke_api_key(company_id: int, key_id: int):
+    """
+    Revoke one of a company's API keys.
+    
+    Requires X-API-Key header with one of the company's keys.
+    
+    Returns:
+        JSON with the revoked key's details
+    """
+    forbidden = key_company_mismatch(company_id)
+    if forbidden:
+        return forbidden
+    
+    api_key = ApiKeyService.revoke_key(company_id, key_id)
+    if not api_key:
+        return jsonify({'error': 'API key not found'}), 404
+    
+    return jsonify(api_key.to_dict()), 200
@@ -1,12 +1,97 @@
 """Dashboard API endpoints."""
-from flask import Blueprint, request, jsonify
-from datetime import datetime
+import zlib
+from typing import Optional
+from flask import Blueprint, Response, make_response, request, jsonify, stream_with_context
+from datetime import datetime, timedelta
+from app.auth import key_company_mismatch, require_api_key
+from app.pagination import clamp_limit, page_response
 from app.services.dashboard_service import DashboardService
-from app.services.company_service import CompanyService
+from app.services.event_service import EventService
+from app.services.export_service import ExportService
+from app.services.latency_service import LatencyService
+from app.services.lead_service import LeadService
+from app.services.logging_service import LoggingService
+from app.services.retention_service import RetentionService
+from app.services.rollup_service import RollupService
+from app.services.version_service import VersionService
+from app.services.counter_service import STATUSES
 
 dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/dashboard')
 
 
+def parse_date_filters():
+    """
+    Parse start_date and end_date query parameters.
+    
+    Returns:
+        Tuple of (filters, error_response); error_response is None on success
+    """
+    filters = {}
+    for field in ('start_date', 'end_date'):
+        if request.args.get(field):
+            try:
+                filters[field] = datetime.fromisoformat(request.args.get(field))
+            except ValueError:
+                return None, (jsonify({'error': f'Invalid {field} format. Use ISO format.'}), 400)
+    
+    return filters, None
+
+
+def conditional_dashboard(company_id: int, filters: dict, payload_key: Optional[str] = None):
+    """
+    Serve dashboard data with a weak ETag derived from the company's data version.
+    
+    A matching If-None-Match returns 304 after a single version lookup,
+    without computing statistics.
+    
+    Args:
+        company_id: The company ID
+        filters: Parsed date filters
+        payload_key: Key of the dashboard payload to return (whole payload if None)
+        
+    Returns:
+        Flask response
+    """
+    version = VersionService.get(company_id)
+    etag = f'{company_id}-{version}-{zlib.crc32(request.query_string):08x}'
+    
+    if request.if_none_match.contains_weak(etag):
+        response = make_response('', 304)
+        response.set_etag(etag, weak=True)
+        return response
+    
+    dashboard = DashboardService.get_dashboard(company_id, filters, version=version)
+    if not dashboard:
+        return jsonify({'error': 'Company not found'}), 404
+    
+    response = jsonify(dashboard[payload_key] if payload_key else dashboard)
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def parse_page_args(allow_status: bool = True):
+    """
+    Parse keyset pagination and filter query parameters.
+    
+    Returns:
+        Tuple of (filters, cursor, limit, error_response); error_response is None on success
+    """
+    filters, error = parse_date_filters()
+    if error:
+        return None, None, None, error
+    
+    status = request.args.get('status')
+    if status and allow_status:
+        if status not in STATUSES:
+            return None, None, None, (jsonify({'error': f"status must be one of: {', '.join(STATUSES)}"}), 400)
+        filters['status'] = status
+    
+    limit = clamp_limit(request.args.get('limit', type=int))
+    
+    return filters, request.args.get('cursor'), limit, None
+
+
 @dashboard_bp.route('/<int:company_id>', methods=['GET'])
 def get_dashboard(company_id: int):
     """
@@ -19,32 +104,32 @@ def get_dashboard(company_id: int):
     Returns:
         HTML dashboard (for now, returns JSON)
     """
-    # Verify company exists
-    company = CompanyService.get_company(company_id)
-    if not company:
-        return jsonify({'error': 'Company not found'}), 404
-    
     # Parse filters
-    filters = {}
-    if request.args.get('start_date'):
-        try:
-            filters['start_date'] = datetime.fromisoformat(request.args.get('start_date'))
-        except ValueError:
-            return jsonify({'error': 'Invalid start_date format. Use ISO format.'}), 400
+    filters, error = parse_date_filters()
+    if error:
+        return error
     
-    if request.args.get('end_date'):
-        try:
-            filters['end_date'] = datetime.fromisoformat(request.args.get('end_date'))
-        except ValueError:
-            return jsonify({'error': 'Invalid end_date format. Use ISO format.'}), 400
+    # Get company and statistics (cached, 304 if unchanged)
+    return conditional_dashboard(company_id, filters)
+
+
+@dashboard_bp.route('/<int:company_id>/events', methods=['GET'])
+def stream_events(company_id: int):
+    """
+    Stream live status counts for a company as Server-Sent Events.
     
-    # Get statistics
-    stats = DashboardService.get_company_stats(company_id, filters if filters else None)
+    Sends a 'snapshot' event with current counts, then a 'delta' event
+    ({lead_id, from, to, version}) for each later status change published
+    by workers.
     
-    return jsonify({
-        'company': company.to_dict(),
-        'statistics': stats
-    }), 200
+    Returns:
+        text/event-stream response
+    """
+    return Response(
+        stream_with_context(EventService.stream(company_id)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 
 @dashboard_bp.route('/api/<int:company_id>/stats', methods=['GET'])
@@ -59,26 +144,268 @@ def get_dashboard_stats(company_id: int):
     Returns:
         JSON with statistics
     """
-    # Verify company exists
-    company = CompanyService.get_company(company_id)
-    if not company:
-        return jsonify({'error': 'Company not found'}), 404
-    
     # Parse filters
-    filters = {}
-    if request.args.get('start_date'):
-        try:
-            filters['start_date'] = datetime.fromisoformat(request.args.get('start_date'))
-        except ValueError:
-            return jsonify({'error': 'Invalid start_date format. Use ISO format.'}), 400
-    
-    if request.args.get('end_date'):
-        try:
-            filters['end_date'] = datetime.fromisoformat(request.args.get('end_date'))
-        except ValueError:
-            return jsonify({'error': 'Invalid end_date format. Use ISO format.'}), 400
-    
-    # Get statistics
-    stats = DashboardService.get_company_stats(company_id, filters if filters else None)
-    
-    return jsonify(stats), 200
+    filters, error = parse_date_filters()
+    if error:
+        return error
+    
+    # Get statistics (cached, 304 if unchanged)
+    return conditional_dashboard(company_id, filters, 'statistics')
+
+
+@dashboard_bp.route('/api/companies', methods=['GET'])
+def get_company_summaries():
+    """
+    Get a page of companies with lead and status counts.
+    
+    Query parameters:
+    - page: Page number (default 1)
+    - per_page: Companies per page (default 20, max 100)
+    - sort: created_at, company_name, lead_count, success_count or failed_count
+    - order: asc or desc (default desc)
+    
+    Returns:
+        JSON with companies and pagination info
+    """
+    try:
+        summaries = DashboardService.get_company_summaries(
+            page=request.args.get('page', 1, type=int),
+            per_page=request.args.get('per_page', DashboardService.DEFAULT_PER_PAGE, type=int),
+            sort=request.args.get('sort', 'created_at'),
+            order=request.args.get('order', 'desc')
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    for company in summaries['companies']:
+        company['created_at'] = company['created_at'].isoformat() if company['created_at'] else None
+    
+    return jsonify(summaries), 200
+
+
+@dashboard_bp.route('/api/<int:company_id>/timeseries', methods=['GET'])
+def get_timeseries(company_id: int):
+    """
+    Get lead outcome buckets for charts.
+    
+    Query parameters:
+    - granularity: hour or day (default day)
+    - start_date: Range start (ISO format, default 30 days / 48 hours ago)
+    - end_date: Range end (ISO format, default now)
+    
+    Returns:
+        JSON with one bucket per hour or day
+    """
+    granularity = request.args.get('granularity', 'day')
+    
+    filters, error = parse_date_filters()
+    if error:
+        return error
+    
+    end_date = filters.get('end_date', datetime.utcnow())
+    default_span = timedelta(hours=48) if granularity == 'hour' else timedelta(days=30)
+    start_date = filters.get('start_date', end_date - default_span)
+    
+    try:
+        buckets = RollupService.get_range(company_id, granularity, start_date, end_date)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'company_id': company_id,
+        'granularity': granularity,
+        'buckets': buckets
+    }), 200
+
+
+@dashboard_bp.route('/api/<int:company_id>/latency', methods=['GET'])
+def get_latency(company_id: int):
+    """
+    Get p50/p95/p99 processing latency, end to end and per stage.
+    
+    Stages: enqueue, queue_wait, setup (dequeue to first GHL call), ghl
+    (first call to last response, including retries), finalize and total
+    (lead created to finished). Values are in milliseconds.
+    
+    Query parameters:
+    - start_date: Range start (ISO format, default 7 days ago)
+    - end_date: Range end (ISO format, default now)
+    - status: Only leads that ended in success or failed
+    
+    Returns:
+        JSON with per-stage counts and percentiles
+    """
+    filters, error = parse_date_filters()
+    if error:
+        return error
+    
+    status = request.args.get('status')
+    if status is not None and status not in ('success', 'failed'):
+        return jsonify({'error': 'status must be success or failed'}), 400
+    
+    end_date = filters.get('end_date', datetime.utcnow())
+    start_date = filters.get('start_date', end_date - timedelta(days=7))
+    
+    latency = LatencyService.get_percentiles(company_id, start_date, end_date, status)
+    
+    return jsonify({
+        'company_id': company_id,
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'status': status,
+        **latency
+    }), 200
+
+
+@dashboard_bp.route('/api/<int:company_id>/logs', methods=['GET'])
+def get_logs(company_id: int):
+    """
+    Get a page of processing logs, newest first.
+    
+    Query parameters:
+    - status: Filter by status
+    - start_date: Filter by start date (ISO format)
+    - end_date: Filter by end date (ISO format)
+    - cursor: next_cursor from the previous page
+    - limit: Page size (default 50, max 500)
+    
+    Returns:
+        JSON with items and next_cursor
+    """
+    filters, cursor, limit, error = parse_page_args()
+    if error:
+        return error
+    
+    try:
+        logs, next_cursor = LoggingService.get_logs_page(company_id, filters, cursor, limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify(page_response(logs, next_cursor, limit)), 200
+
+
+@dashboard_bp.route('/api/<int:company_id>/leads', methods=['GET'])
+def get_leads(company_id: int):
+    """
+    Get a page of leads with their processing status, newest first.
+    
+    Query parameters:
+    - status: Filter by processing status
+    - start_date: Filter by start date (ISO format)
+    - end_date: Filter by end date (ISO format)
+    - cursor: next_cursor from the previous page
+    - limit: Page size (default 50, max 500)
+    
+    Returns:
+        JSON with items and next_cursor
+    """
+    filters, cursor, limit, error = parse_page_args()
+    if error:
+        return error
+    
+    try:
+        leads, next_cursor = LeadService.get_leads_page(company_id, filters, cursor, limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify(page_response(leads, next_cursor, limit)), 200
+
+
+@dashboard_bp.route('/api/<int:company_id>/failed', methods=['GET'])
+def get_failed_leads(company_id: int):
+    """
+    Get a page of failed leads with error messages, newest first.
+    
+    Query parameters:
+    - start_date: Filter by start date (ISO format)
+    - end_date: Filter by end date (ISO format)
+    - cursor: next_cursor from the previous page
+    - limit: Page size (default 50, max 500)
+    
+    Returns:
+        JSON with items and next_cursor
+    """
+    filters, cursor, limit, error = parse_page_args(allow_status=False)
+    if error:
+        return error
+    
+    try:
+        failed_leads, next_cursor = DashboardService.get_failed_leads_page(company_id, filters, cursor, limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify(page_response(failed_leads, next_cursor, limit)), 200
+
+
+@dashboard_bp.route('/api/<int:company_id>/archive/leads', methods=['GET'])
+def get_archived_leads(company_id: int):
+    """
+    Get a page of archived leads with their final status, newest first.
+    
+    Query parameters:
+    - cursor: next_cursor from the previous page
+    - limit: Page size (default 50, max 500)
+    
+    Returns:
+        JSON with items and next_cursor
+    """
+    limit = clamp_limit(request.args.get('limit', type=int))
+    
+    try:
+        leads, next_cursor = RetentionService.get_archived_leads_page(
+            company_id, request.args.get('cursor'), limit
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify(page_response(leads, next_cursor, limit)), 200
+
+
+@dashboard_bp.route('/api/<int:company_id>/export/<kind>', methods=['GET'])
+@require_api_key
+def export_history(company_id: int, kind: str):
+    """
+    Stream a company's full lead or log history as a download.
+    
+    Rows are read in keyset-paginated chunks and written straight to the
+    response, so memory use does not grow with the size of the export.
+    
+    Requires X-API-Key header with one of the company's keys.
+    
+    Query parameters:
+    - format: csv or ndjson (default csv)
+    - gzip: 1 to gzip the download
+    - status: Filter by status
+    - start_date: Filter by start date (ISO format)
+    - end_date: Filter by end date (ISO format)
+    
+    Returns:
+        Streamed CSV or NDJSON file
+    """
+    forbidden = key_company_mismatch(company_id)
+    if forbidden:
+        return forbidden
+    
+    filters, _, _, error = parse_page_args()
+    if error:
+        return error
+    
+    fmt = request.args.get('format', 'csv')
+    compress = request.args.get('gzip') == '1'
+    
+    try:
+        chunks = ExportService.iter_export(kind, company_id, fmt, filters, compress)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    filename = f'company-{company_id}-{kind}.{fmt}'
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    if compress:
+        filename += '.gz'
+        mimetype = 'application/gzip'
+    
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
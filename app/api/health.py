@@ -1,7 +1,6 @@
 """Health check endpoints."""
 from flask import Blueprint, jsonify
-from app.extensions import db
-from app.queue import check_redis_health
+from app.services.health_service import HealthService
 
 health_bp = Blueprint('health', __name__)
 
@@ -15,28 +14,32 @@ def health_check():
     - Database connectivity
     - Redis connectivity (optional for testing)
     
+    Results come from a background prober (every HEALTH_PROBE_INTERVAL
+    seconds), so probing this endpoint does not touch the database or Redis.
+    
     Returns:
         JSON with health status
     """
-    health_status = {
-        'status': 'healthy',
-        'checks': {}
-    }
-    
-    # Check database
-    try:
-        db.session.execute(db.text('SELECT 1'))
-        health_status['checks']['database'] = 'healthy'
-    except Exception as e:
-        health_status['checks']['database'] = f'unhealthy: {str(e)}'
-        health_status['status'] = 'unhealthy'
-    
-    # Check Redis (optional - won't fail health check if unavailable)
-    if check_redis_health():
-        health_status['checks']['redis'] = 'healthy'
-    else:
-        health_status['checks']['redis'] = 'unavailable (optional for testing)'
+    health_status = HealthService.get_health()
     
     status_code = 200 if health_status['status'] == 'healthy' else 503
     
     return jsonify(health_status), status_code
+
+
+@health_bp.route('/ready', methods=['GET'])
+def readiness_check():
+    """
+    Readiness check endpoint.
+    
+    Reports database and Redis state plus the depth of the configured
+    queue backend, from the same cached probe as /health.
+    
+    Returns:
+        JSON with readiness status
+    """
+    readiness = HealthService.get_readiness()
+    
+    status_code = 200 if readiness['status'] == 'ready' else 503
+    
+    return jsonify(readiness), status_code
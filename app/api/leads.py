@@ -1,5 +1,7 @@
 """Lead API endpoints."""
 from flask import Blueprint, request, jsonify
+from app.auth import enforce_admission
+from app.metrics import record_rows
 from app.services.lead_service import LeadService
 from app.services.logging_service import LoggingService
 
@@ -20,13 +22,21 @@ def upload_single():
     }
     
     Returns:
-        JSON response with job ID or error messages
+        JSON response with job ID or error messages; 503 or 429 with
+        Retry-After while the processing queue is over its high-water marks
     """
     if not request.is_json:
         return jsonify({'error': 'Content-Type must be application/json'}), 400
     
     data = request.get_json()
     
+    try:
+        overloaded = enforce_admission({int(data.get('company_id')): 1})
+    except (TypeError, ValueError):
+        overloaded = None  # create_lead reports the invalid company_id
+    if overloaded is not None:
+        return overloaded
+    
     # Create lead
     lead, errors = LeadService.create_lead(data)
     
@@ -60,7 +70,8 @@ def upload_csv():
     - company_id: Company ID for all leads
     
     Returns:
-        JSON response with summary of uploaded leads
+        JSON response with summary of uploaded leads; 503 or 429 with
+        Retry-After while the processing queue is over its high-water marks
     """
     if 'file' not in request.files:
         return jsonify({'error': 'No file provided'}), 400
@@ -94,6 +105,12 @@ def upload_csv():
     if 'error' in parse_results:
         return jsonify({'error': parse_results['error']}), 400
     
+    if parse_results['valid']:
+        overloaded = enforce_admission({company_id: len(parse_results['valid'])})
+        if overloaded is not None:
+            record_rows('csv', invalid=len(parse_results['invalid']), rejected=len(parse_results['valid']))
+            return overloaded
+    
     # Create and enqueue valid leads
     if parse_results['valid']:
         enqueue_results = LeadService.create_and_enqueue_leads(parse_results['valid'])
@@ -105,6 +122,9 @@ def upload_csv():
             'job_ids': []
         }
     
+    record_rows('csv', created=enqueue_results['created'], invalid=len(parse_results['invalid']),
+                failed=len(parse_results['valid']) - enqueue_results['created'])
+    
     return jsonify({
         'message': 'CSV processed successfully',
         'summary': {
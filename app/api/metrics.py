@@ -0,0 +1,31 @@
+"""Prometheus metrics endpoint."""
+from flask import Blueprint, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from app.metrics import DEFERRED_JOBS, QUEUE_DEPTH, metrics_registry
+from app.queue import get_deferred_backend
+from app.services.admission_service import AdmissionService
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Prometheus metrics for this process, or for every process when
+    PROMETHEUS_MULTIPROC_DIR is set.
+    
+    Queue gauges are sampled at scrape time (queue depth comes from the
+    same short cache used by admission control).
+    
+    Returns:
+        Metrics in the Prometheus text format
+    """
+    depth = AdmissionService.queue_depth()
+    if depth is not None:
+        QUEUE_DEPTH.set(depth)
+    try:
+        DEFERRED_JOBS.set(get_deferred_backend().depth())
+    except Exception as e:
+        print(f"Could not count deferred jobs: {str(e)}")
+    
+    return Response(generate_latest(metrics_registry()), mimetype=CONTENT_TYPE_LATEST)
@@ -1,26 +1,67 @@
 """Web UI routes for forms."""
+from typing import Dict, Optional
 from flask import Blueprint, render_template, request, redirect, url_for
-from app.extensions import db
-from app.models import CompanyProfile, Lead, LeadProcessingLog
+from app.metrics import record_rows
+from app.services.admission_service import AdmissionService
+from app.services.api_key_service import ApiKeyService
 from app.services.company_service import CompanyService
 from app.services.lead_service import LeadService
 from app.services.logging_service import LoggingService
-from sqlalchemy import func
+from app.services.dashboard_service import DashboardService
+from app.services.fragment_service import FragmentService
 
 web_bp = Blueprint('web', __name__)
 
 
+def render_lead_form(template: str, **context):
+    """
+    Render a lead form with its company typeahead state.
+    
+    Companies are searched from the browser, so only the previously
+    selected company (if any) is loaded here.
+    
+    Args:
+        template: Template name
+        **context: Template context, including form_data
+        
+    Returns:
+        Rendered template
+    """
+    company_id = str((context.get('form_data') or {}).get('company_id') or '')
+    selected_company = CompanyService.get_company(int(company_id)) if company_id.isdigit() else None
+    
+    return render_template(template,
+                         has_companies=CompanyService.has_companies(),
+                         selected_company=selected_company,
+                         **context)
+
+
+def check_admission(company_id, count: int) -> Optional[Dict]:
+    """
+    Check whether leads submitted from a form should be queued for later.
+    
+    Forms never refuse leads for load: while the queue is over its
+    high-water marks they are saved and held in the deferred queue.
+    
+    Args:
+        company_id: Submitted company ID
+        count: Number of leads about to be enqueued
+        
+    Returns:
+        AdmissionService rejection (with retry_after) if the leads should be deferred, else None
+    """
+    try:
+        company_id = int(company_id)
+    except (TypeError, ValueError):
+        return None
+    return AdmissionService.check({company_id: count}) if count else None
+
+
 @web_bp.route('/')
 def index():
     """Home page."""
-    # Get stats
-    total_companies = db.session.query(CompanyProfile).count()
-    total_leads = db.session.query(Lead).count()
-    
-    stats = {
-        'total_companies': total_companies,
-        'total_leads': total_leads
-    }
+    # Get stats (cached, approximate for very large tables)
+    stats = DashboardService.get_global_counts()
     
     return render_template('index.html', stats=stats)
 
@@ -46,9 +87,13 @@ def register_company():
                                  errors=errors, 
                                  form_data=data)
         
+        # Issue the company's first API key (only shown on this page)
+        _, api_key, _ = ApiKeyService.create_key(company.id, 'Default')
+        
         return render_template('register_company.html', 
                              success=True, 
                              company_id=company.id,
+                             api_key=api_key,
                              form_data={})
     
     return render_template('register_company.html', form_data={})
@@ -57,17 +102,13 @@ def register_company():
 @web_bp.route('/add-lead', methods=['GET', 'POST'])
 def add_lead():
     """Add lead form - handles both single and CSV upload."""
-    # Get all companies for dropdown
-    companies = db.session.query(CompanyProfile).order_by(CompanyProfile.company_name).all()
-    
     if request.method == 'POST':
         upload_type = request.form.get('upload_type', 'single')
         
         if upload_type == 'csv':
             # Handle CSV upload
             if 'file' not in request.files:
-                return render_template('add_lead.html', 
-                                     companies=companies,
+                return render_lead_form('add_lead.html',
                                      error='No file uploaded',
                                      form_data={})
             
@@ -75,22 +116,19 @@ def add_lead():
             company_id = request.form.get('company_id')
             
             if file.filename == '':
-                return render_template('add_lead.html', 
-                                     companies=companies,
+                return render_lead_form('add_lead.html',
                                      error='No file selected',
                                      form_data={'company_id': company_id})
             
             if not file.filename.endswith('.csv'):
-                return render_template('add_lead.html', 
-                                     companies=companies,
+                return render_lead_form('add_lead.html',
                                      error='File must be a CSV',
                                      form_data={'company_id': company_id})
             
             try:
                 company_id = int(company_id)
             except (ValueError, TypeError):
-                return render_template('add_lead.html', 
-                                     companies=companies,
+                return render_lead_form('add_lead.html',
                                      error='Invalid company selected',
                                      form_data={})
             
@@ -98,38 +136,41 @@ def add_lead():
             try:
                 file_content = file.read().decode('utf-8')
             except Exception as e:
-                return render_template('add_lead.html', 
-                                     companies=companies,
+                return render_lead_form('add_lead.html',
                                      error=f'Failed to read file: {str(e)}',
                                      form_data={'company_id': company_id})
             
             parse_results = LeadService.parse_csv(file_content, company_id)
             
             if 'error' in parse_results:
-                return render_template('add_lead.html', 
-                                     companies=companies,
+                return render_lead_form('add_lead.html',
                                      error=parse_results['error'],
                                      form_data={'company_id': company_id})
             
-            # Create and enqueue valid leads
+            # Create and enqueue valid leads (held for later while the queue is full)
+            deferred = check_admission(company_id, len(parse_results['valid']))
             if parse_results['valid']:
-                enqueue_results = LeadService.create_and_enqueue_leads(parse_results['valid'])
+                enqueue_results = LeadService.create_and_enqueue_leads(parse_results['valid'],
+                                                                       defer=deferred is not None)
             else:
-                enqueue_results = {'created': 0, 'enqueued': 0, 'failed': 0}
+                enqueue_results = {'created': 0, 'enqueued': 0, 'deferred': 0, 'failed': 0}
+            record_rows('form_csv', created=enqueue_results['created'], invalid=len(parse_results['invalid']),
+                        failed=len(parse_results['valid']) - enqueue_results['created'])
             
             summary = {
                 'total_rows': parse_results['total'],
                 'valid_rows': len(parse_results['valid']),
                 'invalid_rows': len(parse_results['invalid']),
                 'leads_created': enqueue_results['created'],
-                'leads_enqueued': enqueue_results['enqueued']
+                'leads_enqueued': enqueue_results['enqueued'],
+                'leads_deferred': enqueue_results['deferred']
             }
             
-            return render_template('add_lead.html', 
-                                 companies=companies,
+            return render_lead_form('add_lead.html',
                                  success=True,
                                  success_message='CSV processed successfully!',
                                  summary=summary,
+                                 deferred=deferred,
                                  form_data={})
         
         else:
@@ -144,91 +185,66 @@ def add_lead():
             lead, errors = LeadService.create_lead(data)
             
             if errors:
-                return render_template('add_lead.html', 
-                                     companies=companies,
+                return render_lead_form('add_lead.html',
                                      errors=errors, 
                                      form_data=data)
             
+            # Checked before the pending log exists, so the lead is counted once
+            deferred = check_admission(lead.company_id, 1)
+            
             # Create log entry
             log = LoggingService.create_log(lead.id, lead.company_id)
             
-            # Try to enqueue
+            # Try to enqueue (held for later while the queue is full)
             try:
-                job_id = LeadService.enqueue_lead(lead)
+                job_id = LeadService.enqueue_lead(lead, defer=deferred is not None)
             except Exception as e:
                 print(f"Could not enqueue lead: {str(e)}")
             
-            return render_template('add_lead.html', 
-                                 companies=companies,
+            return render_lead_form('add_lead.html',
                                  success=True,
                                  success_message='Lead added successfully!',
                                  lead_id=lead.id,
+                                 deferred=deferred,
                                  form_data={})
     
-    return render_template('add_lead.html', companies=companies, form_data={})
+    return render_lead_form('add_lead.html', form_data={})
 
 
 @web_bp.route('/dashboard')
 @web_bp.route('/companies')
 def list_companies():
-    """Dashboard - List all companies with stats."""
-    # Get all companies
-    companies = db.session.query(CompanyProfile).order_by(CompanyProfile.created_at.desc()).all()
-    
-    # Add metrics for each company
-    for company in companies:
-        # Total leads uploaded
-        company.lead_count = db.session.query(Lead).filter_by(company_id=company.id).count()
-        
-        # Count by status
-        status_counts = db.session.query(
-            LeadProcessingLog.status,
-            func.count(LeadProcessingLog.id)
-        ).filter_by(company_id=company.id).group_by(LeadProcessingLog.status).all()
-        
-        company.pending_count = 0
-        company.processing_count = 0
-        company.success_count = 0
-        company.failed_count = 0
-        
-        for status, count in status_counts:
-            if status == 'pending':
-                company.pending_count = count
-            elif status == 'processing':
-                company.processing_count = count
-            elif status == 'success':
-                company.success_count = count
-            elif status == 'failed':
-                company.failed_count = count
-        
-        # Reactivated leads (success status)
-        # This represents leads that were successfully sent to GHL
-        
-        # Response rate (for now, calculate as success / total processed)
-        total_processed = company.success_count + company.failed_count
-        if total_processed > 0:
-            company.response_rate = round((company.success_count / total_processed) * 100, 1)
-        else:
-            company.response_rate = 0
-        
-        # Appointments set (placeholder - would come from GHL webhook data)
-        # For now, estimate as a percentage of successful leads
-        company.appointments_set = round(company.success_count * 0.3)  # Assume 30% conversion
+    """Dashboard - List companies with stats, paginated and sortable."""
+    sort = request.args.get('sort', 'created_at')
+    order = request.args.get('order', 'desc')
+    try:
+        summaries = DashboardService.get_company_summaries(
+            page=request.args.get('page', 1, type=int),
+            per_page=request.args.get('per_page', DashboardService.DEFAULT_PER_PAGE, type=int),
+            sort=sort,
+            order=order
+        )
+    except ValueError:
+        # Unknown sort/order - fall back to the default listing
+        sort, order = 'created_at', 'desc'
+        summaries = DashboardService.get_company_summaries()
     
-    return render_template('dashboard.html', companies=companies)
+    # Cards are cached per company data version; only changed companies are re-rendered
+    return render_template('dashboard.html',
+                         companies=summaries['companies'],
+                         cards=FragmentService.render_company_cards(summaries['companies']),
+                         pagination=summaries,
+                         sort=sort,
+                         order=order)
 
 
 @web_bp.route('/upload-csv', methods=['GET', 'POST'])
 def upload_csv():
     """CSV upload form."""
-    # Get all companies for dropdown
-    companies = db.session.query(CompanyProfile).order_by(CompanyProfile.company_name).all()
-    
     if request.method == 'POST':
         # Check if file was uploaded
         if 'file' not in request.files:
-            return render_template('upload_csv.html', 
-                                 companies=companies,
+            return render_lead_form('upload_csv.html',
                                  error='No file uploaded',
                                  form_data={})
         
@@ -236,22 +252,19 @@ def upload_csv():
         company_id = request.form.get('company_id')
         
         if file.filename == '':
-            return render_template('upload_csv.html', 
-                                 companies=companies,
+            return render_lead_form('upload_csv.html',
                                  error='No file selected',
                                  form_data={'company_id': company_id})
         
         if not file.filename.endswith('.csv'):
-            return render_template('upload_csv.html', 
-                                 companies=companies,
+            return render_lead_form('upload_csv.html',
                                  error='File must be a CSV',
                                  form_data={'company_id': company_id})
         
         try:
             company_id = int(company_id)
         except (ValueError, TypeError):
-            return render_template('upload_csv.html', 
-                                 companies=companies,
+            return render_lead_form('upload_csv.html',
                                  error='Invalid company selected',
                                  form_data={})
         
@@ -259,8 +272,7 @@ def upload_csv():
         try:
             file_content = file.read().decode('utf-8')
         except Exception as e:
-            return render_template('upload_csv.html', 
-                                 companies=companies,
+            return render_lead_form('upload_csv.html',
                                  error=f'Failed to read file: {str(e)}',
                                  form_data={'company_id': company_id})
         
@@ -268,38 +280,44 @@ def upload_csv():
         parse_results = LeadService.parse_csv(file_content, company_id)
         
         if 'error' in parse_results:
-            return render_template('upload_csv.html', 
-                                 companies=companies,
+            return render_lead_form('upload_csv.html',
                                  error=parse_results['error'],
                                  form_data={'company_id': company_id})
         
-        # Create and enqueue valid leads
+        # Create and enqueue valid leads (held for later while the queue is full)
+        deferred = check_admission(company_id, len(parse_results['valid']))
         if parse_results['valid']:
-            enqueue_results = LeadService.create_and_enqueue_leads(parse_results['valid'])
+            enqueue_results = LeadService.create_and_enqueue_leads(parse_results['valid'],
+                                                                   defer=deferred is not None)
         else:
             enqueue_results = {
                 'created': 0,
                 'enqueued': 0,
+                'deferred': 0,
                 'failed': 0,
                 'job_ids': []
             }
+        record_rows('form_csv', created=enqueue_results['created'], invalid=len(parse_results['invalid']),
+                    failed=len(parse_results['valid']) - enqueue_results['created'])
         
         summary = {
             'total_rows': parse_results['total'],
             'valid_rows': len(parse_results['valid']),
             'invalid_rows': len(parse_results['invalid']),
             'leads_created': enqueue_results['created'],
-            'leads_enqueued': enqueue_results['enqueued']
+            'leads_enqueued': enqueue_results['enqueued'],
+            'leads_deferred': enqueue_results['deferred'],
+            'company_id': company_id
         }
         
-        return render_template('upload_csv.html', 
-                             companies=companies,
+        return render_lead_form('upload_csv.html',
                              success=True,
                              summary=summary,
+                             deferred=deferred,
                              invalid_rows=parse_results['invalid'],
                              form_data={})
     
-    return render_template('upload_csv.html', companies=companies, form_data={})
+    return render_lead_form('upload_csv.html', form_data={})
 
 
 @web_bp.route('/download-sample-csv')
@@ -2,23 +2,84 @@
 import os
 from flask import Flask
 from config import config
-from app.extensions import db, migrate
+from app.extensions import db
 
 
-def create_app(config_name=None):
-    """Create and configure the Flask application."""
+ROLES = ('web', 'worker')
+
+
+def create_app(config_name=None, role=None):
+    """
+    Create and configure the Flask application.
+    
+    The worker role only sets up configuration, the database and models:
+    no blueprints, templates, static files or migration commands.
+    
+    Args:
+        config_name: Configuration name (defaults to FLASK_ENV)
+        role: 'web' or 'worker' (defaults to APP_ROLE, then 'web')
+        
+    Returns:
+        Flask application
+    """
     if config_name is None:
         config_name = os.getenv('FLASK_ENV', 'development')
+    if role is None:
+        role = os.getenv('APP_ROLE', 'web')
+    if role not in ROLES:
+        raise ValueError(f"role must be one of: {', '.join(ROLES)}")
     
-    app = Flask(__name__)
+    if role == 'web':
+        app = Flask(__name__)
+    else:
+        app = Flask(__name__, template_folder=None, static_folder=None)
     app.config.from_object(config[config_name])
+    app.config['APP_ROLE'] = role
     
     # Initialize extensions
     db.init_app(app)
-    migrate.init_app(app, db)
+    
+    # Time database statements in both roles
+    if app.config['METRICS_ENABLED']:
+        from app.metrics import register_db_metrics
+        register_db_metrics()
     
     # Import models to ensure they're registered with SQLAlchemy
-    from app.models import CompanyProfile, Lead, LeadProcessingLog
+    from app.models import (CompanyProfile, Lead, LeadProcessingLog, QueuedJob, CompanyStatusCounter,
+                            LeadOutcomeRollup, CompanyDataVersion, RetentionPolicy, ArchivedLead,
+                            ArchivedLeadProcessingLog, ApiKey)
+    
+    if role == 'web':
+        init_web(app)
+    
+    # Close replica sessions used for reporting reads
+    from app.db_utils import close_reporting_session
+    app.teardown_appcontext(close_reporting_session)
+    
+    # Create tables if they don't exist (development and tests); never on the read replica.
+    # Deployments run `flask create-tables` and `flask db upgrade` instead.
+    if app.config['AUTO_CREATE_TABLES']:
+        with app.app_context():
+            db.create_all(bind_key=None)
+    
+    return app
+
+
+def init_web(app):
+    """Register routes, templates, static assets, CLI commands and migrations (CLI only)."""
+    import click
+    from jinja2 import FileSystemBytecodeCache
+    
+    # Flask-Migrate (and Alembic) is only needed by `flask db` commands
+    if click.get_current_context(silent=True) is not None:
+        from flask_migrate import Migrate
+        Migrate(app, db)
+    
+    # Compiled templates are reused across processes and restarts
+    app.jinja_options = {
+        **app.jinja_options,
+        'bytecode_cache': FileSystemBytecodeCache(app.config['JINJA_BYTECODE_CACHE_DIR'])
+    }
     
     # Register blueprints
     from app.api.web import web_bp
@@ -35,8 +96,37 @@ def create_app(config_name=None):
     app.register_blueprint(dashboard_bp)
     app.register_blueprint(health_bp)
     
-    # Create tables if they don't exist (for development)
-    with app.app_context():
-        db.create_all()
+    # Opt-in request profiling; no hooks at all unless enabled
+    if app.config['PROFILE_TOKEN'] or app.config['PROFILE_SAMPLE_RATE']:
+        from app.profiling import register_profiling
+        register_profiling(app)
     
-    return app
+    # Request metrics and /metrics (registered first, so timings include compression)
+    if app.config['METRICS_ENABLED']:
+        from app.metrics import register_metrics
+        register_metrics(app)
+    
+    # Fingerprinted static assets and response compression
+    from app.assets import register_assets
+    from app.compression import register_compression
+    register_assets(app)
+    register_compression(app)
+    
+    # Register CLI commands
+    from app.cli import register_commands
+    register_commands(app)
+
+
+def warm_templates(app):
+    """
+    Compile every template once.
+    
+    Called in the gunicorn master when the app is preloaded, so forked
+    workers share compiled templates instead of each compiling them on
+    its first requests.
+    
+    Args:
+        app: Flask application (web role)
+    """
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
@@ -0,0 +1,168 @@
+"""Fingerprinted static assets with long-lived caching and precompressed variants."""
+import hashlib
+import os
+import threading
+from typing import Dict, Tuple
+from flask import current_app, request, url_for
+from app.compression import COMPRESSIBLE_MIMETYPES, ENCODING_SUFFIXES, available_encodings, choose_encoding, compress
+
+
+# Content hashes keyed by (path, mtime), so edited files get a new URL
+_fingerprints: Dict[Tuple[str, float], str] = {}
+
+# Compressed static file bodies keyed by (path, mtime, encoding)
+_variants: Dict[Tuple[str, float, str], bytes] = {}
+_variants_lock = threading.Lock()
+
+STATIC_MAX_AGE = 31536000  # one year; fingerprinted URLs change whenever the file does
+
+
+def fingerprint(filename: str) -> str:
+    """
+    Get a short content hash of a static file.
+    
+    Args:
+        filename: Path relative to the static folder
+        
+    Returns:
+        First 12 hex digits of the file's SHA-256
+    """
+    path = os.path.join(current_app.static_folder, filename)
+    key = (path, os.path.getmtime(path))
+    digest = _fingerprints.get(key)
+    if digest is None:
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:12]
+        _fingerprints[key] = digest
+    return digest
+
+
+def static_url(filename: str) -> str:
+    """
+    Build a fingerprinted URL for a static file (template global).
+    
+    Args:
+        filename: Path relative to the static folder
+        
+    Returns:
+        URL with the content hash as the v query parameter
+    """
+    return url_for('static', filename=filename, v=fingerprint(filename))
+
+
+def get_variant(path: str, encoding: str) -> bytes:
+    """
+    Get a compressed copy of a static file.
+    
+    A variant written by `flask compress-static` is used when it is at
+    least as new as the file; otherwise the file is compressed once at
+    the maximum level and kept in memory.
+    
+    Args:
+        path: Absolute path of the static file
+        encoding: 'br' or 'gzip'
+        
+    Returns:
+        Compressed file contents
+    """
+    mtime = os.path.getmtime(path)
+    key = (path, mtime, encoding)
+    data = _variants.get(key)
+    if data is not None:
+        return data
+    
+    with _variants_lock:
+        data = _variants.get(key)
+        if data is None:
+            variant_path = path + ENCODING_SUFFIXES[encoding]
+            if os.path.exists(variant_path) and os.path.getmtime(variant_path) >= mtime:
+                with open(variant_path, 'rb') as f:
+                    data = f.read()
+            else:
+                with open(path, 'rb') as f:
+                    data = compress(f.read(), encoding, maximum=True)
+            _variants[key] = data
+    
+    return data
+
+
+def serve_static_asset(response):
+    """
+    Add long-lived caching and compression to static file responses.
+    
+    Requests whose v parameter matches the file's current fingerprint are
+    cacheable for a year and marked immutable; compressible files are
+    sent from their precompressed variant.
+    
+    Args:
+        response: Flask response
+        
+    Returns:
+        The response, updated for static files
+    """
+    if request.endpoint != 'static' or response.status_code != 200:
+        return response
+    
+    filename = request.view_args.get('filename', '')
+    path = os.path.join(current_app.static_folder, filename)
+    
+    version = request.args.get('v')
+    if version and version == fingerprint(filename):
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = STATIC_MAX_AGE
+        response.cache_control.immutable = True
+    
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding()
+    if encoding is None:
+        return response
+    
+    response.direct_passthrough = False
+    response.set_data(get_variant(path, encoding))
+    response.headers['Content-Encoding'] = encoding
+    etag, _ = response.get_etag()
+    if etag:
+        response.set_etag(f'{etag}-{encoding}')
+        # send_file compared If-None-Match with the unsuffixed ETag; check again
+        response.make_conditional(request)
+    
+    return response
+
+
+def write_variants() -> int:
+    """
+    Write .gz (and .br when brotli is installed) files next to every
+    compressible static file.
+    
+    Returns:
+        Number of variant files written
+    """
+    import mimetypes
+    
+    written = 0
+    for root, _, files in os.walk(current_app.static_folder):
+        for name in files:
+            if name.endswith(tuple(ENCODING_SUFFIXES.values())):
+                continue
+            if mimetypes.guess_type(name)[0] not in COMPRESSIBLE_MIMETYPES:
+                continue
+            
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                data = f.read()
+            for encoding in available_encodings():
+                with open(path + ENCODING_SUFFIXES[encoding], 'wb') as f:
+                    f.write(compress(data, encoding, maximum=True))
+                written += 1
+    
+    return written
+
+
+def register_assets(app):
+    """Expose static_url to templates and serve static files with caching headers."""
+    app.add_template_global(static_url)
+    app.after_request(serve_static_asset)
@@ -1,49 +1,128 @@
-"""API authentication middleware."""
+"""API authentication, rate limiting and admission control middleware."""
 from functools import wraps
-from flask import request, jsonify, current_app
-import hashlib
+from typing import Dict, Optional
+from flask import request, jsonify, current_app, g
+from app.rate_limit import check_rate_limit
+from app.services.admission_service import AdmissionService
+from app.services.api_key_service import ApiKeyService
 
 
-def generate_api_key(company_id: int, salt: str) -> str:
+def verify_api_key(api_key: str) -> Optional[Dict]:
     """
-    Generate an API key for a company.
+    Verify an API key.
+    
+    Keys are checked against the hashed keys issued to companies. When
+    API_KEYS_ALLOW_UNREGISTERED is set (development and testing), any
+    other non-empty key is accepted without a company; it is still rate
+    limited under its own identity.
     
     Args:
-        company_id: The company ID
-        salt: Salt for hashing
+        api_key: The API key to verify
         
     Returns:
-        API key string
+        Principal dictionary for the key, or None if it is not valid
     """
-    data = f"{company_id}:{salt}"
-    return hashlib.sha256(data.encode()).hexdigest()
+    if not api_key:
+        return None
+    
+    principal = ApiKeyService.verify(api_key)
+    
+    if principal is None and current_app.config['API_KEYS_ALLOW_UNREGISTERED']:
+        principal = {
+            'key_id': None,
+            'company_id': None,
+            'identity': f'unregistered:{ApiKeyService.hash_key(api_key)[:16]}',
+            'requests_per_window': None,
+            'rows_per_window': None
+        }
+    
+    return principal
 
 
-def verify_api_key(api_key: str) -> bool:
+def enforce_rate_limit(requests: int = 1, rows: int = 0):
     """
-    Verify an API key.
+    Charge the current API key's request and row quotas.
     
-    For testing: accepts any non-empty API key
-    In production, you would store and validate against actual API keys in the database.
+    Per-key limits override RATE_LIMIT_REQUESTS and RATE_LIMIT_ROWS;
+    a limit of 0 is unlimited.
     
     Args:
-        api_key: The API key to verify
+        requests: Requests to charge
+        rows: Lead rows to charge
         
     Returns:
-        bool: True if valid, False otherwise
+        429 response with Retry-After if a quota is exhausted, else None
     """
-    # For testing: accept any non-empty string as valid API key
-    # In production, you would check against stored API keys in database
-    if not api_key or len(api_key) == 0:
-        return False
+    principal = g.api_key
+    limits = {
+        'requests': principal['requests_per_window'],
+        'rows': principal['rows_per_window']
+    }
+    if limits['requests'] is None:
+        limits['requests'] = current_app.config['RATE_LIMIT_REQUESTS']
+    if limits['rows'] is None:
+        limits['rows'] = current_app.config['RATE_LIMIT_ROWS']
+    
+    costs = {'requests': requests, 'rows': rows}
+    if not any(limits[quota] and costs[quota] for quota in costs):
+        return None
+    
+    exceeded = check_rate_limit(principal['identity'], limits, costs)
+    if exceeded is None:
+        return None
     
-    return True  # Accept any non-empty API key for testing
+    quota, retry_after = exceeded
+    response = jsonify({
+        'error': f"Rate limit exceeded: at most {limits[quota]} {quota} per "
+                 f"{current_app.config['RATE_LIMIT_WINDOW']} seconds",
+        'quota': quota,
+        'limit': limits[quota],
+        'retry_after': retry_after
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
+def enforce_admission(incoming: Dict[int, int]):
+    """
+    Refuse new leads while the processing queue is over its high-water marks.
+    
+    Args:
+        incoming: Dictionary of company ID to number of leads about to be enqueued
+        
+    Returns:
+        503 (queue full) or 429 (company backlog full) response with
+        Retry-After, else None
+    """
+    rejection = AdmissionService.check(incoming)
+    if rejection is None:
+        return None
+    
+    if rejection['scope'] == 'queue':
+        message = 'Lead processing queue is full'
+    else:
+        message = f"Company {rejection['company_id']} has too many leads waiting to be processed"
+    
+    response = jsonify({
+        'error': f"{message}, retry in {rejection['retry_after']} seconds",
+        'scope': rejection['scope'],
+        'depth': rejection['depth'],
+        'limit': rejection['limit'],
+        'retry_after': rejection['retry_after']
+    })
+    response.status_code = rejection['status_code']
+    response.headers['Retry-After'] = str(rejection['retry_after'])
+    return response
 
 
 def require_api_key(f):
     """
     Decorator to require API key authentication.
     
+    The verified key is available as g.api_key, and each call is charged
+    to the key's request quota.
+    
     Usage:
         @app.route('/api/endpoint')
         @require_api_key
@@ -57,9 +136,23 @@ def require_api_key(f):
         if not api_key:
             return jsonify({'error': 'API key is required'}), 401
         
-        if not verify_api_key(api_key):
+        principal = verify_api_key(api_key)
+        if not principal:
             return jsonify({'error': 'Invalid API key'}), 401
         
+        g.api_key = principal
+        
+        limited = enforce_rate_limit(requests=1)
+        if limited is not None:
+            return limited
+        
         return f(*args, **kwargs)
     
     return decorated_function
+
+
+def key_company_mismatch(company_id: int):
+    """Get a 403 response if the request's API key belongs to another company."""
+    if g.api_key['company_id'] is not None and g.api_key['company_id'] != company_id:
+        return jsonify({'error': 'API key does not belong to this company'}), 403
+    return None
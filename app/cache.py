@@ -0,0 +1,136 @@
+"""In-process caching helpers."""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key.
+    
+    While one caller computes a key, other callers for that key wait and
+    share its result (or exception) instead of repeating the work.
+    """
+    
+    class _Call:
+        def __init__(self):
+            self.event = threading.Event()
+            self.result = None
+            self.error = None
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+    
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn once per key among concurrent callers.
+        
+        Args:
+            key: Key identifying the computation
+            fn: Function computing the value
+            
+        Returns:
+            The value computed by fn
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._Call()
+                self._calls[key] = call
+        
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+
+class TTLCache:
+    """
+    Thread-safe in-process cache with per-entry TTL and LRU eviction.
+    
+    Misses computed through get_or_compute are coalesced with SingleFlight.
+    """
+    
+    _MISSING = object()
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a cached value, or default if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Cache a value for ttl seconds (defaults to the cache TTL)."""
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def delete(self, key: Hashable):
+        """Remove a cached value."""
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def clear(self):
+        """Remove all cached values."""
+        with self._lock:
+            self._data.clear()
+    
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """
+        Get a cached value, computing and caching it on a miss.
+        
+        Concurrent misses for the same key share one computation.
+        
+        Args:
+            key: Cache key
+            compute: Function computing the value
+            ttl: TTL in seconds (defaults to the cache TTL)
+            
+        Returns:
+            Cached or freshly computed value
+        """
+        value = self.get(key, self._MISSING)
+        if value is not self._MISSING:
+            return value
+        
+        def compute_and_store():
+            result = compute()
+            self.set(key, result, ttl)
+            return result
+        
+        return self._flight.do(key, compute_and_store)
@@ -0,0 +1,60 @@
+"""Flask CLI commands."""
+import click
+
+
+def register_commands(app):
+    """Register maintenance commands on the app's CLI."""
+    
+    @app.cli.command('create-tables')
+    def create_tables():
+        """Create missing tables on the primary database (run before `flask db upgrade`)."""
+        from app.extensions import db
+        db.create_all(bind_key=None)
+        click.echo("Tables created")
+    
+    @app.cli.command('reconcile-counters')
+    @click.option('--company-id', type=int, default=None, help='Only reconcile this company')
+    def reconcile_counters(company_id):
+        """Repair drift in per-company status counters."""
+        from app.jobs.reconcile_counters import reconcile_counters_job
+        reconcile_counters_job(company_id)
+    
+    @app.cli.command('rebuild-rollups')
+    @click.argument('company_id', type=int)
+    def rebuild_rollups(company_id):
+        """Rebuild a company's outcome rollups from its logs."""
+        from app.services.rollup_service import RollupService
+        replayed = RollupService.rebuild(company_id)
+        click.echo(f"Rebuilt rollups from {replayed} logs")
+    
+    @app.cli.command('archive-data')
+    @click.option('--company-id', type=int, default=None, help='Only apply this company\'s policy')
+    def archive_data(company_id):
+        """Archive leads and logs older than the retention period."""
+        from app.jobs.archive_data import archive_data_job
+        archive_data_job(company_id)
+    
+    @app.cli.command('create-api-key')
+    @click.argument('company_id', type=int)
+    @click.option('--name', default=None, help='Label for the key')
+    def create_api_key(company_id, name):
+        """Issue an API key for a company (printed once)."""
+        from app.services.api_key_service import ApiKeyService
+        api_key, key, errors = ApiKeyService.create_key(company_id, name)
+        if errors:
+            raise click.ClickException('; '.join(message for messages in errors.values() for message in messages))
+        click.echo(f"API key {api_key.id} for company {company_id}: {key}")
+    
+    @app.cli.command('release-deferred')
+    def release_deferred():
+        """Enqueue leads held back while the queue was full (workers also do this periodically)."""
+        from app.services.admission_service import AdmissionService
+        released = AdmissionService.release_deferred()
+        click.echo(f"Released {released} deferred jobs")
+    
+    @app.cli.command('compress-static')
+    def compress_static():
+        """Write precompressed .gz/.br variants of static files."""
+        from app.assets import write_variants
+        written = write_variants()
+        click.echo(f"Wrote {written} precompressed files")
@@ -0,0 +1,107 @@
+"""Response compression with gzip, and brotli when it is installed."""
+import gzip
+from typing import List, Optional
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+
+COMPRESSIBLE_MIMETYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript',
+    'application/javascript', 'application/json', 'image/svg+xml',
+}
+
+# File suffixes of precompressed variants
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+# Dynamic responses favour speed; precompressed assets are built once at the maximum level
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+
+
+def available_encodings() -> List[str]:
+    """Get the supported content encodings, most preferred first."""
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def choose_encoding() -> Optional[str]:
+    """
+    Pick the best content encoding the current request accepts.
+    
+    Returns:
+        'br', 'gzip' or None if the client accepts neither
+    """
+    if not request.headers.get('Accept-Encoding'):
+        return None
+    return request.accept_encodings.best_match(available_encodings())
+
+
+def compress(data: bytes, encoding: str, maximum: bool = False) -> bytes:
+    """
+    Compress bytes with a content encoding.
+    
+    Args:
+        data: Uncompressed bytes
+        encoding: 'br' or 'gzip'
+        maximum: Use the slowest, smallest setting (for assets compressed once)
+        
+    Returns:
+        Compressed bytes
+    """
+    if encoding == 'br':
+        return brotli.compress(data, quality=11 if maximum else BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=9 if maximum else GZIP_LEVEL, mtime=0)
+
+
+def compress_response(response):
+    """
+    Compress a buffered response body if the client accepts it.
+    
+    Streamed responses (exports, live events) and file passthroughs are
+    left alone, as are bodies smaller than COMPRESS_MIN_SIZE and types
+    that do not compress well.
+    
+    Args:
+        response: Flask response
+        
+    Returns:
+        The same response, compressed in place when worthwhile
+    """
+    if (not current_app.config['COMPRESS_RESPONSES']
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or not 200 <= response.status_code < 300
+            or response.direct_passthrough
+            or response.is_streamed
+            or 'Content-Encoding' in response.headers):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    
+    if response.content_length is not None and response.content_length < current_app.config['COMPRESS_MIN_SIZE']:
+        return response
+    
+    encoding = choose_encoding()
+    if encoding is None:
+        return response
+    
+    data = response.get_data()
+    if len(data) < current_app.config['COMPRESS_MIN_SIZE']:
+        return response
+    
+    response.set_data(compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    
+    # A strong ETag identifies exact bytes, so the compressed body needs its own
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f'{etag}-{encoding}')
+    
+    return response
+
+
+def register_compression(app):
+    """Compress eligible responses on the way out."""
+    app.after_request(compress_response)
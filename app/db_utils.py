@@ -0,0 +1,154 @@
+"""Database helpers shared by services."""
+from typing import Dict, Tuple
+from flask import current_app, g
+from sqlalchemy import func, text, update
+from sqlalchemy.orm import Session
+from app.cache import TTLCache
+from app.extensions import db
+
+
+REPLICA_BIND = 'replica'
+
+# Replay lag, or 0 once the replica has replayed everything it received
+REPLICA_LAG_SQL = text(
+    'SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+    'ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END'
+)
+
+# Whether the replica is reachable and fresh enough, keyed by replica URL
+_replica_status = TTLCache(maxsize=8)
+
+
+def upsert_increment(model, keys: Dict, increments: Dict):
+    """
+    Atomically add increments to a counter row, creating the row if missing.
+    
+    Uses INSERT ... ON CONFLICT DO UPDATE on PostgreSQL and SQLite so
+    concurrent writers never lose updates. The statement joins the current
+    transaction; the caller commits.
+    
+    Args:
+        model: Model class whose primary key columns are the keys
+        keys: Primary key values identifying the row
+        increments: Column name to amount to add
+    """
+    dialect = db.session.get_bind().dialect.name
+    
+    if dialect in ('postgresql', 'sqlite'):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        
+        stmt = insert(model).values(**keys, **increments)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={
+                column: getattr(model.__table__.c, column) + getattr(stmt.excluded, column)
+                for column in increments
+            }
+        )
+        db.session.execute(stmt)
+        return
+    
+    # Generic fallback: update in place, insert if the row does not exist yet
+    result = db.session.execute(
+        update(model)
+        .filter_by(**keys)
+        .values({column: getattr(model.__table__.c, column) + amount for column, amount in increments.items()})
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        db.session.add(model(**keys, **increments))
+        db.session.flush()
+
+
+def estimate_count(model, exact_below: int = 100000, session=None) -> Tuple[int, bool]:
+    """
+    Count a table's rows, using planner statistics for large tables.
+    
+    On PostgreSQL, pg_class.reltuples (maintained by VACUUM and ANALYZE)
+    is read instead of scanning the table once the estimate reaches
+    exact_below. Other databases and small tables get an exact count.
+    
+    Args:
+        model: Model class whose table to count
+        exact_below: Estimated size below which an exact count is run
+        session: Session to count with (defaults to db.session)
+        
+    Returns:
+        Tuple of (count, is_approximate)
+    """
+    session = session or db.session
+    if session.get_bind().dialect.name == 'postgresql':
+        estimate = session.execute(
+            text('SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)'),
+            {'table': model.__tablename__}
+        ).scalar()
+        # reltuples is -1 (or 0) until the table has been analyzed
+        if estimate is not None and estimate >= exact_below:
+            return int(estimate), True
+    
+    return session.query(func.count()).select_from(model).scalar(), False
+
+
+def replica_is_fresh() -> bool:
+    """
+    Check whether the replica bind is reachable and within REPLICA_MAX_LAG_SECONDS.
+    
+    The result is cached for REPLICA_CHECK_INTERVAL seconds. Replay lag
+    is measured on PostgreSQL; other databases are only checked for
+    reachability.
+    
+    Returns:
+        True if reporting reads may use the replica
+    """
+    engine = db.engines[REPLICA_BIND]
+    
+    def check():
+        try:
+            with engine.connect() as conn:
+                if engine.dialect.name == 'postgresql':
+                    lag = float(conn.execute(REPLICA_LAG_SQL).scalar() or 0)
+                else:
+                    conn.execute(text('SELECT 1'))
+                    lag = 0.0
+        except Exception as e:
+            print(f"Replica unavailable, reading from primary: {str(e)}")
+            return False
+        
+        if lag > current_app.config['REPLICA_MAX_LAG_SECONDS']:
+            print(f"Replica {lag:.1f}s behind, reading from primary")
+            return False
+        return True
+    
+    return _replica_status.get_or_compute(
+        str(engine.url), check, ttl=current_app.config['REPLICA_CHECK_INTERVAL']
+    )
+
+
+def reporting_session():
+    """
+    Get the session for reporting and listing reads.
+    
+    Returns a session on the replica bind when one is configured and
+    fresh, otherwise db.session. The choice is made once per app context,
+    so every read in a request sees the same database. Never use it for
+    writes or for reads that must see the caller's own writes.
+    
+    Returns:
+        SQLAlchemy session
+    """
+    if REPLICA_BIND not in current_app.config.get('SQLALCHEMY_BINDS', {}):
+        return db.session
+    
+    if 'reporting_session' not in g:
+        g.reporting_session = Session(bind=db.engines[REPLICA_BIND]) if replica_is_fresh() else db.session
+    return g.reporting_session
+
+
+def close_reporting_session(exception=None):
+    """Close the app context's replica session, if one was opened."""
+    session = g.pop('reporting_session', None)
+    if session is not None and session is not db.session:
+        session.close()
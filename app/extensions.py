@@ -1,6 +1,6 @@
 """Flask extensions initialization."""
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 
 db = SQLAlchemy()
-migrate = Migrate()
+
+# Flask-Migrate is set up by app.app.init_web when running under the flask CLI
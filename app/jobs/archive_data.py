@@ -0,0 +1,25 @@
+"""Background job for applying retention policies."""
+from typing import Optional
+from app.services.retention_service import RetentionService
+
+
+def archive_data_job(company_id: Optional[int] = None) -> int:
+    """
+    Move leads and logs older than each company's retention period into
+    the archive tables.
+    
+    Can be enqueued periodically on any queue backend, or run with
+    `flask archive-data`.
+    
+    Args:
+        company_id: Only apply this company's policy (all companies if None)
+        
+    Returns:
+        Number of leads archived
+    """
+    if company_id is not None:
+        archived = RetentionService.archive_company(company_id)
+    else:
+        archived = RetentionService.archive_all()
+    print(f"Archived {archived} leads")
+    return archived
@@ -1,32 +1,43 @@
 """Background job for processing leads."""
 import time
+from datetime import datetime
+from typing import Optional
 from app.extensions import db
+from app.metrics import GHL_RETRIES, JOB_DURATION, JOB_WAIT
 from app.models import Lead, CompanyProfile, LeadProcessingLog
+from app.profiling import profiled_job
 from app.services.ghl_service import GHLService
 from app.services.logging_service import LoggingService
 
 
-def process_lead_job(lead_id: int):
+@profiled_job
+def process_lead_job(lead_id: int, enqueued_at: Optional[float] = None):
     """
     Process a lead by sending it to GoHighLevel.
     
-    This function is executed by RQ workers in the background.
+    This function is executed by RQ workers in the background. Stage
+    timestamps are saved in the log's timeline with the status updates.
     
     Args:
         lead_id: The ID of the lead to process
+        enqueued_at: Epoch time the job was enqueued (None for jobs queued before timelines)
     """
     import os
     worker_id = os.getpid()  # Use process ID as worker identifier
+    job_started = time.perf_counter()
+    dequeued_at = datetime.utcnow()
     
     # Fetch lead and company profile
     lead = db.session.query(Lead).filter_by(id=lead_id).first()
     if not lead:
         print(f"Lead {lead_id} not found")
+        JOB_DURATION.labels(outcome='skipped').observe(time.perf_counter() - job_started)
         return
     
     company = db.session.query(CompanyProfile).filter_by(id=lead.company_id).first()
     if not company:
         print(f"Company {lead.company_id} not found for lead {lead_id}")
+        JOB_DURATION.labels(outcome='skipped').observe(time.perf_counter() - job_started)
         return
     
     # Get or create log
@@ -34,11 +45,17 @@ def process_lead_job(lead_id: int):
     if not log:
         log = LoggingService.create_log(lead_id, lead.company_id)
     
+    # Queue wait: from enqueue (or the pending log's creation) to the first start
+    enqueued = datetime.utcfromtimestamp(enqueued_at) if enqueued_at is not None else None
+    if log.status == 'pending':
+        JOB_WAIT.observe(max(0.0, (dequeued_at - (enqueued or log.created_at)).total_seconds()))
+    
     # Update log to processing status
     LoggingService.update_log_status(
         log.id,
         'processing',
-        worker_id=str(worker_id)
+        worker_id=str(worker_id),
+        timeline={'enqueued': enqueued, 'dequeued': dequeued_at}
     )
     
     # Initialize GHL service
@@ -50,23 +67,44 @@ def process_lead_job(lead_id: int):
     # Attempt to send to GHL with retries
     max_retries = 3
     retry_delays = [1, 2, 4]  # Exponential backoff
+    ghl_latency_ms = 0  # Total time spent in GHL calls across attempts
+    first_attempt_at = None
+    contact_created = False
     
     for attempt in range(max_retries):
+        call_started = time.monotonic()
+        if first_attempt_at is None:
+            first_attempt_at = datetime.utcnow()
         try:
             # Send to GHL
             response = ghl_service.create_contact(company.ghl_location_id, payload)
+            contact_created = True
+            ghl_latency_ms += int((time.monotonic() - call_started) * 1000)
+            ghl_response_at = datetime.utcnow()
             
             # Success - update log
             LoggingService.update_log_status(
                 log.id,
                 'success',
                 ghl_contact_id=response.get('contact', {}).get('id'),
-                attempt_count=attempt + 1
+                attempt_count=attempt + 1,
+                ghl_latency_ms=ghl_latency_ms,
+                timeline={'first_attempt': first_attempt_at, 'ghl_response': ghl_response_at,
+                          'completed': datetime.utcnow()}
             )
             print(f"Successfully processed lead {lead_id}")
+            JOB_DURATION.labels(outcome='success').observe(time.perf_counter() - job_started)
             return
             
         except Exception as e:
+            if contact_created:
+                # Saving the result failed; retrying would create the contact in GHL again
+                print(f"Lead {lead_id} was sent to GHL but its log could not be updated: {str(e)}")
+                JOB_DURATION.labels(outcome='failed').observe(time.perf_counter() - job_started)
+                raise
+            
+            ghl_latency_ms += int((time.monotonic() - call_started) * 1000)
+            ghl_response_at = datetime.utcnow()
             error_message = str(e)
             print(f"Attempt {attempt + 1} failed for lead {lead_id}: {error_message}")
             
@@ -76,12 +114,17 @@ def process_lead_job(lead_id: int):
                     log.id,
                     'failed',
                     error_message=error_message,
-                    attempt_count=attempt + 1
+                    attempt_count=attempt + 1,
+                    ghl_latency_ms=ghl_latency_ms,
+                    timeline={'first_attempt': first_attempt_at, 'ghl_response': ghl_response_at,
+                              'completed': datetime.utcnow()}
                 )
                 print(f"Failed to process lead {lead_id} after {max_retries} attempts")
+                JOB_DURATION.labels(outcome='failed').observe(time.perf_counter() - job_started)
                 return
             
             # Wait before retrying
+            GHL_RETRIES.inc()
             time.sleep(retry_delays[attempt])
             
             # Update attempt count
@@ -0,0 +1,21 @@
+"""Background job for repairing status counter drift."""
+from typing import Optional
+from app.services.counter_service import CounterService
+
+
+def reconcile_counters_job(company_id: Optional[int] = None) -> int:
+    """
+    Recompute per-company status counters from lead_processing_logs.
+    
+    Can be enqueued periodically on any queue backend, or run with
+    `flask reconcile-counters`.
+    
+    Args:
+        company_id: Only reconcile this company (all companies if None)
+        
+    Returns:
+        Number of counter rows corrected
+    """
+    corrected = CounterService.reconcile(company_id)
+    print(f"Reconciled status counters: {corrected} rows corrected")
+    return corrected
@@ -0,0 +1,150 @@
+"""Prometheus metrics for the web and worker roles.
+
+Metrics live in the default registry of each process. When the
+PROMETHEUS_MULTIPROC_DIR environment variable is set (before the app is
+imported), every process writes its samples to that directory and
+metrics_registry() aggregates them, so one scrape of /metrics covers all
+gunicorn workers.
+"""
+import os
+import time
+from flask import g, request
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, REGISTRY
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Time to handle a request, by route endpoint',
+    ['method', 'endpoint', 'status']
+)
+LEAD_ROWS = Counter(
+    'lead_rows_total', 'Lead rows received by the CSV and bulk upload paths',
+    ['source', 'result']  # result: created, invalid, failed, rejected (queue full)
+)
+QUEUE_DEPTH = Gauge(
+    'queue_depth', 'Jobs waiting on the configured queue backend',
+    multiprocess_mode='mostrecent'
+)
+DEFERRED_JOBS = Gauge(
+    'queue_deferred_jobs', 'Jobs held in the deferred queue until the queue drains',
+    multiprocess_mode='mostrecent'
+)
+JOB_WAIT = Histogram(
+    'job_wait_seconds', 'Time from a lead being queued to a worker starting it',
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600, 7200, 21600)
+)
+JOB_DURATION = Histogram(
+    'job_duration_seconds', 'Time to process a lead job, by outcome',
+    ['outcome'],  # success, failed, skipped
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+)
+GHL_LATENCY = Histogram(
+    'ghl_request_duration_seconds', 'GoHighLevel API call latency, by HTTP status',
+    ['status'],  # status code, or timeout / connection_error / error
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+GHL_RETRIES = Counter('ghl_retries_total', 'GoHighLevel calls retried after a failure')
+DB_QUERY_DURATION = Histogram(
+    'db_query_duration_seconds', 'Database statement execution time, by operation',
+    ['operation'],  # select, insert, update, delete, other
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+
+DB_OPERATIONS = ('select', 'insert', 'update', 'delete')
+
+_db_listeners_registered = False
+
+
+def metrics_registry():
+    """
+    Get the registry to expose.
+    
+    Returns:
+        A registry aggregating every process in multiprocess mode, else the default registry
+    """
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return REGISTRY
+    
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def record_rows(source: str, created: int = 0, invalid: int = 0, failed: int = 0, rejected: int = 0):
+    """
+    Count lead rows received by an upload path.
+    
+    Args:
+        source: Upload path ('bulk', 'csv' or 'form_csv')
+        created: Rows saved as leads
+        invalid: Rows rejected by validation
+        failed: Valid rows that could not be saved
+        rejected: Valid rows refused by admission control
+    """
+    for result, count in (('created', created), ('invalid', invalid), ('failed', failed), ('rejected', rejected)):
+        if count:
+            LEAD_ROWS.labels(source=source, result=result).inc(count)
+
+
+def start_request_timer():
+    """Remember when the request started."""
+    g.metrics_started = time.perf_counter()
+
+
+def observe_request(response):
+    """
+    Record the request latency under its route endpoint.
+    
+    Unrouted requests share one 'unmatched' label so stray URLs cannot
+    create new series.
+    
+    Args:
+        response: Flask response
+        
+    Returns:
+        The response, unchanged
+    """
+    started = g.pop('metrics_started', None)
+    if started is not None:
+        REQUEST_LATENCY.labels(
+            method=request.method,
+            endpoint=request.endpoint or 'unmatched',
+            status=response.status_code
+        ).observe(time.perf_counter() - started)
+    return response
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info['metrics_query_started'] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop('metrics_query_started', None)
+    if started is None:
+        return
+    operation = statement.lstrip()[:6].lower()
+    DB_QUERY_DURATION.labels(
+        operation=operation if operation in DB_OPERATIONS else 'other'
+    ).observe(time.perf_counter() - started)
+
+
+def register_db_metrics():
+    """Time every statement run by any SQLAlchemy engine (once per process)."""
+    global _db_listeners_registered
+    if _db_listeners_registered:
+        return
+    
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    _db_listeners_registered = True
+
+
+def register_metrics(app):
+    """Time requests (web role) and expose them on /metrics."""
+    from app.api.metrics import metrics_bp
+    
+    app.before_request(start_request_timer)
+    app.after_request(observe_request)
+    app.register_blueprint(metrics_bp)
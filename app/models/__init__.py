@@ -2,5 +2,15 @@
 from app.models.company import CompanyProfile
 from app.models.lead import Lead
 from app.models.log import LeadProcessingLog
+from app.models.job import QueuedJob
+from app.models.counter import CompanyStatusCounter
+from app.models.rollup import LeadOutcomeRollup
+from app.models.version import CompanyDataVersion
+from app.models.retention import RetentionPolicy
+from app.models.archive import ArchivedLead, ArchivedLeadProcessingLog
+from app.models.api_key import ApiKey
 
-__all__ = ['CompanyProfile', 'Lead', 'LeadProcessingLog']
+__all__ = [
+    'CompanyProfile', 'Lead', 'LeadProcessingLog', 'QueuedJob', 'CompanyStatusCounter', 'LeadOutcomeRollup',
+    'CompanyDataVersion', 'RetentionPolicy', 'ArchivedLead', 'ArchivedLeadProcessingLog', 'ApiKey'
+]
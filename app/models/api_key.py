@@ -0,0 +1,41 @@
+"""API key model."""
+from datetime import datetime
+from app.extensions import db
+
+
+class ApiKey(db.Model):
+    """
+    Model for a company's API key.
+    
+    Only an HMAC-SHA256 of the key is stored. The key's public prefix is
+    indexed so verification is a single lookup followed by a constant-time
+    hash comparison.
+    """
+    
+    __tablename__ = 'api_keys'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    company_id = db.Column(db.Integer, db.ForeignKey('company_profiles.id'), nullable=False, index=True)
+    name = db.Column(db.String(100), nullable=True)
+    prefix = db.Column(db.String(16), nullable=False, unique=True)
+    key_hash = db.Column(db.String(64), nullable=False)
+    requests_per_window = db.Column(db.Integer, nullable=True)  # None uses RATE_LIMIT_REQUESTS
+    rows_per_window = db.Column(db.Integer, nullable=True)  # None uses RATE_LIMIT_ROWS
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    revoked_at = db.Column(db.DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f'<ApiKey {self.prefix} company_id={self.company_id}>'
+    
+    def to_dict(self):
+        """Convert model to dictionary (never includes the key itself)."""
+        return {
+            'id': self.id,
+            'company_id': self.company_id,
+            'name': self.name,
+            'prefix': self.prefix,
+            'requests_per_window': self.requests_per_window,
+            'rows_per_window': self.rows_per_window,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'revoked_at': self.revoked_at.isoformat() if self.revoked_at else None
+        }
@@ -0,0 +1,81 @@
+"""Archive models for leads and logs moved out of the hot tables."""
+from datetime import datetime
+from app.extensions import db
+
+
+class ArchivedLead(db.Model):
+    """Model for leads archived by the retention policy."""
+    
+    __tablename__ = 'archived_leads'
+    
+    id = db.Column(db.Integer, primary_key=True)  # Same ID the lead had in leads
+    company_id = db.Column(db.Integer, db.ForeignKey('company_profiles.id'), nullable=False)
+    name = db.Column(db.String(100), nullable=False)
+    phone = db.Column(db.String(20), nullable=False)
+    notes = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    # Index for paging a company's archive
+    __table_args__ = (
+        db.Index('idx_archived_leads_company_created', 'company_id', 'created_at', 'id'),
+    )
+    
+    def __repr__(self):
+        return f'<ArchivedLead {self.name}>'
+    
+    def to_dict(self):
+        """Convert model to dictionary."""
+        return {
+            'id': self.id,
+            'company_id': self.company_id,
+            'name': self.name,
+            'phone': self.phone,
+            'notes': self.notes,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'archived_at': self.archived_at.isoformat() if self.archived_at else None
+        }
+
+
+class ArchivedLeadProcessingLog(db.Model):
+    """Model for processing logs archived with their lead."""
+    
+    __tablename__ = 'archived_lead_processing_logs'
+    
+    id = db.Column(db.Integer, primary_key=True)  # Same ID the log had in lead_processing_logs
+    lead_id = db.Column(db.Integer, nullable=False)
+    company_id = db.Column(db.Integer, db.ForeignKey('company_profiles.id'), nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    worker_id = db.Column(db.String(50), nullable=True)
+    ghl_contact_id = db.Column(db.String(100), nullable=True)
+    error_message = db.Column(db.Text, nullable=True)
+    attempt_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    # Indexes for paging a company's archive and for reconciliation
+    __table_args__ = (
+        db.Index('idx_archived_logs_company_created', 'company_id', 'created_at', 'id'),
+        db.Index('idx_archived_logs_company_status', 'company_id', 'status'),
+        db.Index('idx_archived_logs_lead', 'lead_id'),
+    )
+    
+    def __repr__(self):
+        return f'<ArchivedLeadProcessingLog lead_id={self.lead_id} status={self.status}>'
+    
+    def to_dict(self):
+        """Convert model to dictionary."""
+        return {
+            'id': self.id,
+            'lead_id': self.lead_id,
+            'company_id': self.company_id,
+            'status': self.status,
+            'worker_id': self.worker_id,
+            'ghl_contact_id': self.ghl_contact_id,
+            'error_message': self.error_message,
+            'attempt_count': self.attempt_count,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'archived_at': self.archived_at.isoformat() if self.archived_at else None
+        }
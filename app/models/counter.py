@@ -0,0 +1,29 @@
+"""Per-company status counter model."""
+from app.extensions import db
+
+
+class CompanyStatusCounter(db.Model):
+    """
+    Model for incrementally maintained lead status counts per company.
+    
+    Rows are updated in the same transaction as every log creation and
+    status transition, so dashboards can read counts without scanning
+    lead_processing_logs.
+    """
+    
+    __tablename__ = 'company_status_counters'
+    
+    company_id = db.Column(db.Integer, db.ForeignKey('company_profiles.id'), primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)  # pending, processing, success, failed
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<CompanyStatusCounter company_id={self.company_id} status={self.status} count={self.count}>'
+    
+    def to_dict(self):
+        """Convert model to dictionary."""
+        return {
+            'company_id': self.company_id,
+            'status': self.status,
+            'count': self.count
+        }
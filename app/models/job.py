@@ -0,0 +1,49 @@
+"""Database-backed queue job model."""
+from datetime import datetime
+from app.extensions import db
+
+
+class QueuedJob(db.Model):
+    """Model for jobs queued in the database queue backend."""
+
+    __tablename__ = 'queued_jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    queue_name = db.Column(db.String(50), nullable=False)
+    func_path = db.Column(db.String(200), nullable=False)  # e.g. app.jobs.process_lead.process_lead_job
+    args = db.Column(db.Text, nullable=False, default='[]')  # JSON encoded positional arguments
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, started, finished, failed
+    claimed_by = db.Column(db.String(100), nullable=True)
+    error_message = db.Column(db.Text, nullable=True)
+    enqueued_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    ended_at = db.Column(db.DateTime, nullable=True)
+
+    # Index for claiming the oldest queued jobs
+    __table_args__ = (
+        db.Index('idx_queued_jobs_claim', 'queue_name', 'status', 'id'),
+        db.Index('idx_queued_jobs_claimed_by', 'claimed_by'),
+    )
+
+    @property
+    def job_id(self) -> str:
+        """Public job ID returned to API clients."""
+        return f'db-{self.id}'
+
+    def __repr__(self):
+        return f'<QueuedJob {self.id} {self.func_path} status={self.status}>'
+
+    def to_dict(self):
+        """Convert model to dictionary."""
+        return {
+            'id': self.job_id,
+            'queue_name': self.queue_name,
+            'func_path': self.func_path,
+            'args': self.args,
+            'status': self.status,
+            'claimed_by': self.claimed_by,
+            'error_message': self.error_message,
+            'enqueued_at': self.enqueued_at.isoformat() if self.enqueued_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'ended_at': self.ended_at.isoformat() if self.ended_at else None
+        }
@@ -18,9 +18,10 @@ class Lead(db.Model):
     # Relationships
     logs = db.relationship('LeadProcessingLog', backref='lead', lazy=True, cascade='all, delete-orphan')
     
-    # Index for performance
+    # Indexes for performance
     __table_args__ = (
         db.Index('idx_leads_company', 'company_id'),
+        db.Index('idx_leads_company_created', 'company_id', 'created_at', 'id'),
     )
     
     def __repr__(self):
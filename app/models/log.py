@@ -4,7 +4,14 @@ from app.extensions import db
 
 
 class LeadProcessingLog(db.Model):
-    """Model for tracking lead processing status."""
+    """
+    Model for tracking lead processing status.
+    
+    The *_ms columns are a compact processing timeline: milliseconds after
+    created_at at which the job was enqueued, picked up by a worker, made
+    its first GHL call, got its last GHL response and finished. They are
+    not kept when logs are archived.
+    """
     
     __tablename__ = 'lead_processing_logs'
     
@@ -18,11 +25,19 @@ class LeadProcessingLog(db.Model):
     attempt_count = db.Column(db.Integer, nullable=False, default=0)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    enqueued_ms = db.Column(db.Integer, nullable=True)
+    dequeued_ms = db.Column(db.Integer, nullable=True)
+    first_attempt_ms = db.Column(db.Integer, nullable=True)
+    ghl_response_ms = db.Column(db.Integer, nullable=True)
+    completed_ms = db.Column(db.Integer, nullable=True)
     
     # Indexes for performance
     __table_args__ = (
         db.Index('idx_logs_company_status', 'company_id', 'status'),
         db.Index('idx_logs_status', 'status'),
+        db.Index('idx_logs_lead', 'lead_id'),
+        db.Index('idx_logs_company_created', 'company_id', 'created_at', 'id'),
+        db.Index('idx_logs_company_status_created', 'company_id', 'status', 'created_at', 'id'),
     )
     
     def __repr__(self):
@@ -40,5 +55,12 @@ class LeadProcessingLog(db.Model):
             'error_message': self.error_message,
             'attempt_count': self.attempt_count,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'timeline_ms': {
+                'enqueued': self.enqueued_ms,
+                'dequeued': self.dequeued_ms,
+                'first_attempt': self.first_attempt_ms,
+                'ghl_response': self.ghl_response_ms,
+                'completed': self.completed_ms
+            }
         }
@@ -0,0 +1,24 @@
+"""Retention policy model."""
+from datetime import datetime
+from app.extensions import db
+
+
+class RetentionPolicy(db.Model):
+    """Model for a company's lead retention period."""
+    
+    __tablename__ = 'retention_policies'
+    
+    company_id = db.Column(db.Integer, db.ForeignKey('company_profiles.id'), primary_key=True)
+    retention_days = db.Column(db.Integer, nullable=False)  # 0 keeps leads in the hot tables forever
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<RetentionPolicy company_id={self.company_id} retention_days={self.retention_days}>'
+    
+    def to_dict(self):
+        """Convert model to dictionary."""
+        return {
+            'company_id': self.company_id,
+            'retention_days': self.retention_days,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
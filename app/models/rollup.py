@@ -0,0 +1,40 @@
+"""Lead outcome rollup model."""
+from app.extensions import db
+
+
+class LeadOutcomeRollup(db.Model):
+    """
+    Model for hourly and daily lead outcome buckets per company.
+    
+    Each status column counts logs that entered that status during the
+    bucket. attempt_count and ghl_latency_ms are summed over logs that
+    finished (success or failed) in the bucket, so average GHL latency is
+    ghl_latency_ms / attempt_count.
+    """
+    
+    __tablename__ = 'lead_outcome_rollups'
+    
+    company_id = db.Column(db.Integer, db.ForeignKey('company_profiles.id'), primary_key=True)
+    granularity = db.Column(db.String(10), primary_key=True)  # hour, day
+    bucket_start = db.Column(db.DateTime, primary_key=True)
+    pending_count = db.Column(db.Integer, nullable=False, default=0)
+    processing_count = db.Column(db.Integer, nullable=False, default=0)
+    success_count = db.Column(db.Integer, nullable=False, default=0)
+    failed_count = db.Column(db.Integer, nullable=False, default=0)
+    attempt_count = db.Column(db.Integer, nullable=False, default=0)
+    ghl_latency_ms = db.Column(db.BigInteger, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<LeadOutcomeRollup company_id={self.company_id} {self.granularity} {self.bucket_start}>'
+    
+    def to_dict(self):
+        """Convert model to dictionary."""
+        return {
+            'bucket_start': self.bucket_start.isoformat() if self.bucket_start else None,
+            'pending': self.pending_count,
+            'processing': self.processing_count,
+            'success': self.success_count,
+            'failed': self.failed_count,
+            'attempts': self.attempt_count,
+            'avg_ghl_latency_ms': round(self.ghl_latency_ms / self.attempt_count, 1) if self.attempt_count else None
+        }
@@ -0,0 +1,27 @@
+"""Per-company data version model."""
+from app.extensions import db
+
+
+class CompanyDataVersion(db.Model):
+    """
+    Model for a per-company version number bumped on every data change.
+    
+    The version is incremented in the same transaction as any lead or log
+    change for the company, so an unchanged version means unchanged
+    dashboard data.
+    """
+    
+    __tablename__ = 'company_data_versions'
+    
+    company_id = db.Column(db.Integer, db.ForeignKey('company_profiles.id'), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<CompanyDataVersion company_id={self.company_id} version={self.version}>'
+    
+    def to_dict(self):
+        """Convert model to dictionary."""
+        return {
+            'company_id': self.company_id,
+            'version': self.version
+        }
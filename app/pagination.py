@@ -0,0 +1,104 @@
+"""Keyset (cursor) pagination helpers."""
+import base64
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import and_, or_
+
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """
+    Encode a (created_at, id) position as an opaque cursor string.
+    
+    Args:
+        created_at: created_at of the last row on the page
+        row_id: id of the last row on the page
+        
+    Returns:
+        URL-safe cursor string
+    """
+    payload = json.dumps([created_at.isoformat(), row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+    
+    Args:
+        cursor: Cursor string
+        
+    Returns:
+        Tuple of (created_at, id)
+        
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError, json.JSONDecodeError):
+        raise ValueError('Invalid cursor')
+
+
+def clamp_limit(limit: Optional[int]) -> int:
+    """Clamp a requested page size to 1..MAX_LIMIT (DEFAULT_LIMIT if None)."""
+    if limit is None:
+        return DEFAULT_LIMIT
+    return min(max(limit, 1), MAX_LIMIT)
+
+
+def keyset_page(query, created_at_column, id_column, cursor: Optional[str] = None,
+                limit: Optional[int] = None) -> Tuple[List, Optional[str]]:
+    """
+    Fetch one page of a query in (created_at, id) descending order.
+    
+    Instead of OFFSET, the page starts strictly after the cursor position,
+    so with an index ending in (created_at, id) every page is an index
+    range read of limit + 1 rows no matter how deep it is.
+    
+    Args:
+        query: Query selecting rows with created_at and id attributes
+        created_at_column: Column to order by first
+        id_column: Unique tiebreaker column
+        cursor: Cursor from the previous page (None for the first page)
+        limit: Page size (clamped to MAX_LIMIT)
+        
+    Returns:
+        Tuple of (rows, next_cursor); next_cursor is None on the last page
+        
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    limit = clamp_limit(limit)
+    
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        # Leading range on created_at keeps the predicate index-friendly
+        query = query.filter(and_(
+            created_at_column <= created_at,
+            or_(created_at_column < created_at, id_column < row_id)
+        ))
+    
+    rows = query.order_by(created_at_column.desc(), id_column.desc()).limit(limit + 1).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    
+    return rows, next_cursor
+
+
+def page_response(items: List[Dict], next_cursor: Optional[str], limit: int) -> Dict:
+    """Build the JSON body shared by keyset-paginated endpoints."""
+    return {
+        'items': items,
+        'next_cursor': next_cursor,
+        'limit': limit
+    }
@@ -0,0 +1,222 @@
+"""Opt-in sampling profiler for requests and jobs.
+
+A profiled request or job gets a background thread that samples its
+stack every PROFILE_INTERVAL seconds. The samples are written as folded
+stacks (one "frame;frame;frame count" line per distinct stack), which
+flamegraph.pl, speedscope and most flame graph viewers read directly.
+With memory profiling a tracemalloc snapshot is dumped next to it; load
+it with tracemalloc.Snapshot.load(path). Tracing allocations slows the
+profiled code down many times over, so keep memory profiles to single
+requests (X-Profile-Memory) rather than sampled traffic. tracemalloc is
+process-wide, so only one memory profile runs at a time (others get a
+stack profile only) and its snapshot also holds allocations made by
+other threads meanwhile.
+
+Request hooks are only registered when PROFILE_TOKEN or
+PROFILE_SAMPLE_RATE is set, so nothing runs per request otherwise.
+"""
+import glob
+import hmac
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from datetime import datetime
+from functools import wraps
+from flask import current_app, g, request
+
+
+PROFILE_SUFFIXES = ('.folded', '.tracemalloc')
+TRACEMALLOC_FRAMES = 10  # tracing cost grows with the frames kept per allocation
+
+# Held by the one profile currently tracing allocations
+_memory_lock = threading.Lock()
+
+
+def profile_dir() -> str:
+    """Get the directory profiles are written to (created on first use)."""
+    directory = current_app.config['PROFILE_DIR'] or os.path.join(tempfile.gettempdir(), 'lead-manager-profiles')
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+class StackSampler:
+    """Sample one thread's stack from a background thread."""
+    
+    def __init__(self, thread_id: int, interval: float, max_seconds: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.counts = Counter()
+        self._labels = {}  # code object -> frame label, so samples allocate little
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+    
+    def start(self):
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+    
+    def _run(self):
+        deadline = time.monotonic() + self.max_seconds
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                label = self._labels.get(code)
+                if label is None:
+                    label = self._labels[code] = f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+                stack.append(label)
+                frame = frame.f_back
+            if stack:
+                self.counts[';'.join(reversed(stack))] += 1
+    
+    def folded(self) -> str:
+        """Get the samples in folded stack format."""
+        return ''.join(f'{stack} {count}\n' for stack, count in self.counts.most_common())
+
+
+class Profile:
+    """One profiled request or job."""
+    
+    def __init__(self, kind: str, name: str, memory: bool = False):
+        config = current_app.config
+        safe_name = ''.join(char if char.isalnum() else '_' for char in name)[:60]
+        self.id = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{kind}-{safe_name}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.directory = profile_dir()
+        self.max_files = config['PROFILE_MAX_FILES']
+        self.memory = memory
+        self.memory_skipped = False
+        self._started_tracing = False
+        self.sampler = StackSampler(threading.get_ident(), config['PROFILE_INTERVAL'], config['PROFILE_MAX_SECONDS'])
+    
+    def start(self):
+        """Start sampling the current thread (and tracing allocations if requested and free)."""
+        if self.memory and not _memory_lock.acquire(blocking=False):
+            print(f"Profile {self.id}: another memory profile is running, profiling stacks only")
+            self.memory = False
+            self.memory_skipped = True
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self._started_tracing = True
+        self.sampler.start()
+    
+    def save(self):
+        """Stop profiling and write the profile files, then prune old ones."""
+        self.sampler.stop()
+        
+        try:
+            with open(os.path.join(self.directory, f'{self.id}.folded'), 'w') as f:
+                f.write(self.sampler.folded())
+            
+            if self.memory and tracemalloc.is_tracing():
+                snapshot = tracemalloc.take_snapshot().filter_traces([
+                    tracemalloc.Filter(False, __file__),
+                    tracemalloc.Filter(False, tracemalloc.__file__),
+                ])
+                snapshot.dump(os.path.join(self.directory, f'{self.id}.tracemalloc'))
+        except OSError as e:
+            print(f"Could not write profile {self.id}: {str(e)}")
+        finally:
+            if self._started_tracing:
+                tracemalloc.stop()
+            if self.memory:
+                _memory_lock.release()
+        
+        prune_profiles(self.directory, self.max_files)
+
+
+def prune_profiles(directory: str, max_files: int) -> int:
+    """
+    Delete the oldest profile files beyond max_files.
+    
+    Args:
+        directory: Profile directory
+        max_files: Number of files to keep
+        
+    Returns:
+        Number of files deleted
+    """
+    paths = [path for suffix in PROFILE_SUFFIXES for path in glob.glob(os.path.join(directory, f'*{suffix}'))]
+    if len(paths) <= max_files:
+        return 0
+    
+    deleted = 0
+    for path in sorted(paths, key=os.path.getmtime)[:len(paths) - max_files]:
+        try:
+            os.remove(path)
+            deleted += 1
+        except OSError:
+            pass  # already removed by another process
+    return deleted
+
+
+def start_request_profile():
+    """Profile this request if it carries the admin token or is sampled."""
+    config = current_app.config
+    token = request.headers.get('X-Profile-Token')
+    
+    if token and config['PROFILE_TOKEN'] and hmac.compare_digest(token, config['PROFILE_TOKEN']):
+        memory = request.headers.get('X-Profile-Memory') == '1'
+    elif config['PROFILE_SAMPLE_RATE'] and random.random() < config['PROFILE_SAMPLE_RATE']:
+        memory = config['PROFILE_MEMORY']
+    else:
+        return
+    
+    g.profile = Profile('request', request.endpoint or 'unmatched', memory=memory)
+    g.profile.start()
+
+
+def add_profile_header(response):
+    """Tell the client which profile the request was written to."""
+    profile = g.get('profile')
+    if profile is not None:
+        response.headers['X-Profile-Id'] = profile.id
+        if profile.memory_skipped:
+            response.headers['X-Profile-Memory'] = 'busy'
+    return response
+
+
+def save_request_profile(exception=None):
+    """Write the request's profile (also after errors)."""
+    profile = g.pop('profile', None)
+    if profile is not None:
+        profile.save()
+
+
+def register_profiling(app):
+    """Profile requests selected by PROFILE_TOKEN or PROFILE_SAMPLE_RATE."""
+    app.before_request(start_request_profile)
+    app.after_request(add_profile_header)
+    app.teardown_request(save_request_profile)
+
+
+def profiled_job(func):
+    """
+    Profile a sample of a job's runs (PROFILE_JOB_SAMPLE_RATE).
+    
+    Keeps the job's module and name, so queued references still resolve.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        config = current_app.config
+        rate = config['PROFILE_JOB_SAMPLE_RATE']
+        if not rate or random.random() >= rate:
+            return func(*args, **kwargs)
+        
+        profile = Profile('job', func.__name__, memory=config['PROFILE_MEMORY'])
+        profile.start()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.save()
+    
+    return wrapper
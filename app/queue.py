@@ -1,18 +1,68 @@
-"""Redis queue configuration."""
+"""Queue configuration and pluggable queue backends."""
+import atexit
+import importlib
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
 import redis
 from rq import Queue
+from rq.job import Job
 from flask import current_app
+from sqlalchemy import select, update
+from app.extensions import db
+
+
+_redis_pools = {}
+_redis_pools_lock = threading.Lock()
+
+
+def get_redis_pool(redis_url: str) -> redis.ConnectionPool:
+    """
+    Get the process-wide Redis connection pool for a URL.
+    
+    Only a connect timeout is set: a socket read timeout would cut off
+    the blocking dequeue used by RQ workers sharing the pool.
+    
+    Args:
+        redis_url: Redis URL
+        
+    Returns:
+        Redis ConnectionPool instance
+    """
+    pool = _redis_pools.get(redis_url)
+    if pool is None:
+        with _redis_pools_lock:
+            pool = _redis_pools.get(redis_url)
+            if pool is None:
+                pool = redis.ConnectionPool.from_url(
+                    redis_url,
+                    max_connections=current_app.config['REDIS_MAX_CONNECTIONS'],
+                    socket_connect_timeout=current_app.config['REDIS_CONNECT_TIMEOUT'],
+                    health_check_interval=30
+                )
+                _redis_pools[redis_url] = pool
+    return pool
 
 
 def get_redis_connection():
     """
     Get Redis connection from app config.
     
+    Connections come from a shared pool, so this is cheap to call.
+    
     Returns:
         Redis connection instance
     """
     redis_url = current_app.config['REDIS_URL']
-    return redis.from_url(redis_url)
+    return redis.Redis(connection_pool=get_redis_pool(redis_url))
 
 
 def get_queue():
@@ -41,3 +91,566 @@ def check_redis_health():
     except Exception as e:
         print(f"Redis health check failed: {str(e)}")
         return False
+
+
+def func_path(func: Callable) -> str:
+    """Return the importable dotted path of a job function."""
+    return f'{func.__module__}.{func.__name__}'
+
+
+def resolve_func(path: str) -> Callable:
+    """Import a job function from its dotted path."""
+    module_name, _, func_name = path.rpartition('.')
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+class QueueFullError(Exception):
+    """Raised when a queue backend cannot accept more jobs."""
+
+
+class QueueBackend(ABC):
+    """Base class for queue backends."""
+    
+    name = None
+    
+    @abstractmethod
+    def enqueue(self, func: Callable, *args) -> str:
+        """
+        Enqueue a job.
+        
+        Args:
+            func: Job function (must be importable by workers)
+            *args: Positional arguments for the job
+            
+        Returns:
+            Job ID
+        """
+    
+    @abstractmethod
+    def depth(self) -> int:
+        """Return the number of jobs waiting to be processed."""
+    
+    @abstractmethod
+    def fetch_many(self, job_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Look up several jobs with a single round trip.
+        
+        Args:
+            job_ids: Job IDs issued by this backend
+            
+        Returns:
+            Dictionary of job ID to {'status', 'args'} for jobs that exist
+        """
+
+
+class RQBackend(QueueBackend):
+    """Queue backend using Redis Queue."""
+    
+    name = 'rq'
+    
+    def enqueue(self, func: Callable, *args) -> str:
+        job = get_queue().enqueue(
+            func,
+            *args,
+            job_timeout=current_app.config['JOB_TIMEOUT'],
+            result_ttl=current_app.config['JOB_RESULT_TTL']
+        )
+        return job.id
+    
+    def depth(self) -> int:
+        return get_queue().count
+    
+    def fetch_many(self, job_ids: List[str]) -> Dict[str, Dict]:
+        # One pipelined HGETALL for all jobs
+        jobs = Job.fetch_many(job_ids, connection=get_redis_connection())
+        found = {}
+        for job in jobs:
+            if job is None:
+                continue
+            # Restored jobs hold the status as a plain string, new ones as a JobStatus
+            status = job.get_status(refresh=False)
+            found[job.id] = {'status': str(getattr(status, 'value', status) or 'unknown'), 'args': list(job.args)}
+        return found
+
+
+class DatabaseBackend(QueueBackend):
+    """
+    Queue backend storing jobs in the ``queued_jobs`` table.
+    
+    Workers claim jobs in batches. On PostgreSQL and MySQL claims use
+    ``SELECT ... FOR UPDATE SKIP LOCKED`` so concurrent workers never block
+    each other; on SQLite a single ``UPDATE`` statement claims the batch
+    atomically (SQLite serializes writers).
+    """
+    
+    name = 'database'
+    SKIP_LOCKED_DIALECTS = ('postgresql', 'mysql')
+    
+    def __init__(self, queue_name: Optional[str] = None):
+        self._queue_name = queue_name
+    
+    @property
+    def queue_name(self) -> str:
+        return self._queue_name or current_app.config['RQ_QUEUE_NAME']
+    
+    def enqueue(self, func: Callable, *args) -> str:
+        from app.models import QueuedJob
+        
+        job = QueuedJob(
+            queue_name=self.queue_name,
+            func_path=func_path(func),
+            args=json.dumps(list(args)),
+            status='queued'
+        )
+        
+        try:
+            db.session.add(job)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        
+        return job.job_id
+    
+    def depth(self) -> int:
+        from app.models import QueuedJob
+        
+        return db.session.query(QueuedJob).filter_by(
+            queue_name=self.queue_name,
+            status='queued'
+        ).count()
+    
+    def fetch_many(self, job_ids: List[str]) -> Dict[str, Dict]:
+        from app.models import QueuedJob
+        
+        ids = [int(job_id[len('db-'):]) for job_id in job_ids if job_id[len('db-'):].isdigit()]
+        if not ids:
+            return {}
+        
+        rows = db.session.query(QueuedJob.id, QueuedJob.status, QueuedJob.args).filter(QueuedJob.id.in_(ids)).all()
+        return {f'db-{job_id}': {'status': status, 'args': json.loads(args)} for job_id, status, args in rows}
+    
+    def claim(self, worker_id: str, batch_size: int) -> List:
+        """
+        Atomically claim up to batch_size queued jobs for a worker.
+        
+        Args:
+            worker_id: Identifier of the claiming worker
+            batch_size: Maximum number of jobs to claim
+            
+        Returns:
+            List of claimed QueuedJob instances (status 'started')
+        """
+        from app.models import QueuedJob
+        
+        now = datetime.utcnow()
+        
+        try:
+            if db.engine.dialect.name in self.SKIP_LOCKED_DIALECTS:
+                jobs = db.session.query(QueuedJob).filter_by(
+                    queue_name=self.queue_name,
+                    status='queued'
+                ).order_by(QueuedJob.id).limit(batch_size).with_for_update(skip_locked=True).all()
+                
+                for job in jobs:
+                    job.status = 'started'
+                    job.claimed_by = worker_id
+                    job.started_at = now
+                
+                db.session.commit()
+                return jobs
+            
+            # Single-statement claim; the claim token identifies this batch
+            claim_token = f'{worker_id}:{uuid.uuid4().hex[:12]}'
+            candidates = select(QueuedJob.id).where(
+                QueuedJob.queue_name == self.queue_name,
+                QueuedJob.status == 'queued'
+            ).order_by(QueuedJob.id).limit(batch_size)
+            
+            db.session.execute(
+                update(QueuedJob)
+                .where(QueuedJob.id.in_(candidates), QueuedJob.status == 'queued')
+                .values(status='started', claimed_by=claim_token, started_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            
+            return db.session.query(QueuedJob).filter_by(
+                claimed_by=claim_token
+            ).order_by(QueuedJob.id).all()
+        except Exception:
+            db.session.rollback()
+            raise
+    
+    def complete(self, job, error_message: Optional[str] = None):
+        """
+        Mark a claimed job as finished or failed.
+        
+        Args:
+            job: The claimed QueuedJob
+            error_message: Error message if the job failed
+        """
+        job.status = 'failed' if error_message else 'finished'
+        job.error_message = error_message
+        job.ended_at = datetime.utcnow()
+        db.session.commit()
+    
+    def requeue_stale(self, timeout_seconds: int) -> int:
+        """
+        Return jobs claimed by workers that died mid-job to the queue.
+        
+        Args:
+            timeout_seconds: Jobs started longer ago than this are requeued
+            
+        Returns:
+            Number of requeued jobs
+        """
+        from app.models import QueuedJob
+        
+        cutoff = datetime.utcnow() - timedelta(seconds=timeout_seconds)
+        result = db.session.execute(
+            update(QueuedJob)
+            .where(
+                QueuedJob.queue_name == self.queue_name,
+                QueuedJob.status == 'started',
+                QueuedJob.started_at < cutoff
+            )
+            .values(status='queued', claimed_by=None, started_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return result.rowcount
+
+
+class ThreadPoolBackend(QueueBackend):
+    """
+    Queue backend running jobs on a bounded thread pool inside the web process.
+    
+    Meant for development and single-node deployments without Redis. Each
+    job runs in its own application context. At most THREAD_POOL_WORKERS
+    jobs run concurrently and THREAD_POOL_MAX_BACKLOG more may wait; beyond
+    that enqueue raises QueueFullError. On SQLite, which allows one writer
+    at a time, jobs run one at a time. Pending jobs are drained when the
+    process exits. As the configured backend it also releases deferred
+    jobs, since no worker process runs.
+    """
+    
+    name = 'thread'
+    STATUS_HISTORY = 10000
+    
+    def __init__(self):
+        self.app = current_app._get_current_object()
+        self.max_workers = self.app.config['THREAD_POOL_WORKERS']
+        if db.engine.dialect.name == 'sqlite' and self.max_workers > 1:
+            print(f"SQLite allows one writer at a time; running thread pool jobs one at a time "
+                  f"instead of {self.max_workers}")
+            self.max_workers = 1
+        self.max_backlog = self.app.config['THREAD_POOL_MAX_BACKLOG']
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix='lead-worker'
+        )
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_backlog)
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._statuses = OrderedDict()  # job ID -> (status, args), most recent STATUS_HISTORY jobs
+        atexit.register(self.shutdown)
+        
+        if self.app.config['QUEUE_BACKEND'] == self.name:
+            # No worker process runs with this backend, so release deferred jobs here
+            from app.services.admission_service import AdmissionService
+            AdmissionService.start_releaser(self.app)
+    
+    def enqueue(self, func: Callable, *args) -> str:
+        if not self._slots.acquire(blocking=False):
+            raise QueueFullError(
+                f'Thread pool backlog is full ({self.max_backlog} jobs waiting)'
+            )
+        
+        job_id = f'thread-{uuid.uuid4().hex}'
+        with self._lock:
+            self._waiting += 1
+        self._set_status(job_id, 'queued', args)
+        
+        try:
+            self._executor.submit(self._run, job_id, func, args)
+        except RuntimeError:
+            # Executor is shutting down
+            with self._lock:
+                self._waiting -= 1
+            self._slots.release()
+            raise
+        
+        return job_id
+    
+    def _run(self, job_id: str, func: Callable, args: tuple):
+        with self._lock:
+            self._waiting -= 1
+        
+        self._set_status(job_id, 'started', args)
+        try:
+            with self.app.app_context():
+                func(*args)
+            self._set_status(job_id, 'finished', args)
+        except Exception as e:
+            self._set_status(job_id, 'failed', args)
+            print(f"Job {job_id} failed: {str(e)}")
+        finally:
+            self._slots.release()
+    
+    def _set_status(self, job_id: str, status: str, args: tuple):
+        with self._lock:
+            self._statuses[job_id] = (status, list(args))
+            self._statuses.move_to_end(job_id)
+            while len(self._statuses) > self.STATUS_HISTORY:
+                self._statuses.popitem(last=False)
+    
+    def depth(self) -> int:
+        return self._waiting
+    
+    def fetch_many(self, job_ids: List[str]) -> Dict[str, Dict]:
+        with self._lock:
+            found = {job_id: self._statuses[job_id] for job_id in job_ids if job_id in self._statuses}
+        return {job_id: {'status': status, 'args': args} for job_id, (status, args) in found.items()}
+    
+    def shutdown(self, wait: bool = True):
+        """
+        Stop accepting jobs and drain the pool.
+        
+        Args:
+            wait: Block until all running and waiting jobs have finished
+        """
+        if wait and self._waiting:
+            print(f"Draining {self._waiting} queued jobs before shutdown")
+        self._executor.shutdown(wait=wait)
+
+
+BACKENDS = {
+    RQBackend.name: RQBackend,
+    DatabaseBackend.name: DatabaseBackend,
+    ThreadPoolBackend.name: ThreadPoolBackend,
+}
+
+_backends_lock = threading.Lock()
+
+
+def get_queue_backend(name: Optional[str] = None) -> QueueBackend:
+    """
+    Get a queue backend instance.
+    
+    Backends are created once per application and reused.
+    
+    Args:
+        name: Backend name (defaults to QUEUE_BACKEND from config)
+        
+    Returns:
+        QueueBackend instance
+    """
+    if name is None:
+        name = current_app.config['QUEUE_BACKEND']
+    
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown queue backend: {name}")
+    
+    backends = current_app.extensions.setdefault('queue_backends', {})
+    if name not in backends:
+        with _backends_lock:
+            if name not in backends:
+                backends[name] = BACKENDS[name]()
+    return backends[name]
+
+
+def enqueue_job(func: Callable, *args) -> str:
+    """
+    Enqueue a job on the configured backend.
+    
+    If the primary backend fails (e.g. Redis is down) and
+    QUEUE_FALLBACK_BACKEND is set, the job is enqueued on the fallback
+    backend instead of being dropped.
+    
+    Args:
+        func: Job function
+        *args: Positional arguments for the job
+        
+    Returns:
+        Job ID
+        
+    Raises:
+        Exception: If no backend could accept the job
+    """
+    primary = current_app.config['QUEUE_BACKEND']
+    fallback = current_app.config.get('QUEUE_FALLBACK_BACKEND')
+    
+    try:
+        return get_queue_backend(primary).enqueue(func, *args)
+    except Exception as e:
+        if not fallback or fallback == primary:
+            raise
+        print(f"Queue backend '{primary}' unavailable, failing over to '{fallback}': {str(e)}")
+        return get_queue_backend(fallback).enqueue(func, *args)
+
+
+def get_deferred_backend() -> DatabaseBackend:
+    """
+    Get the database queue holding deferred jobs.
+    
+    Jobs deferred while the queue is over its high-water mark wait here
+    (in the database, not Redis) until release_deferred moves them to
+    the configured backend. Workers never claim from this queue directly.
+    
+    Returns:
+        DatabaseBackend for the '<RQ_QUEUE_NAME>:deferred' queue
+    """
+    backends = current_app.extensions.setdefault('queue_backends', {})
+    if 'deferred' not in backends:
+        with _backends_lock:
+            if 'deferred' not in backends:
+                backends['deferred'] = DatabaseBackend(f"{current_app.config['RQ_QUEUE_NAME']}:deferred")
+    return backends['deferred']
+
+
+def defer_job(func: Callable, *args) -> str:
+    """
+    Store a job to be enqueued later, once the queue has drained.
+    
+    Args:
+        func: Job function
+        *args: Positional arguments for the job
+        
+    Returns:
+        Job ID of the deferred job ('db-' prefixed)
+    """
+    return get_deferred_backend().enqueue(func, *args)
+
+
+def release_deferred(limit: int) -> int:
+    """
+    Move up to limit deferred jobs, oldest first, to the configured backend.
+    
+    Jobs that cannot be enqueued are returned to the deferred queue and
+    the release stops there.
+    
+    Args:
+        limit: Maximum number of jobs to release
+        
+    Returns:
+        Number of jobs released
+    """
+    if limit <= 0:
+        return 0
+    
+    backend = get_deferred_backend()
+    jobs = backend.claim(f'release:{socket.gethostname()}:{os.getpid()}', limit)
+    
+    released = 0
+    for job in jobs:
+        try:
+            enqueue_job(resolve_func(job.func_path), *json.loads(job.args))
+        except Exception as e:
+            print(f"Could not release deferred jobs: {str(e)}")
+            for unreleased in jobs[released:]:
+                unreleased.status = 'queued'
+                unreleased.claimed_by = None
+                unreleased.started_at = None
+            db.session.commit()
+            break
+        backend.complete(job)
+        released += 1
+    
+    return released
+
+
+JOB_ID_PREFIXES = {
+    'db-': DatabaseBackend.name,
+    'thread-': ThreadPoolBackend.name,
+}
+
+
+def fetch_job_statuses(job_ids: List[str]) -> Dict[str, Optional[Dict]]:
+    """
+    Look up jobs issued by any backend, one round trip per backend.
+    
+    The backend is inferred from the job ID prefix ('db-', 'thread-',
+    otherwise RQ). Thread pool jobs are only known to the process that ran
+    them.
+    
+    Args:
+        job_ids: Job IDs
+        
+    Returns:
+        Dictionary of job ID to {'status', 'args'}; None if the job does not
+        exist, status 'unknown' if its backend could not be reached
+    """
+    by_backend = {}
+    for job_id in job_ids:
+        name = next(
+            (backend for prefix, backend in JOB_ID_PREFIXES.items() if job_id.startswith(prefix)),
+            RQBackend.name
+        )
+        by_backend.setdefault(name, []).append(job_id)
+    
+    results = {job_id: None for job_id in job_ids}
+    existing = current_app.extensions.get('queue_backends', {})
+    
+    for name, ids in by_backend.items():
+        if name == ThreadPoolBackend.name and name not in existing:
+            continue
+        
+        try:
+            results.update(get_queue_backend(name).fetch_many(ids))
+        except Exception as e:
+            print(f"Could not fetch job statuses from '{name}': {str(e)}")
+            results.update({job_id: {'status': 'unknown', 'args': []} for job_id in ids})
+    
+    return results
+
+
+class DatabaseWorker:
+    """Worker that processes jobs from the database queue backend."""
+    
+    def __init__(self, app, batch_size: Optional[int] = None, poll_interval: Optional[float] = None):
+        self.app = app
+        self.batch_size = batch_size or app.config['DB_QUEUE_BATCH_SIZE']
+        self.poll_interval = poll_interval or app.config['DB_QUEUE_POLL_INTERVAL']
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        self.backend = DatabaseBackend()
+    
+    def run_job(self, job):
+        """Run a single claimed job and record its outcome."""
+        try:
+            func = resolve_func(job.func_path)
+            func(*json.loads(job.args))
+            self.backend.complete(job)
+        except Exception as e:
+            db.session.rollback()
+            print(f"Job {job.job_id} failed: {str(e)}")
+            self.backend.complete(job, error_message=str(e))
+    
+    def work_batch(self) -> int:
+        """
+        Claim and run one batch of jobs.
+        
+        Returns:
+            Number of jobs processed
+        """
+        with self.app.app_context():
+            jobs = self.backend.claim(self.worker_id, self.batch_size)
+            for job in jobs:
+                self.run_job(job)
+            return len(jobs)
+    
+    def work(self):
+        """Process jobs until interrupted."""
+        stale_check_interval = 60
+        last_stale_check = 0.0
+        
+        while True:
+            if time.monotonic() - last_stale_check > stale_check_interval:
+                with self.app.app_context():
+                    requeued = self.backend.requeue_stale(self.app.config['JOB_TIMEOUT'])
+                    if requeued:
+                        print(f"Requeued {requeued} stale jobs")
+                last_stale_check = time.monotonic()
+            
+            if not self.work_batch():
+                time.sleep(self.poll_interval)
@@ -0,0 +1,170 @@
+"""Sliding-window rate limits for API keys, shared across processes through Redis."""
+import math
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from flask import current_app
+from app.queue import get_redis_connection
+
+
+# Quotas checked together: requests per window and lead rows per window
+QUOTAS = ('requests', 'rows')
+
+# Sliding window approximated from two fixed windows: the previous window's
+# count weighted by how much of it the sliding window still covers, plus the
+# current window's count. All quotas are checked before any is charged, so a
+# rejected request uses none of its quotas.
+#
+# KEYS: current and previous window key per quota
+# ARGV: previous window weight, key TTL, then limit and cost per quota
+# Returns {0} if allowed, else {exceeded quota (1-based), previous count, current count}
+CHECK_AND_CHARGE = """
+local weight = tonumber(ARGV[1])
+for i = 0, #KEYS / 2 - 1 do
+    local limit = tonumber(ARGV[3 + i * 2])
+    local cost = tonumber(ARGV[4 + i * 2])
+    if limit > 0 and cost > 0 then
+        local current = tonumber(redis.call('GET', KEYS[1 + i * 2]) or '0')
+        local previous = tonumber(redis.call('GET', KEYS[2 + i * 2]) or '0')
+        if previous * weight + current + cost > limit then
+            return {i + 1, previous, current}
+        end
+    end
+end
+for i = 0, #KEYS / 2 - 1 do
+    local cost = tonumber(ARGV[4 + i * 2])
+    if cost > 0 then
+        redis.call('INCRBY', KEYS[1 + i * 2], cost)
+        redis.call('EXPIRE', KEYS[1 + i * 2], ARGV[2])
+    end
+end
+return {0}
+"""
+
+# In-process fallback counts keyed by (identity, quota, window index)
+_local_counts: Dict[Tuple[str, str, int], int] = {}
+_local_lock = threading.Lock()
+
+# Per-process time until which Redis is skipped after a Redis error
+_redis_paused_until = 0.0
+
+# Registered Lua script (its SHA is computed once per process)
+_script = None
+
+
+def check_rate_limit(identity: str, limits: Dict[str, int], costs: Dict[str, int]) -> Optional[Tuple[str, int]]:
+    """
+    Check and charge an API client's quotas for one request.
+    
+    Counts live in Redis so every web process shares them. If Redis is
+    unavailable, each process enforces the limits on its own (so the
+    effective limit is per process) until RATE_LIMIT_REDIS_BACKOFF
+    seconds have passed.
+    
+    Args:
+        identity: Stable identifier of the client (e.g. 'key:42')
+        limits: Limit per quota name for RATE_LIMIT_WINDOW seconds (0 means unlimited)
+        costs: Amount of each quota this request uses
+        
+    Returns:
+        None if allowed (and charged), else (exceeded quota, seconds until it would be allowed)
+    """
+    global _redis_paused_until
+    
+    window = current_app.config['RATE_LIMIT_WINDOW']
+    now = time.time()
+    index = int(now // window)
+    elapsed = now - index * window
+    weight = 1 - elapsed / window
+    
+    result = None
+    if time.monotonic() >= _redis_paused_until:
+        try:
+            result = _check_redis(identity, index, weight, window, limits, costs)
+        except Exception as e:
+            _redis_paused_until = time.monotonic() + current_app.config['RATE_LIMIT_REDIS_BACKOFF']
+            print(f"Rate limiter falling back to per-process counts: {str(e)}")
+    if result is None:
+        result = _check_local(identity, index, weight, limits, costs)
+    
+    if not result[0]:
+        return None
+    
+    quota = QUOTAS[result[0] - 1]
+    previous, current = result[1], result[2]
+    return quota, retry_after(previous, current, weight, elapsed, window, limits[quota], costs[quota])
+
+
+def retry_after(previous: float, current: float, weight: float, elapsed: float, window: float,
+                limit: int, cost: int) -> int:
+    """
+    Compute how long until a rejected request would fit in its quota.
+    
+    Args:
+        previous: Previous window's count
+        current: Current window's count
+        weight: Share of the previous window still inside the sliding window
+        elapsed: Seconds since the current window started
+        window: Window length in seconds
+        limit: Quota limit
+        cost: Request's cost
+        
+    Returns:
+        Whole seconds to wait (at least 1)
+    """
+    room = limit - cost
+    if room < 0:
+        # Larger than the whole quota: it never fits, so ask for a full window
+        wait = window
+    elif current <= room and previous > 0:
+        # Fits once enough of the previous window has slid out
+        wait = window * (weight - (room - current) / previous)
+    else:
+        # Wait for the window to roll over, then for enough of this window to slide out
+        wait = (window - elapsed) + window * (1 - room / current)
+    
+    return max(1, math.ceil(wait))
+
+
+def _quota_keys(identity: str, index: int):
+    """Redis keys per quota (current window, previous window); the hash tag keeps them in one cluster slot."""
+    keys = []
+    for quota in QUOTAS:
+        keys += [f'ratelimit:{{{identity}}}:{quota}:{index}', f'ratelimit:{{{identity}}}:{quota}:{index - 1}']
+    return keys
+
+
+def _check_redis(identity, index, weight, window, limits, costs):
+    global _script
+    
+    connection = get_redis_connection()
+    if _script is None:
+        _script = connection.register_script(CHECK_AND_CHARGE)
+    
+    args = [weight, int(window * 2)]
+    for quota in QUOTAS:
+        args += [limits[quota], costs[quota]]
+    
+    return [int(value) for value in _script(keys=_quota_keys(identity, index), args=args, client=connection)]
+
+
+def _check_local(identity, index, weight, limits, costs):
+    with _local_lock:
+        counts = []
+        for position, quota in enumerate(QUOTAS, start=1):
+            current = _local_counts.get((identity, quota, index), 0)
+            previous = _local_counts.get((identity, quota, index - 1), 0)
+            counts.append((quota, previous, current))
+            if limits[quota] > 0 and costs[quota] > 0 and previous * weight + current + costs[quota] > limits[quota]:
+                return [position, previous, current]
+        
+        for quota, _, current in counts:
+            if costs[quota] > 0:
+                _local_counts[(identity, quota, index)] = current + costs[quota]
+        
+        # Drop windows that can no longer affect any check
+        if len(_local_counts) > 10000:
+            for key in [key for key in _local_counts if key[2] < index - 1]:
+                del _local_counts[key]
+    
+    return [0]
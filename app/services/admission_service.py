@@ -0,0 +1,164 @@
+"""Admission control for lead ingestion based on queue depth."""
+import math
+import threading
+import time
+from typing import Dict, Optional
+from flask import current_app
+from app.cache import TTLCache
+from app.queue import get_deferred_backend, get_queue_backend, release_deferred
+from app.services.counter_service import CounterService
+
+
+# Depth of the configured queue backend, refreshed every QUEUE_DEPTH_CACHE_TTL seconds
+_depth_cache = TTLCache(maxsize=1)
+
+_releaser_lock = threading.Lock()
+
+
+class AdmissionService:
+    """Service deciding whether new leads may be enqueued now."""
+    
+    @staticmethod
+    def queue_depth() -> Optional[int]:
+        """
+        Get the number of jobs waiting on the configured queue backend.
+        
+        Returns:
+            Queue depth (briefly cached), or None if the backend is unreachable
+        """
+        try:
+            return _depth_cache.get_or_compute(
+                'depth', lambda: get_queue_backend().depth(),
+                ttl=current_app.config['QUEUE_DEPTH_CACHE_TTL']
+            )
+        except Exception as e:
+            print(f"Could not read queue depth: {str(e)}")
+            return None
+    
+    @staticmethod
+    def retry_after(excess: int) -> int:
+        """
+        Estimate how long the workers need to work off excess jobs.
+        
+        Args:
+            excess: Jobs to drain before new work fits under the high-water mark
+            
+        Returns:
+            Seconds, between 1 and ADMISSION_MAX_RETRY_AFTER
+        """
+        seconds = math.ceil(excess / current_app.config['QUEUE_DRAIN_RATE'])
+        return max(1, min(seconds, current_app.config['ADMISSION_MAX_RETRY_AFTER']))
+    
+    @staticmethod
+    def check(incoming: Dict[int, int]) -> Optional[Dict]:
+        """
+        Check queue depth and per-company pending leads against the high-water marks.
+        
+        Leads are admitted only if the backlog plus the incoming leads stays
+        within a mark; a batch larger than a whole mark is admitted once
+        that backlog is empty, so it is never refused forever. The global
+        mark (QUEUE_HIGH_WATER) protects the queue itself and is reported
+        as 503; the per-company mark (QUEUE_COMPANY_HIGH_WATER) stops one
+        company's backlog from crowding out the rest and is reported as
+        429. If the queue cannot be reached, only the per-company mark
+        applies.
+        
+        Args:
+            incoming: Dictionary of company ID to number of leads about to be enqueued
+            
+        Returns:
+            None if the leads are admitted, otherwise a dictionary with
+            scope ('queue' or 'company'), status_code, company_id, depth,
+            limit and retry_after
+        """
+        config = current_app.config
+        total = sum(incoming.values())
+        
+        high_water = config['QUEUE_HIGH_WATER']
+        if high_water:
+            depth = AdmissionService.queue_depth()
+            if depth and depth + total > high_water:
+                return {
+                    'scope': 'queue',
+                    'status_code': 503,
+                    'company_id': None,
+                    'depth': depth,
+                    'limit': high_water,
+                    'retry_after': AdmissionService.retry_after(min(depth + total - high_water, depth))
+                }
+        
+        company_high_water = config['QUEUE_COMPANY_HIGH_WATER']
+        if company_high_water and incoming:
+            counts = CounterService.get_counts_for_companies(sorted(incoming))
+            for company_id in sorted(incoming):
+                pending = counts[company_id]['pending']
+                if pending and pending + incoming[company_id] > company_high_water:
+                    return {
+                        'scope': 'company',
+                        'status_code': 429,
+                        'company_id': company_id,
+                        'depth': pending,
+                        'limit': company_high_water,
+                        'retry_after': AdmissionService.retry_after(
+                            min(pending + incoming[company_id] - company_high_water, pending)
+                        )
+                    }
+        
+        return None
+    
+    @staticmethod
+    def release_deferred() -> int:
+        """
+        Release deferred jobs while the queue is below QUEUE_LOW_WATER.
+        
+        Also returns jobs left claimed by a releaser that died mid-release
+        to the deferred queue.
+        
+        Returns:
+            Number of jobs moved to the queue
+        """
+        get_deferred_backend().requeue_stale(current_app.config['JOB_TIMEOUT'])
+        
+        depth = AdmissionService.queue_depth()
+        if depth is None:
+            return 0
+        
+        released = release_deferred(current_app.config['QUEUE_LOW_WATER'] - depth)
+        if released:
+            _depth_cache.clear()
+        return released
+    
+    @staticmethod
+    def start_releaser(app):
+        """
+        Release deferred jobs every DEFERRED_RELEASE_INTERVAL seconds in a
+        background thread (one per process).
+        
+        Started by queue workers, and by web processes running the thread
+        backend, which have no separate worker to do it.
+        
+        Args:
+            app: Flask application
+        """
+        with _releaser_lock:
+            thread = app.extensions.get('deferred_releaser')
+            if thread is not None and thread.is_alive():
+                return
+            
+            thread = threading.Thread(target=AdmissionService._release_loop, args=(app,),
+                                      name='deferred-releaser', daemon=True)
+            app.extensions['deferred_releaser'] = thread
+            thread.start()
+    
+    @staticmethod
+    def _release_loop(app):
+        interval = app.config['DEFERRED_RELEASE_INTERVAL']
+        while True:
+            time.sleep(interval)
+            with app.app_context():
+                try:
+                    released = AdmissionService.release_deferred()
+                    if released:
+                        print(f"Released {released} deferred jobs")
+                except Exception as e:
+                    print(f"Deferred release failed: {str(e)}")
@@ -0,0 +1,150 @@
+"""API key service for issuing, verifying and revoking company API keys."""
+import hashlib
+import hmac
+import secrets
+from datetime import datetime
+from typing import Dict, List, Optional
+from flask import current_app
+from sqlalchemy import exists
+from app.cache import TTLCache
+from app.extensions import db
+from app.models import ApiKey, CompanyProfile
+
+
+KEY_TAG = 'rlm'
+
+# Verified keys keyed by key hash: principal dict, or False for unknown keys
+_key_cache = TTLCache(maxsize=4096)
+
+
+class ApiKeyService:
+    """Service for hashed per-company API keys."""
+    
+    @staticmethod
+    def hash_key(api_key: str) -> str:
+        """
+        Hash an API key for storage and lookup.
+        
+        Args:
+            api_key: The full API key
+            
+        Returns:
+            Hex HMAC-SHA256 of the key, keyed with API_KEY_SALT
+        """
+        salt = current_app.config['API_KEY_SALT'].encode()
+        return hmac.new(salt, api_key.encode(), hashlib.sha256).hexdigest()
+    
+    @staticmethod
+    def create_key(company_id: int, name: Optional[str] = None) -> tuple[Optional[ApiKey], Optional[str], Optional[dict]]:
+        """
+        Issue a new API key for a company.
+        
+        The key itself is only returned here; just its hash is stored.
+        
+        Args:
+            company_id: The company ID
+            name: Optional label (e.g. the integration using the key)
+            
+        Returns:
+            Tuple of (ApiKey, key, error_dict)
+        """
+        if name is not None and (not isinstance(name, str) or len(name) > 100):
+            return None, None, {'name': ['name must be a string of at most 100 characters']}
+        
+        if not db.session.query(exists().where(CompanyProfile.id == company_id)).scalar():
+            return None, None, {'company_id': ['Company not found']}
+        
+        prefix = secrets.token_hex(6)
+        key = f'{KEY_TAG}_{prefix}_{secrets.token_urlsafe(32)}'
+        
+        api_key = ApiKey(company_id=company_id, name=name, prefix=prefix, key_hash=ApiKeyService.hash_key(key))
+        db.session.add(api_key)
+        db.session.commit()
+        
+        return api_key, key, None
+    
+    @staticmethod
+    def list_keys(company_id: int) -> List[ApiKey]:
+        """
+        Get a company's API keys, newest first.
+        
+        Args:
+            company_id: The company ID
+            
+        Returns:
+            List of ApiKey (including revoked keys)
+        """
+        return db.session.query(ApiKey).filter_by(company_id=company_id).order_by(ApiKey.id.desc()).all()
+    
+    @staticmethod
+    def revoke_key(company_id: int, key_id: int) -> Optional[ApiKey]:
+        """
+        Revoke one of a company's API keys.
+        
+        Other processes stop accepting the key within API_KEY_CACHE_TTL seconds.
+        
+        Args:
+            company_id: The company ID
+            key_id: The API key ID
+            
+        Returns:
+            The revoked ApiKey, or None if the company has no such key
+        """
+        api_key = db.session.query(ApiKey).filter_by(id=key_id, company_id=company_id).first()
+        if not api_key:
+            return None
+        
+        if api_key.revoked_at is None:
+            api_key.revoked_at = datetime.utcnow()
+            db.session.commit()
+        
+        # The cache is keyed by key hash, so drop every entry rather than search for it
+        _key_cache.clear()
+        
+        return api_key
+    
+    @staticmethod
+    def verify(api_key: str) -> Optional[Dict]:
+        """
+        Verify an API key.
+        
+        Results, including misses, are cached for API_KEY_CACHE_TTL seconds,
+        so a busy integration costs one HMAC per request instead of a query.
+        
+        Args:
+            api_key: The key from the X-API-Key header
+            
+        Returns:
+            Principal dictionary (key_id, company_id, identity, requests_per_window,
+            rows_per_window), or None if the key is unknown or revoked
+        """
+        key_hash = ApiKeyService.hash_key(api_key)
+        
+        principal = _key_cache.get(key_hash)
+        if principal is None:
+            principal = ApiKeyService._lookup(api_key, key_hash) or False
+            _key_cache.set(key_hash, principal, current_app.config['API_KEY_CACHE_TTL'])
+        
+        return principal or None
+    
+    @staticmethod
+    def _lookup(api_key: str, key_hash: str) -> Optional[Dict]:
+        """Find an active key by its prefix and compare hashes in constant time."""
+        parts = api_key.split('_', 2)
+        if len(parts) != 3 or parts[0] != KEY_TAG:
+            return None
+        
+        row = db.session.query(
+            ApiKey.id, ApiKey.company_id, ApiKey.key_hash, ApiKey.requests_per_window, ApiKey.rows_per_window
+        ).filter(ApiKey.prefix == parts[1], ApiKey.revoked_at.is_(None)).first()
+        
+        if row is None or not hmac.compare_digest(row.key_hash, key_hash):
+            return None
+        
+        return {
+            'key_id': row.id,
+            'company_id': row.company_id,
+            'identity': f'key:{row.id}',
+            'requests_per_window': row.requests_per_window,
+            'rows_per_window': row.rows_per_window
+        }
@@ -1,14 +1,25 @@
 """Company service for managing company profiles."""
-from typing import Optional
+from bisect import bisect_left
+from typing import Dict, List, Optional
+from flask import current_app
+from sqlalchemy import exists
 from sqlalchemy.exc import IntegrityError
+from app.cache import TTLCache
 from app.extensions import db
 from app.models import CompanyProfile
 from app.services.validation import validate_company_data
 
 
+# Sorted (lowercased name, id, company_name, owner_name) tuples for prefix search
+_search_index = TTLCache(maxsize=1)
+
+
 class CompanyService:
     """Service for company profile operations."""
     
+    SEARCH_DEFAULT_LIMIT = 10
+    SEARCH_MAX_LIMIT = 50
+    
     @staticmethod
     def register_company(data: dict) -> tuple[Optional[CompanyProfile], Optional[dict]]:
         """
@@ -39,6 +50,7 @@ class CompanyService:
         try:
             db.session.add(company)
             db.session.commit()
+            _search_index.clear()
             return company, None
         except IntegrityError as e:
             db.session.rollback()
@@ -75,3 +87,52 @@ class CompanyService:
             CompanyProfile or None if not found
         """
         return db.session.query(CompanyProfile).filter_by(owner_email=email).first()
+    
+    @staticmethod
+    def has_companies() -> bool:
+        """
+        Check whether any company is registered.
+        
+        Returns:
+            True if at least one company exists
+        """
+        return db.session.query(exists().where(CompanyProfile.id.isnot(None))).scalar()
+    
+    @staticmethod
+    def search_companies(query: str, limit: int = SEARCH_DEFAULT_LIMIT) -> List[Dict]:
+        """
+        Find companies whose name starts with a prefix, case-insensitively.
+        
+        Names are kept in a sorted in-process index, rebuilt at most every
+        COMPANY_SEARCH_CACHE_TTL seconds and whenever a company registers
+        in this process, so each search is a binary search plus a short
+        scan of the matches.
+        
+        Args:
+            query: Name prefix (empty matches every company)
+            limit: Maximum number of results
+            
+        Returns:
+            List of dictionaries with id, company_name and owner_name, ordered by name
+        """
+        index = _search_index.get_or_compute(
+            'companies', CompanyService._build_search_index,
+            ttl=current_app.config['COMPANY_SEARCH_CACHE_TTL']
+        )
+        prefix = query.strip().casefold()
+        
+        results = []
+        for position in range(bisect_left(index, (prefix,)), len(index)):
+            name_key, company_id, company_name, owner_name = index[position]
+            if len(results) >= limit or not name_key.startswith(prefix):
+                break
+            results.append({'id': company_id, 'company_name': company_name, 'owner_name': owner_name})
+        
+        return results
+    
+    @staticmethod
+    def _build_search_index() -> List[tuple]:
+        """Load company names (columns only, no ORM objects) into a sorted list."""
+        rows = db.session.query(CompanyProfile.id, CompanyProfile.company_name, CompanyProfile.owner_name).all()
+        return sorted((company_name.casefold(), company_id, company_name, owner_name)
+                      for company_id, company_name, owner_name in rows)
@@ -0,0 +1,169 @@
+"""Counter service for per-company lead status counts."""
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func
+from app.extensions import db
+from app.db_utils import reporting_session, upsert_increment
+from app.models import ArchivedLeadProcessingLog, CompanyDataVersion, CompanyStatusCounter, LeadProcessingLog
+from app.services.version_service import VersionService
+
+
+STATUSES = ('pending', 'processing', 'success', 'failed')
+
+
+class CounterService:
+    """Service for incrementally maintained status counters."""
+    
+    @staticmethod
+    def increment(company_id: int, status: str, amount: int = 1):
+        """
+        Add to a company's counter for a status.
+        
+        Joins the current transaction; the caller commits together with
+        the log change that caused it.
+        
+        Args:
+            company_id: The company ID
+            status: Log status
+            amount: Amount to add (negative to subtract)
+        """
+        upsert_increment(
+            CompanyStatusCounter,
+            {'company_id': company_id, 'status': status},
+            {'count': amount}
+        )
+    
+    @staticmethod
+    def transition(company_id: int, old_status: Optional[str], new_status: str):
+        """
+        Move one log from old_status to new_status in the counters.
+        
+        Args:
+            company_id: The company ID
+            old_status: Previous status (None for a new log)
+            new_status: New status
+        """
+        if old_status == new_status:
+            return
+        
+        if old_status is not None:
+            CounterService.increment(company_id, old_status, -1)
+        CounterService.increment(company_id, new_status, 1)
+    
+    @staticmethod
+    def get_counts(company_id: int) -> Dict[str, int]:
+        """
+        Get status counts for a company.
+        
+        Args:
+            company_id: The company ID
+            
+        Returns:
+            Dictionary of status to count (all statuses present)
+        """
+        return CounterService.get_counts_for_companies([company_id])[company_id]
+    
+    @staticmethod
+    def get_counts_with_version(company_id: int) -> Tuple[int, Dict[str, int]]:
+        """
+        Get status counts for a company together with its data version.
+        
+        Both are read by the same statement, so the counts include exactly
+        the changes up to that version.
+        
+        Args:
+            company_id: The company ID
+            
+        Returns:
+            Tuple of (data version, dictionary of status to count)
+        """
+        # Every counter change bumps the version, so counters never exist without a version row
+        rows = reporting_session().query(
+            CompanyDataVersion.version,
+            CompanyStatusCounter.status,
+            CompanyStatusCounter.count
+        ).outerjoin(
+            CompanyStatusCounter, CompanyStatusCounter.company_id == CompanyDataVersion.company_id
+        ).filter(CompanyDataVersion.company_id == company_id).all()
+        
+        counts = {status: 0 for status in STATUSES}
+        for _, status, count in rows:
+            if status is not None:
+                counts[status] = count
+        
+        return (rows[0][0] if rows else 0), counts
+    
+    @staticmethod
+    def get_counts_for_companies(company_ids: List[int]) -> Dict[int, Dict[str, int]]:
+        """
+        Get status counts for several companies with one query.
+        
+        Args:
+            company_ids: List of company IDs
+            
+        Returns:
+            Dictionary of company ID to status counts
+        """
+        counts = {company_id: {status: 0 for status in STATUSES} for company_id in company_ids}
+        
+        if not company_ids:
+            return counts
+        
+        rows = reporting_session().query(
+            CompanyStatusCounter.company_id,
+            CompanyStatusCounter.status,
+            CompanyStatusCounter.count
+        ).filter(CompanyStatusCounter.company_id.in_(company_ids)).all()
+        
+        for company_id, status, count in rows:
+            counts[company_id][status] = count
+        
+        return counts
+    
+    @staticmethod
+    def reconcile(company_id: Optional[int] = None) -> int:
+        """
+        Recompute counters from lead_processing_logs and repair any drift.
+        
+        Archived logs are counted too, since archival leaves counters unchanged.
+        
+        Args:
+            company_id: Only reconcile this company (all companies if None)
+            
+        Returns:
+            Number of counter rows corrected
+        """
+        existing_query = db.session.query(CompanyStatusCounter)
+        if company_id is not None:
+            existing_query = existing_query.filter(CompanyStatusCounter.company_id == company_id)
+        
+        actual = {}
+        for log_model in (LeadProcessingLog, ArchivedLeadProcessingLog):
+            actual_query = db.session.query(log_model.company_id, log_model.status, func.count(log_model.id))
+            if company_id is not None:
+                actual_query = actual_query.filter(log_model.company_id == company_id)
+            
+            for row_company_id, status, count in actual_query.group_by(log_model.company_id, log_model.status).all():
+                actual[(row_company_id, status)] = actual.get((row_company_id, status), 0) + count
+        existing = {(counter.company_id, counter.status): counter for counter in existing_query.all()}
+        
+        corrected = 0
+        changed_companies = set()
+        for key in set(actual) | set(existing):
+            expected = actual.get(key, 0)
+            counter = existing.get(key)
+            
+            if counter is None:
+                db.session.add(CompanyStatusCounter(company_id=key[0], status=key[1], count=expected))
+                corrected += 1
+                changed_companies.add(key[0])
+            elif counter.count != expected:
+                counter.count = expected
+                corrected += 1
+                changed_companies.add(key[0])
+        
+        for changed_company_id in changed_companies:
+            VersionService.bump(changed_company_id)
+        
+        db.session.commit()
+        
+        return corrected
@@ -1,14 +1,97 @@
 """Dashboard service for statistics and reporting."""
 from typing import Dict, List, Optional
 from datetime import datetime
-from sqlalchemy import func
-from app.extensions import db
-from app.models import Lead, LeadProcessingLog
+from flask import current_app
+from sqlalchemy import func, select
+from app.cache import TTLCache
+from app.db_utils import estimate_count, reporting_session
+from app.models import CompanyDataVersion, CompanyProfile, CompanyStatusCounter, Lead, LeadProcessingLog
+from app.services.counter_service import CounterService
+from app.services.version_service import VersionService
+from app.pagination import keyset_page
+
+
+# Dashboard payloads keyed by (company_id, data version, start_date, end_date)
+_dashboard_cache = TTLCache(maxsize=2048)
+
+# Landing page totals
+_global_counts_cache = TTLCache(maxsize=1)
 
 
 class DashboardService:
     """Service for dashboard statistics and reporting."""
     
+    DEFAULT_PER_PAGE = 20
+    MAX_PER_PAGE = 100
+    SUMMARY_SORT_FIELDS = ('created_at', 'company_name', 'lead_count', 'success_count', 'failed_count')
+    
+    @staticmethod
+    def get_dashboard(company_id: int, filters: Optional[Dict] = None,
+                      version: Optional[int] = None) -> Optional[Dict]:
+        """
+        Get a company and its statistics, cached for a short TTL.
+        
+        Results are cached per (company, data version, date range) for
+        DASHBOARD_CACHE_TTL seconds, so any change to the company's data
+        is visible immediately. Concurrent identical requests share a
+        single computation.
+        
+        Args:
+            company_id: The company ID
+            filters: Optional filters (start_date, end_date)
+            version: Company data version if already looked up
+            
+        Returns:
+            Dictionary with company and statistics, or None if the company does not exist
+        """
+        filters = filters or {}
+        if version is None:
+            version = VersionService.get(company_id)
+        key = (
+            company_id,
+            version,
+            filters['start_date'].isoformat() if 'start_date' in filters else None,
+            filters['end_date'].isoformat() if 'end_date' in filters else None
+        )
+        
+        def compute():
+            company = reporting_session().query(CompanyProfile).filter_by(id=company_id).first()
+            if not company:
+                return None
+            return {
+                'company': company.to_dict(),
+                'statistics': DashboardService.get_company_stats(company_id, filters or None)
+            }
+        
+        return _dashboard_cache.get_or_compute(key, compute, ttl=current_app.config['DASHBOARD_CACHE_TTL'])
+    
+    @staticmethod
+    def get_global_counts() -> Dict:
+        """
+        Get total companies and leads for the landing page.
+        
+        Totals are cached for GLOBAL_COUNTS_CACHE_TTL seconds, and tables
+        larger than EXACT_COUNT_THRESHOLD are counted from PostgreSQL
+        planner statistics instead of a full scan.
+        
+        Returns:
+            Dictionary with total_companies, total_leads and approximate flag
+        """
+        def compute():
+            threshold = current_app.config['EXACT_COUNT_THRESHOLD']
+            session = reporting_session()
+            total_companies, companies_approximate = estimate_count(CompanyProfile, threshold, session)
+            total_leads, leads_approximate = estimate_count(Lead, threshold, session)
+            return {
+                'total_companies': total_companies,
+                'total_leads': total_leads,
+                'approximate': companies_approximate or leads_approximate
+            }
+        
+        return _global_counts_cache.get_or_compute(
+            'totals', compute, ttl=current_app.config['GLOBAL_COUNTS_CACHE_TTL']
+        )
+    
     @staticmethod
     def get_company_stats(company_id: int, filters: Optional[Dict] = None) -> Dict:
         """
@@ -21,30 +104,53 @@ class DashboardService:
         Returns:
             Dictionary with statistics
         """
-        # Base query
-        query = db.session.query(LeadProcessingLog).filter_by(company_id=company_id)
+        if not filters:
+            # Unfiltered stats come straight from the maintained counters
+            counts_by_status = CounterService.get_counts(company_id)
+            total_leads = sum(counts_by_status.values())
+        else:
+            total_leads, counts_by_status = DashboardService._count_logs(company_id, filters)
         
-        # Apply date filters if provided
-        if filters:
-            if 'start_date' in filters:
-                query = query.filter(LeadProcessingLog.created_at >= filters['start_date'])
-            if 'end_date' in filters:
-                query = query.filter(LeadProcessingLog.created_at <= filters['end_date'])
+        # Calculate success rate
+        processed_count = counts_by_status['success'] + counts_by_status['failed']
+        success_rate = 0.0
+        if processed_count > 0:
+            success_rate = (counts_by_status['success'] / processed_count) * 100
         
-        # Get total count
-        total_leads = query.count()
+        # Get failed leads with errors
+        failed_leads = DashboardService.get_failed_leads(company_id, filters)
         
-        # Get counts by status
-        status_counts = db.session.query(
+        return {
+            'total_leads': total_leads,
+            'counts_by_status': counts_by_status,
+            'success_rate': round(success_rate, 2),
+            'failed_leads': failed_leads
+        }
+    
+    @staticmethod
+    def _count_logs(company_id: int, filters: Dict) -> tuple[int, Dict[str, int]]:
+        """
+        Count a company's logs by status by scanning lead_processing_logs.
+        
+        Used when date filters rule out the maintained counters.
+        
+        Args:
+            company_id: The company ID
+            filters: Filters (start_date, end_date)
+            
+        Returns:
+            Tuple of (total_leads, counts_by_status)
+        """
+        # Counts by status in one pass; the total is their sum
+        status_counts = reporting_session().query(
             LeadProcessingLog.status,
             func.count(LeadProcessingLog.id)
         ).filter_by(company_id=company_id)
         
-        if filters:
-            if 'start_date' in filters:
-                status_counts = status_counts.filter(LeadProcessingLog.created_at >= filters['start_date'])
-            if 'end_date' in filters:
-                status_counts = status_counts.filter(LeadProcessingLog.created_at <= filters['end_date'])
+        if 'start_date' in filters:
+            status_counts = status_counts.filter(LeadProcessingLog.created_at >= filters['start_date'])
+        if 'end_date' in filters:
+            status_counts = status_counts.filter(LeadProcessingLog.created_at <= filters['end_date'])
         
         status_counts = status_counts.group_by(LeadProcessingLog.status).all()
         
@@ -59,21 +165,9 @@ class DashboardService:
         for status, count in status_counts:
             counts_by_status[status] = count
         
-        # Calculate success rate
-        processed_count = counts_by_status['success'] + counts_by_status['failed']
-        success_rate = 0.0
-        if processed_count > 0:
-            success_rate = (counts_by_status['success'] / processed_count) * 100
-        
-        # Get failed leads with errors
-        failed_leads = DashboardService.get_failed_leads(company_id, filters)
+        total_leads = sum(counts_by_status.values())
         
-        return {
-            'total_leads': total_leads,
-            'counts_by_status': counts_by_status,
-            'success_rate': round(success_rate, 2),
-            'failed_leads': failed_leads
-        }
+        return total_leads, counts_by_status
     
     @staticmethod
     def get_failed_leads(company_id: int, filters: Optional[Dict] = None) -> List[Dict]:
@@ -87,7 +181,7 @@ class DashboardService:
         Returns:
             List of failed lead dictionaries
         """
-        query = db.session.query(LeadProcessingLog, Lead).join(
+        query = reporting_session().query(LeadProcessingLog, Lead).join(
             Lead, LeadProcessingLog.lead_id == Lead.id
         ).filter(
             LeadProcessingLog.company_id == company_id,
@@ -115,3 +209,157 @@ class DashboardService:
             })
         
         return failed_leads
+    
+    @staticmethod
+    def get_failed_leads_page(company_id: int, filters: Optional[Dict] = None, cursor: Optional[str] = None,
+                              limit: Optional[int] = None) -> tuple[List[Dict], Optional[str]]:
+        """
+        Get one page of failed leads with error messages, newest first.
+        
+        Unlike get_failed_leads, which returns the latest 50 for the
+        dashboard, this pages through the full history using keyset
+        pagination on the log's (created_at, id).
+        
+        Args:
+            company_id: The company ID
+            filters: Optional filters (start_date, end_date)
+            cursor: Cursor from the previous page
+            limit: Page size
+            
+        Returns:
+            Tuple of (failed lead dictionaries, next_cursor)
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        query = reporting_session().query(
+            LeadProcessingLog.id,
+            LeadProcessingLog.created_at,
+            LeadProcessingLog.updated_at,
+            LeadProcessingLog.error_message,
+            LeadProcessingLog.attempt_count,
+            Lead.id.label('lead_id'),
+            Lead.name.label('lead_name'),
+            Lead.phone.label('lead_phone')
+        ).join(
+            Lead, LeadProcessingLog.lead_id == Lead.id
+        ).filter(
+            LeadProcessingLog.company_id == company_id,
+            LeadProcessingLog.status == 'failed'
+        )
+        
+        if filters:
+            if 'start_date' in filters:
+                query = query.filter(LeadProcessingLog.created_at >= filters['start_date'])
+            if 'end_date' in filters:
+                query = query.filter(LeadProcessingLog.created_at <= filters['end_date'])
+        
+        rows, next_cursor = keyset_page(
+            query, LeadProcessingLog.created_at, LeadProcessingLog.id, cursor, limit
+        )
+        
+        failed_leads = []
+        for row in rows:
+            failed_leads.append({
+                'lead_id': row.lead_id,
+                'lead_name': row.lead_name,
+                'lead_phone': row.lead_phone,
+                'error_message': row.error_message,
+                'attempt_count': row.attempt_count,
+                'failed_at': row.updated_at.isoformat() if row.updated_at else None
+            })
+        
+        return failed_leads, next_cursor
+    
+    @staticmethod
+    def get_company_summaries(page: int = 1, per_page: int = DEFAULT_PER_PAGE,
+                              sort: str = 'created_at', order: str = 'desc') -> Dict:
+        """
+        Get a page of companies with their lead and status counts.
+        
+        All counts come from one query as correlated subqueries over the
+        maintained status counters; the lead count is the sum of a
+        company's counters, so like the status counts it includes archived
+        leads. Sorting by a company column only evaluates the subqueries for
+        the page; sorting by a count evaluates them for every company before
+        the page is cut. Each company's data version
+        is read by the same statement, so it always matches the counts
+        (rendered cards are cached under it).
+        
+        Args:
+            page: Page number (1-based)
+            per_page: Companies per page (capped at MAX_PER_PAGE)
+            sort: One of SUMMARY_SORT_FIELDS
+            order: 'asc' or 'desc'
+            
+        Returns:
+            Dictionary with companies, total, page, per_page and pages
+        """
+        if sort not in DashboardService.SUMMARY_SORT_FIELDS:
+            raise ValueError(f"sort must be one of: {', '.join(DashboardService.SUMMARY_SORT_FIELDS)}")
+        if order not in ('asc', 'desc'):
+            raise ValueError("order must be 'asc' or 'desc'")
+        
+        page = max(page, 1)
+        per_page = min(max(per_page, 1), DashboardService.MAX_PER_PAGE)
+        
+        def status_count(status):
+            return func.coalesce(select(CompanyStatusCounter.count).where(
+                CompanyStatusCounter.company_id == CompanyProfile.id,
+                CompanyStatusCounter.status == status
+            ).scalar_subquery(), 0).label(f'{status}_count')
+        
+        columns = {
+            'lead_count': func.coalesce(select(func.sum(CompanyStatusCounter.count)).where(
+                CompanyStatusCounter.company_id == CompanyProfile.id
+            ).scalar_subquery(), 0).label('lead_count'),
+            'pending_count': status_count('pending'),
+            'processing_count': status_count('processing'),
+            'success_count': status_count('success'),
+            'failed_count': status_count('failed'),
+        }
+        data_version = func.coalesce(select(CompanyDataVersion.version).where(
+            CompanyDataVersion.company_id == CompanyProfile.id
+        ).scalar_subquery(), 0).label('data_version')
+        
+        sort_column = columns.get(sort, getattr(CompanyProfile, sort, None))
+        sort_column = sort_column.desc() if order == 'desc' else sort_column.asc()
+        
+        total = reporting_session().query(func.count(CompanyProfile.id)).scalar()
+        
+        rows = reporting_session().query(
+            CompanyProfile.id,
+            CompanyProfile.company_name,
+            CompanyProfile.owner_name,
+            CompanyProfile.owner_email,
+            CompanyProfile.owner_phone,
+            CompanyProfile.ghl_location_id,
+            CompanyProfile.created_at,
+            *columns.values(),
+            data_version
+        ).order_by(sort_column, CompanyProfile.id.desc()).limit(per_page).offset((page - 1) * per_page).all()
+        
+        companies = []
+        for row in rows:
+            company = dict(row._mapping)
+            
+            # Response rate (success / total processed)
+            total_processed = company['success_count'] + company['failed_count']
+            if total_processed > 0:
+                company['response_rate'] = round((company['success_count'] / total_processed) * 100, 1)
+            else:
+                company['response_rate'] = 0
+            
+            # Appointments set (placeholder - would come from GHL webhook data)
+            # For now, estimate as a percentage of successful leads
+            company['appointments_set'] = round(company['success_count'] * 0.3)  # Assume 30% conversion
+            
+            companies.append(company)
+        
+        return {
+            'companies': companies,
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+            'pages': (total + per_page - 1) // per_page
+        }
@@ -0,0 +1,284 @@
+"""Event service for live lead status updates over Server-Sent Events."""
+import json
+import queue
+import threading
+import time
+from typing import Dict, Iterator, Optional
+import redis
+from flask import current_app
+from app.db_utils import reporting_session
+from app.queue import get_redis_connection
+from app.services.counter_service import CounterService
+from app.services.version_service import VersionService
+
+
+CHANNEL_PREFIX = 'company-events:'
+
+# Per-process time until which publishing is skipped after a Redis error
+_publish_paused_until = 0.0
+
+# Event streams currently open in this process (capped at SSE_MAX_STREAMS)
+_open_streams = 0
+_streams_lock = threading.Lock()
+
+
+class EventBroker:
+    """
+    Background thread holding one Redis pattern subscription per process
+    and fanning company events out to in-process listener queues.
+    
+    Every open event stream registers a queue here instead of opening its
+    own Redis connection, so the number of browser tabs does not affect
+    Redis or the database.
+    """
+    
+    RESYNC = object()
+    LISTENER_BACKLOG = 1000
+    
+    def __init__(self, redis_url: str, connect_timeout: float):
+        self.redis_url = redis_url
+        self.connect_timeout = connect_timeout
+        self.connected = False
+        self._listeners = {}
+        self._lock = threading.Lock()
+        self._thread = None
+    
+    def start(self):
+        """Start the subscriber thread (once)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._loop, name='event-broker', daemon=True)
+            self._thread.start()
+    
+    def subscribe(self, company_id: int) -> queue.Queue:
+        """Register a listener queue for a company's events."""
+        listener = queue.Queue(maxsize=self.LISTENER_BACKLOG)
+        with self._lock:
+            self._listeners.setdefault(company_id, set()).add(listener)
+        return listener
+    
+    def unsubscribe(self, company_id: int, listener: queue.Queue):
+        """Remove a listener queue."""
+        with self._lock:
+            listeners = self._listeners.get(company_id)
+            if listeners:
+                listeners.discard(listener)
+                if not listeners:
+                    del self._listeners[company_id]
+    
+    def _loop(self):
+        backoff = 1
+        while True:
+            try:
+                connection = redis.Redis.from_url(
+                    self.redis_url,
+                    socket_connect_timeout=self.connect_timeout,
+                    health_check_interval=30
+                )
+                pubsub = connection.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(f'{CHANNEL_PREFIX}*')
+                self.connected = True
+                backoff = 1
+                print('Event broker subscribed to Redis')
+                
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message:
+                        self._dispatch(message)
+            except Exception as e:
+                if self.connected:
+                    print(f"Event broker lost Redis connection: {str(e)}")
+                self.connected = False
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+    
+    def _dispatch(self, message: Dict):
+        channel = message['channel']
+        if isinstance(channel, bytes):
+            channel = channel.decode()
+        
+        try:
+            company_id = int(channel[len(CHANNEL_PREFIX):])
+            event = json.loads(message['data'])
+        except (ValueError, TypeError):
+            return
+        
+        with self._lock:
+            listeners = list(self._listeners.get(company_id, ()))
+        
+        for listener in listeners:
+            try:
+                listener.put_nowait(event)
+            except queue.Full:
+                # Slow client: drop its backlog and have it take a fresh snapshot
+                with listener.mutex:
+                    listener.queue.clear()
+                listener.put_nowait(self.RESYNC)
+
+
+class EventService:
+    """Service for publishing and streaming live lead status events."""
+    
+    @staticmethod
+    def publish_transition(company_id: int, lead_id: int, old_status: Optional[str], new_status: str,
+                           version: int):
+        """
+        Publish a lead status change to the company's event channel.
+        
+        Best effort: callers have already committed, and after a Redis
+        error publishing is skipped for EVENT_PUBLISH_BACKOFF seconds so
+        an unavailable Redis never slows down lead processing.
+        
+        Args:
+            company_id: The company ID
+            lead_id: The lead ID
+            old_status: Previous status (None for a new log)
+            new_status: New status
+            version: Company data version committed with the change
+        """
+        global _publish_paused_until
+        
+        if time.monotonic() < _publish_paused_until:
+            return
+        
+        event = {'lead_id': lead_id, 'from': old_status, 'to': new_status, 'version': version}
+        try:
+            get_redis_connection().publish(f'{CHANNEL_PREFIX}{company_id}', json.dumps(event))
+        except Exception as e:
+            _publish_paused_until = time.monotonic() + current_app.config['EVENT_PUBLISH_BACKOFF']
+            print(f"Could not publish event for company {company_id}: {str(e)}")
+    
+    @staticmethod
+    def get_broker() -> EventBroker:
+        """
+        Get the application's event broker, starting it on first use.
+        
+        Returns:
+            EventBroker instance
+        """
+        app = current_app._get_current_object()
+        broker = app.extensions.get('event_broker')
+        if broker is None:
+            broker = app.extensions.setdefault(
+                'event_broker',
+                EventBroker(app.config['REDIS_URL'], app.config['REDIS_CONNECT_TIMEOUT'])
+            )
+        broker.start()
+        return broker
+    
+    @staticmethod
+    def stream(company_id: int) -> Iterator[str]:
+        """
+        Yield Server-Sent Events for a company.
+        
+        Sends a 'snapshot' event with the current status counts, then a
+        'delta' event per status change received from the broker. The
+        snapshot is tagged with the data version it was read at, and deltas
+        for changes up to that version are dropped: the listener subscribes
+        before the snapshot is read, so those changes are already counted.
+        While
+        Redis is unavailable it falls back to checking the company's data
+        version every SSE_POLL_INTERVAL seconds and sending a new snapshot
+        when it changes. The stream ends after SSE_MAX_STREAM_SECONDS and
+        the browser reconnects.
+        
+        Each open stream holds a web server thread, so at most
+        SSE_MAX_STREAMS are kept open per process. Above that, the client
+        gets one snapshot and is told to reconnect after SSE_FALLBACK_RETRY
+        seconds, so it polls instead of holding a thread.
+        
+        Args:
+            company_id: The company ID
+            
+        Yields:
+            Encoded SSE messages
+        """
+        config = current_app.config
+        broker = EventService.get_broker()
+        
+        def snapshot():
+            version, counts = CounterService.get_counts_with_version(company_id)
+            # Release the connection; the stream may stay open for minutes
+            reporting_session().rollback()
+            return version, EventService._message('snapshot', {'counts': counts})
+        
+        if not EventService._open_stream(config['SSE_MAX_STREAMS']):
+            yield f"retry: {int(config['SSE_FALLBACK_RETRY'] * 1000)}\n\n"
+            yield snapshot()[1]
+            return
+        
+        listener = broker.subscribe(company_id)
+        try:
+            yield 'retry: 3000\n\n'
+            version, message = snapshot()
+            yield message
+            
+            deadline = time.monotonic() + config['SSE_MAX_STREAM_SECONDS']
+            last_sent = time.monotonic()
+            was_connected = broker.connected
+            
+            while time.monotonic() < deadline:
+                if broker.connected:
+                    if not was_connected:
+                        # Events may have been missed while disconnected
+                        version, message = snapshot()
+                        yield message
+                        last_sent = time.monotonic()
+                    was_connected = True
+                    
+                    try:
+                        event = listener.get(timeout=config['SSE_HEARTBEAT_INTERVAL'])
+                    except queue.Empty:
+                        yield ': heartbeat\n\n'
+                        last_sent = time.monotonic()
+                        continue
+                    
+                    if event is EventBroker.RESYNC:
+                        version, message = snapshot()
+                    elif event.get('version', version + 1) <= version:
+                        # Already included in the last snapshot
+                        continue
+                    else:
+                        message = EventService._message('delta', event)
+                    yield message
+                    last_sent = time.monotonic()
+                else:
+                    was_connected = False
+                    time.sleep(config['SSE_POLL_INTERVAL'])
+                    
+                    current_version = VersionService.get(company_id)
+                    reporting_session().rollback()
+                    if current_version != version:
+                        version, message = snapshot()
+                        yield message
+                        last_sent = time.monotonic()
+                    elif time.monotonic() - last_sent >= config['SSE_HEARTBEAT_INTERVAL']:
+                        yield ': heartbeat\n\n'
+                        last_sent = time.monotonic()
+        finally:
+            broker.unsubscribe(company_id, listener)
+            EventService._close_stream()
+    
+    @staticmethod
+    def _open_stream(max_streams: int) -> bool:
+        """Count a new stream in this process unless max_streams (0 = unlimited) are open."""
+        global _open_streams
+        
+        with _streams_lock:
+            if max_streams and _open_streams >= max_streams:
+                return False
+            _open_streams += 1
+            return True
+    
+    @staticmethod
+    def _close_stream():
+        global _open_streams
+        
+        with _streams_lock:
+            _open_streams -= 1
+    
+    @staticmethod
+    def _message(event: str, data: Dict) -> str:
+        """Format one SSE message."""
+        return f'event: {event}\ndata: {json.dumps(data)}\n\n'
@@ -0,0 +1,124 @@
+"""Export service for streaming lead and log history."""
+import csv
+import io
+import json
+import zlib
+from typing import Dict, Iterator, Optional
+from app.db_utils import reporting_session
+from app.pagination import MAX_LIMIT
+from app.services.lead_service import LeadService
+from app.services.logging_service import LoggingService
+
+
+EXPORT_FIELDS = {
+    'leads': ['id', 'name', 'phone', 'notes', 'status', 'ghl_contact_id', 'created_at'],
+    'logs': ['id', 'lead_id', 'status', 'worker_id', 'ghl_contact_id', 'error_message',
+             'attempt_count', 'created_at', 'updated_at'],
+}
+
+FORMATS = ('csv', 'ndjson')
+
+
+class ExportService:
+    """Service for streaming exports of a company's history."""
+    
+    @staticmethod
+    def iter_rows(kind: str, company_id: int, filters: Optional[Dict] = None) -> Iterator[Dict]:
+        """
+        Yield every lead or log for a company, newest first.
+        
+        Reads in keyset-paginated chunks of MAX_LIMIT rows, ending the
+        transaction after each chunk so an export never holds a snapshot
+        or locks for longer than one chunk read.
+        
+        Args:
+            kind: 'leads' or 'logs'
+            company_id: The company ID
+            filters: Optional filters (status, start_date, end_date)
+            
+        Yields:
+            Row dictionaries
+        """
+        get_page = LeadService.get_leads_page if kind == 'leads' else LoggingService.get_logs_page
+        
+        cursor = None
+        while True:
+            rows, cursor = get_page(company_id, filters, cursor, MAX_LIMIT)
+            reporting_session().rollback()
+            
+            yield from rows
+            
+            if not cursor:
+                break
+    
+    @staticmethod
+    def iter_export(kind: str, company_id: int, fmt: str = 'csv', filters: Optional[Dict] = None,
+                    compress: bool = False) -> Iterator[bytes]:
+        """
+        Build an export as encoded chunks suitable for a streamed response.
+        
+        Args:
+            kind: 'leads' or 'logs'
+            company_id: The company ID
+            fmt: 'csv' or 'ndjson'
+            filters: Optional filters (status, start_date, end_date)
+            compress: Gzip the output
+            
+        Returns:
+            Iterator of encoded (and optionally compressed) chunks
+            
+        Raises:
+            ValueError: If kind or fmt is unknown
+        """
+        if kind not in EXPORT_FIELDS:
+            raise ValueError(f"export must be one of: {', '.join(EXPORT_FIELDS)}")
+        if fmt not in FORMATS:
+            raise ValueError(f"format must be one of: {', '.join(FORMATS)}")
+        
+        chunks = ExportService._encode(kind, company_id, fmt, filters)
+        
+        if compress:
+            chunks = ExportService._gzip(chunks)
+        
+        return chunks
+    
+    @staticmethod
+    def _encode(kind: str, company_id: int, fmt: str, filters: Optional[Dict]) -> Iterator[bytes]:
+        """Encode rows as CSV or NDJSON, yielding about one chunk per MAX_LIMIT rows."""
+        fields = EXPORT_FIELDS[kind]
+        buffer = io.StringIO()
+        writer = None
+        
+        if fmt == 'csv':
+            writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction='ignore')
+            writer.writeheader()
+        
+        pending = 0
+        for row in ExportService.iter_rows(kind, company_id, filters):
+            if writer:
+                writer.writerow(row)
+            else:
+                buffer.write(json.dumps({field: row.get(field) for field in fields}))
+                buffer.write('\n')
+            
+            pending += 1
+            if pending >= MAX_LIMIT:
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+        
+        if buffer.tell():
+            yield buffer.getvalue().encode('utf-8')
+    
+    @staticmethod
+    def _gzip(chunks: Iterator[bytes]) -> Iterator[bytes]:
+        """Gzip a stream of chunks incrementally."""
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        
+        for chunk in chunks:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        
+        yield compressor.flush()
@@ -0,0 +1,117 @@
+"""Fragment service for caching rendered template fragments."""
+import time
+import zlib
+from typing import Dict, List
+from flask import current_app, render_template
+from markupsafe import Markup
+from app.cache import TTLCache
+from app.queue import get_redis_connection
+
+
+CARD_TEMPLATE = '_company_card.html'
+REDIS_KEY_PREFIX = 'fragment:company-card:'
+
+# Rendered company cards keyed by (company_id, data version, template digest)
+_card_cache = TTLCache(maxsize=4096)
+
+# Per-process time until which the Redis tier is skipped after a Redis error
+_redis_paused_until = 0.0
+
+
+class FragmentService:
+    """Service for per-company fragment caching of rendered dashboard cards."""
+    
+    @staticmethod
+    def render_company_cards(companies: List[Dict]) -> List[Markup]:
+        """
+        Render dashboard cards for a page of company summaries.
+        
+        Each card is cached per (company, data version), so a card is only
+        re-rendered after that company's data changes. The version comes
+        with the summary (same query as the counts), so a card is never
+        cached under a version newer than the data it shows. Lookups go to the
+        process-local LRU first, then (when FRAGMENT_CACHE_REDIS is set) to
+        Redis, where cards rendered by other processes are shared. The key
+        also includes a digest of the card template, so a deploy that
+        changes the markup never serves old cards.
+        
+        Args:
+            companies: Company summaries from DashboardService.get_company_summaries
+            
+        Returns:
+            List of rendered cards, in the same order as companies
+        """
+        ttl = current_app.config['FRAGMENT_CACHE_TTL']
+        if ttl <= 0:
+            return [Markup(render_template(CARD_TEMPLATE, company=company)) for company in companies]
+        
+        digest = FragmentService._template_digest()
+        keys = [(company['id'], company['data_version'], digest) for company in companies]
+        
+        cards = [_card_cache.get(key) for key in keys]
+        
+        misses = [position for position, card in enumerate(cards) if card is None]
+        if misses:
+            shared = FragmentService._redis_get([keys[position] for position in misses])
+            rendered = {}
+            for position in misses:
+                card = shared.get(keys[position])
+                if card is None:
+                    card = render_template(CARD_TEMPLATE, company=companies[position])
+                    rendered[keys[position]] = card
+                _card_cache.set(keys[position], card, ttl)
+                cards[position] = card
+            
+            FragmentService._redis_set(rendered, ttl)
+        
+        return [Markup(card) for card in cards]
+    
+    @staticmethod
+    def _template_digest() -> str:
+        """Get a short checksum of the card template source."""
+        source, _, _ = current_app.jinja_env.loader.get_source(current_app.jinja_env, CARD_TEMPLATE)
+        return format(zlib.crc32(source.encode('utf-8')), '08x')
+    
+    @staticmethod
+    def _redis_key(key: tuple) -> str:
+        company_id, version, digest = key
+        return f'{REDIS_KEY_PREFIX}{company_id}:{version}:{digest}'
+    
+    @staticmethod
+    def _redis_available() -> bool:
+        return current_app.config['FRAGMENT_CACHE_REDIS'] and time.monotonic() >= _redis_paused_until
+    
+    @staticmethod
+    def _redis_failed(e: Exception):
+        """Skip the Redis tier for FRAGMENT_CACHE_REDIS_BACKOFF seconds after an error."""
+        global _redis_paused_until
+        _redis_paused_until = time.monotonic() + current_app.config['FRAGMENT_CACHE_REDIS_BACKOFF']
+        print(f"Fragment cache Redis tier unavailable: {str(e)}")
+    
+    @staticmethod
+    def _redis_get(keys: List[tuple]) -> Dict[tuple, str]:
+        """Fetch cards from Redis with one MGET; empty when the tier is off or down."""
+        if not keys or not FragmentService._redis_available():
+            return {}
+        
+        try:
+            values = get_redis_connection().mget([FragmentService._redis_key(key) for key in keys])
+        except Exception as e:
+            FragmentService._redis_failed(e)
+            return {}
+        
+        return {key: value.decode('utf-8') for key, value in zip(keys, values) if value is not None}
+    
+    @staticmethod
+    def _redis_set(cards: Dict[tuple, str], ttl: float):
+        """Store freshly rendered cards in Redis with one pipelined round trip."""
+        if not cards or not FragmentService._redis_available():
+            return
+        
+        try:
+            pipeline = get_redis_connection().pipeline(transaction=False)
+            for key, card in cards.items():
+                pipeline.set(FragmentService._redis_key(key), card, ex=max(int(ttl), 1))
+            pipeline.execute()
+        except Exception as e:
+            FragmentService._redis_failed(e)
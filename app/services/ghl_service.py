@@ -1,7 +1,9 @@
 """GoHighLevel API integration service."""
+import time
 import requests
 from typing import Dict
 from flask import current_app
+from app.metrics import GHL_LATENCY
 from app.models import Lead, CompanyProfile
 
 
@@ -73,8 +75,10 @@ class GHLService:
         headers = self.headers.copy()
         headers['Location-Id'] = location_id
         
+        started = time.perf_counter()
         try:
             response = requests.post(url, json=contact_data, headers=headers, timeout=30)
+            GHL_LATENCY.labels(status=response.status_code).observe(time.perf_counter() - started)
             
             # Check for errors
             if response.status_code >= 400:
@@ -84,10 +88,13 @@ class GHLService:
             return response.json()
             
         except requests.exceptions.Timeout:
+            GHL_LATENCY.labels(status='timeout').observe(time.perf_counter() - started)
             raise Exception('GHL API request timed out')
         except requests.exceptions.ConnectionError:
+            GHL_LATENCY.labels(status='connection_error').observe(time.perf_counter() - started)
             raise Exception('Failed to connect to GHL API')
         except requests.exceptions.RequestException as e:
+            GHL_LATENCY.labels(status='error').observe(time.perf_counter() - started)
             raise Exception(f'GHL API request failed: {str(e)}')
     
     def handle_api_error(self, response) -> str:
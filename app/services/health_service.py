@@ -0,0 +1,190 @@
+"""Health service with cached background probing."""
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+from flask import current_app
+from app.extensions import db
+from app.queue import get_redis_connection, get_queue_backend
+
+
+class HealthProber:
+    """
+    Background thread that periodically probes the database, Redis and the
+    queue backend and caches the result.
+
+    Health endpoints read the cached result, so load-balancer probes never
+    open sockets or run queries themselves. A result older than
+    STALE_INTERVALS probe intervals is not trusted (the thread may have
+    died or hung).
+    """
+
+    STALE_INTERVALS = 3
+
+    def __init__(self, app, interval: float):
+        self.app = app
+        self.interval = interval
+        self._result = None
+        self._probed_at = None  # monotonic time of the last probe
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        """Start the probing thread (again, if it has died)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._loop, name='health-prober', daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        while True:
+            try:
+                self.probe()
+            except Exception as e:
+                print(f"Health probe failed: {str(e)}")
+            time.sleep(self.interval)
+
+    def probe(self) -> Dict:
+        """
+        Run all checks once and cache the result.
+
+        Returns:
+            Dictionary with probe results
+        """
+        result = {
+            'database': 'healthy',
+            'redis': 'healthy',
+            'queue_backend': None,
+            'queue_depth': None,
+            'queue_error': None,
+            'checked_at': None
+        }
+
+        with self.app.app_context():
+            try:
+                db.session.execute(db.text('SELECT 1'))
+            except Exception as e:
+                result['database'] = f'unhealthy: {str(e)}'
+            finally:
+                db.session.remove()
+
+            try:
+                get_redis_connection().ping()
+            except Exception as e:
+                result['redis'] = f'unavailable: {str(e)}'
+
+            result['queue_backend'] = self.app.config['QUEUE_BACKEND']
+            try:
+                result['queue_depth'] = get_queue_backend().depth()
+            except Exception as e:
+                result['queue_error'] = str(e)
+
+        result['checked_at'] = datetime.utcnow().isoformat()
+
+        previous = self._result
+        self._result = result
+        self._probed_at = time.monotonic()
+        if previous is None or previous['redis'] != result['redis'] or previous['database'] != result['database']:
+            print(f"Health probe: database={result['database']}, redis={result['redis']}")
+
+        return result
+
+    @property
+    def result(self) -> Optional[Dict]:
+        """Most recent probe result, or None before the first probe."""
+        return self._result
+
+    @property
+    def stale(self) -> bool:
+        """Whether there is no result or it is older than STALE_INTERVALS intervals."""
+        if self._probed_at is None:
+            return True
+        return time.monotonic() - self._probed_at > self.interval * self.STALE_INTERVALS
+
+
+class HealthService:
+    """Service for health and readiness checks."""
+
+    @staticmethod
+    def get_prober() -> HealthProber:
+        """
+        Get the application's health prober, starting it on first use.
+
+        Returns:
+            HealthProber instance
+        """
+        app = current_app._get_current_object()
+        prober = app.extensions.get('health_prober')
+        if prober is None:
+            prober = app.extensions.setdefault(
+                'health_prober',
+                HealthProber(app, app.config['HEALTH_PROBE_INTERVAL'])
+            )
+        prober.start()
+        return prober
+
+    @staticmethod
+    def get_probe_result() -> Dict:
+        """
+        Get the cached probe result, probing synchronously if there is
+        none yet or it is stale (get_prober restarts a dead probe thread).
+
+        Returns:
+            Dictionary with probe results
+        """
+        prober = HealthService.get_prober()
+        if prober.stale:
+            return prober.probe()
+        return prober.result
+
+    @staticmethod
+    def get_health() -> Dict:
+        """
+        Get liveness health status.
+
+        Redis is optional and does not affect the overall status.
+
+        Returns:
+            Dictionary with health status
+        """
+        result = HealthService.get_probe_result()
+        database_healthy = result['database'] == 'healthy'
+
+        return {
+            'status': 'healthy' if database_healthy else 'unhealthy',
+            'checks': {
+                'database': result['database'],
+                'redis': 'healthy' if result['redis'] == 'healthy' else 'unavailable (optional for testing)'
+            },
+            'checked_at': result['checked_at']
+        }
+
+    @staticmethod
+    def get_readiness() -> Dict:
+        """
+        Get readiness status including queue depth.
+
+        The instance is ready when the database is healthy and the
+        configured queue backend (or its fallback) can accept jobs.
+
+        Returns:
+            Dictionary with readiness status
+        """
+        result = HealthService.get_probe_result()
+        database_healthy = result['database'] == 'healthy'
+        queue_available = result['queue_error'] is None or bool(current_app.config.get('QUEUE_FALLBACK_BACKEND'))
+
+        return {
+            'status': 'ready' if database_healthy and queue_available else 'not ready',
+            'checks': {
+                'database': result['database'],
+                'redis': result['redis'],
+                'queue': {
+                    'backend': result['queue_backend'],
+                    'depth': result['queue_depth'],
+                    'error': result['queue_error']
+                }
+            },
+            'checked_at': result['checked_at']
+        }
@@ -0,0 +1,108 @@
+"""Latency service for lead processing timeline percentiles."""
+import math
+from datetime import datetime
+from typing import Dict, List, Optional
+from flask import current_app
+from app.db_utils import reporting_session
+from app.models import LeadProcessingLog
+from app.services.logging_service import TIMELINE_STAGES
+
+
+PERCENTILES = (50, 95, 99)
+
+# Stage name -> (start offset column, end offset column); None is the log's created_at
+STAGES = {
+    'enqueue': (None, 'enqueued_ms'),
+    'queue_wait': ('enqueued_ms', 'dequeued_ms'),
+    'setup': ('dequeued_ms', 'first_attempt_ms'),
+    'ghl': ('first_attempt_ms', 'ghl_response_ms'),  # includes retries and their backoff
+    'finalize': ('ghl_response_ms', 'completed_ms'),
+    'total': (None, 'completed_ms'),
+}
+
+TIMELINE_COLUMNS = tuple(f'{stage}_ms' for stage in TIMELINE_STAGES)
+
+
+def percentile(sorted_values: List[int], pct: float) -> Optional[int]:
+    """
+    Nearest-rank percentile of a sorted list.
+    
+    Args:
+        sorted_values: Values in ascending order
+        pct: Percentile (0-100)
+        
+    Returns:
+        The percentile value, or None for an empty list
+    """
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class LatencyService:
+    """Service for end-to-end and per-stage processing latency."""
+    
+    @staticmethod
+    def get_percentiles(company_id: int, start_date: datetime, end_date: datetime,
+                        status: Optional[str] = None) -> Dict:
+        """
+        Compute latency percentiles for a company's finished leads.
+        
+        Reads only the timeline offsets of logs created in the range (via
+        the company/created_at index), newest first and at most
+        LATENCY_REPORT_MAX_ROWS of them. Logs without a timeline (finished
+        before timelines were recorded, or archived) are not counted.
+        
+        Args:
+            company_id: The company ID
+            start_date: Range start (log created_at)
+            end_date: Range end (log created_at)
+            status: Only logs that ended in this status ('success' or 'failed')
+            
+        Returns:
+            Dictionary with count, truncated, and per stage the count and
+            p50/p95/p99 in milliseconds
+        """
+        max_rows = current_app.config['LATENCY_REPORT_MAX_ROWS']
+        
+        query = reporting_session().query(
+            *[getattr(LeadProcessingLog, column) for column in TIMELINE_COLUMNS]
+        ).filter(
+            LeadProcessingLog.company_id == company_id,
+            LeadProcessingLog.created_at >= start_date,
+            LeadProcessingLog.created_at <= end_date,
+            LeadProcessingLog.completed_ms.isnot(None)
+        )
+        if status is not None:
+            query = query.filter(LeadProcessingLog.status == status)
+        
+        rows = query.order_by(
+            LeadProcessingLog.created_at.desc(), LeadProcessingLog.id.desc()
+        ).limit(max_rows + 1).all()
+        
+        truncated = len(rows) > max_rows
+        rows = rows[:max_rows]
+        
+        durations = {stage: [] for stage in STAGES}
+        for row in rows:
+            offsets = dict(zip(TIMELINE_COLUMNS, row))
+            for stage, (start_column, end_column) in STAGES.items():
+                start = 0 if start_column is None else offsets[start_column]
+                end = offsets[end_column]
+                if start is not None and end is not None:
+                    durations[stage].append(max(0, end - start))
+        
+        stages = {}
+        for stage, values in durations.items():
+            values.sort()
+            stages[stage] = {
+                'count': len(values),
+                **{f'p{pct}': percentile(values, pct) for pct in PERCENTILES}
+            }
+        
+        return {
+            'count': len(rows),
+            'truncated': truncated,
+            'stages': stages
+        }
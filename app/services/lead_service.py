@@ -2,11 +2,15 @@
 from typing import Optional, List, Dict
 import csv
 import io
-from flask import current_app
+import time
 from app.extensions import db
-from app.models import Lead
+from app.db_utils import reporting_session
+from app.models import ArchivedLeadProcessingLog, Lead, LeadProcessingLog
+from app.pagination import keyset_page
 from app.services.validation import validate_lead_data, validate_company_exists
-from app.queue import get_queue
+from app.services.logging_service import LoggingService
+from app.services.version_service import VersionService
+from app.queue import defer_job, enqueue_job, fetch_job_statuses
 from app.jobs.process_lead import process_lead_job
 
 
@@ -44,6 +48,7 @@ class LeadService:
         
         try:
             db.session.add(lead)
+            VersionService.bump(lead.company_id)
             db.session.commit()
             return lead, None
         except Exception as e:
@@ -51,31 +56,155 @@ class LeadService:
             return None, {'database': [f'An error occurred while saving the lead: {str(e)}']}
     
     @staticmethod
-    def enqueue_lead(lead: Lead) -> str:
+    def enqueue_lead(lead: Lead, defer: bool = False) -> str:
         """
         Enqueue a lead for processing.
         
         Args:
             lead: The lead to enqueue
+            defer: Hold the job in the deferred queue until the queue drains
             
         Returns:
-            Job ID (or 'sync' for synchronous processing)
+            Job ID
+            
+        Raises:
+            Exception: If neither the primary nor the fallback queue backend accepts the job
         """
-        # For testing without Redis, just return a fake job ID
-        # In production, this would use Redis queue
-        try:
-            queue = get_queue()
-            job = queue.enqueue(
-                process_lead_job,
-                lead.id,
-                job_timeout=current_app.config['JOB_TIMEOUT'],
-                result_ttl=current_app.config['JOB_RESULT_TTL']
-            )
-            return job.id
-        except Exception as e:
-            # If Redis is not available, return a fake job ID for testing
-            print(f"Redis not available, skipping queue: {str(e)}")
-            return f"test-job-{lead.id}"
+        # The enqueue time travels with the job; the worker stores it in the log's timeline
+        if defer:
+            return defer_job(process_lead_job, lead.id, time.time())
+        return enqueue_job(process_lead_job, lead.id, time.time())
+    
+    @staticmethod
+    def get_leads_page(company_id: int, filters: Optional[Dict] = None, cursor: Optional[str] = None,
+                       limit: Optional[int] = None) -> tuple[List[Dict], Optional[str]]:
+        """
+        Get one page of a company's leads with their processing status, newest first.
+        
+        Uses keyset pagination on (created_at, id) and selects plain columns
+        instead of model instances.
+        
+        Args:
+            company_id: The company ID
+            filters: Optional dictionary with filter criteria
+                - status: Filter by processing status
+                - start_date: Filter by created_at >= start_date
+                - end_date: Filter by created_at <= end_date
+            cursor: Cursor from the previous page
+            limit: Page size
+            
+        Returns:
+            Tuple of (lead dictionaries, next_cursor)
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        query = reporting_session().query(
+            Lead.id,
+            Lead.name,
+            Lead.phone,
+            Lead.notes,
+            Lead.created_at,
+            LeadProcessingLog.status,
+            LeadProcessingLog.ghl_contact_id
+        ).outerjoin(
+            LeadProcessingLog, LeadProcessingLog.lead_id == Lead.id
+        ).filter(Lead.company_id == company_id)
+        
+        if filters:
+            if 'status' in filters:
+                query = query.filter(LeadProcessingLog.status == filters['status'])
+            
+            if 'start_date' in filters:
+                query = query.filter(Lead.created_at >= filters['start_date'])
+            
+            if 'end_date' in filters:
+                query = query.filter(Lead.created_at <= filters['end_date'])
+        
+        rows, next_cursor = keyset_page(query, Lead.created_at, Lead.id, cursor, limit)
+        
+        leads = []
+        for row in rows:
+            lead = dict(row._mapping)
+            lead['created_at'] = lead['created_at'].isoformat() if lead['created_at'] else None
+            leads.append(lead)
+        
+        return leads, next_cursor
+    
+    @staticmethod
+    def get_statuses(job_ids: List[str], lead_ids: List[int], company_id: Optional[int] = None) -> Dict[str, Dict]:
+        """
+        Resolve the state of many jobs and leads at once.
+        
+        Jobs are fetched with one round trip per queue backend (a single
+        pipeline for RQ), and every lead, whether requested directly or
+        found in a job's arguments, is resolved with one IN query on
+        lead_processing_logs. Leads not found there are looked up in the
+        archive.
+        
+        Args:
+            job_ids: Job IDs returned by the upload endpoints
+            lead_ids: Lead IDs
+            company_id: Only report jobs and leads of this company
+            
+        Returns:
+            Dictionary with 'jobs' (job ID -> {state, lead_id}) and
+            'leads' (lead ID -> {status, attempts, ghl_contact_id, error, updated_at})
+        """
+        jobs = {}
+        wanted_leads = set(lead_ids)
+        
+        for job_id, job in fetch_job_statuses(job_ids).items():
+            if job is None:
+                jobs[job_id] = {'state': 'not_found', 'lead_id': None}
+                continue
+            
+            lead_id = job['args'][0] if job['args'] else None
+            jobs[job_id] = {'state': job['status'], 'lead_id': lead_id}
+            if isinstance(lead_id, int):
+                wanted_leads.add(lead_id)
+        
+        leads = {}
+        missing = set(wanted_leads)
+        for log_model in (LeadProcessingLog, ArchivedLeadProcessingLog):
+            if not missing:
+                break
+            
+            query = db.session.query(
+                log_model.lead_id,
+                log_model.status,
+                log_model.attempt_count,
+                log_model.ghl_contact_id,
+                log_model.error_message,
+                log_model.updated_at
+            ).filter(log_model.lead_id.in_(missing))
+            if company_id is not None:
+                query = query.filter(log_model.company_id == company_id)
+            rows = query.all()
+            
+            for lead_id, status, attempt_count, ghl_contact_id, error_message, updated_at in rows:
+                leads[lead_id] = {
+                    'status': status,
+                    'attempts': attempt_count,
+                    'ghl_contact_id': ghl_contact_id,
+                    'error': error_message,
+                    'updated_at': updated_at.isoformat() if updated_at else None
+                }
+                missing.discard(lead_id)
+        
+        for lead_id in missing:
+            leads[lead_id] = {'status': 'not_found'}
+        
+        if company_id is not None:
+            # Hide jobs for other companies' leads
+            for job_id, job in jobs.items():
+                if job['lead_id'] in missing:
+                    jobs[job_id] = {'state': 'not_found', 'lead_id': None}
+            requested = set(lead_ids)
+            leads = {lead_id: lead for lead_id, lead in leads.items()
+                     if lead_id in requested or lead['status'] != 'not_found'}
+        
+        return {'jobs': jobs, 'leads': leads}
     
     @staticmethod
     def parse_csv(file_content: str, company_id: int) -> Dict[str, any]:
@@ -153,19 +282,21 @@ class LeadService:
             }
     
     @staticmethod
-    def create_and_enqueue_leads(leads_data: List[dict]) -> Dict[str, any]:
+    def create_and_enqueue_leads(leads_data: List[dict], defer: bool = False) -> Dict[str, any]:
         """
         Create multiple leads and enqueue them for processing.
         
         Args:
             leads_data: List of lead data dictionaries
+            defer: Hold the jobs in the deferred queue until the queue drains
             
         Returns:
-            Dictionary with results
+            Dictionary with results ('deferred' counts jobs held for later)
         """
         results = {
             'created': 0,
             'enqueued': 0,
+            'deferred': 0,
             'failed': 0,
             'job_ids': []
         }
@@ -175,9 +306,10 @@ class LeadService:
             
             if lead:
                 results['created'] += 1
+                LoggingService.create_log(lead.id, lead.company_id)
                 try:
-                    job_id = LeadService.enqueue_lead(lead)
-                    results['enqueued'] += 1
+                    job_id = LeadService.enqueue_lead(lead, defer=defer)
+                    results['deferred' if defer else 'enqueued'] += 1
                     results['job_ids'].append(job_id)
                 except Exception as e:
                     results['failed'] += 1
@@ -2,12 +2,39 @@
 from typing import List, Optional, Dict
 from datetime import datetime
 from app.extensions import db
+from app.db_utils import reporting_session
 from app.models import LeadProcessingLog
+from app.pagination import keyset_page
+from app.services.counter_service import CounterService
+from app.services.event_service import EventService
+from app.services.rollup_service import RollupService
+from app.services.version_service import VersionService
+
+
+TIMELINE_STAGES = ('enqueued', 'dequeued', 'first_attempt', 'ghl_response', 'completed')
+
+# Largest offset an Integer column holds (about 24.8 days)
+MAX_OFFSET_MS = 2 ** 31 - 1
 
 
 class LoggingService:
     """Service for lead processing log operations."""
     
+    @staticmethod
+    def offset_ms(created_at: datetime, when: datetime) -> int:
+        """
+        Convert a timestamp to a timeline offset.
+        
+        Args:
+            created_at: The log's created_at
+            when: Timestamp of the stage
+            
+        Returns:
+            Milliseconds after created_at, clamped to the column's range
+        """
+        offset = int((when - created_at).total_seconds() * 1000)
+        return max(0, min(offset, MAX_OFFSET_MS))
+    
     @staticmethod
     def create_log(lead_id: int, company_id: int) -> LeadProcessingLog:
         """
@@ -28,8 +55,13 @@ class LoggingService:
         )
         
         db.session.add(log)
+        CounterService.increment(company_id, 'pending')
+        RollupService.record(company_id, 'pending')
+        version = VersionService.bump(company_id)
         db.session.commit()
         
+        EventService.publish_transition(company_id, lead_id, None, 'pending', version)
+        
         return log
     
     @staticmethod
@@ -40,8 +72,10 @@ class LoggingService:
         Args:
             log_id: The log ID
             status: New status (pending, processing, success, failed)
-            **kwargs: Additional fields to update (worker_id, ghl_contact_id, error_message, attempt_count)
-            
+            **kwargs: Additional fields to update (worker_id, ghl_contact_id, error_message, attempt_count),
+                ghl_latency_ms (total GHL call time, recorded in rollups only) and timeline
+                (dictionary of TIMELINE_STAGES stage to datetime, stored as offsets)
+                
         Returns:
             Updated LeadProcessingLog instance
         """
@@ -50,6 +84,7 @@ class LoggingService:
         if not log:
             raise ValueError(f"Log with id {log_id} not found")
         
+        old_status = log.status
         log.status = status
         log.updated_at = datetime.utcnow()
         
@@ -66,8 +101,28 @@ class LoggingService:
         if 'attempt_count' in kwargs:
             log.attempt_count = kwargs['attempt_count']
         
+        for stage, when in kwargs.get('timeline', {}).items():
+            if stage not in TIMELINE_STAGES:
+                raise ValueError(f"Unknown timeline stage: {stage}")
+            if when is not None:
+                setattr(log, f'{stage}_ms', LoggingService.offset_ms(log.created_at, when))
+        
+        # Keep per-company counters, rollups and data version in the same transaction
+        if old_status != status:
+            CounterService.transition(log.company_id, old_status, status)
+            RollupService.record(
+                log.company_id,
+                status,
+                attempt_count=log.attempt_count,
+                ghl_latency_ms=kwargs.get('ghl_latency_ms', 0)
+            )
+        version = VersionService.bump(log.company_id)
+        
         db.session.commit()
         
+        if old_status != status:
+            EventService.publish_transition(log.company_id, log.lead_id, old_status, status, version)
+        
         return log
     
     @staticmethod
@@ -85,7 +140,7 @@ class LoggingService:
         Returns:
             List of LeadProcessingLog instances
         """
-        query = db.session.query(LeadProcessingLog).filter_by(company_id=company_id)
+        query = reporting_session().query(LeadProcessingLog).filter_by(company_id=company_id)
         
         if filters:
             if 'status' in filters:
@@ -99,6 +154,62 @@ class LoggingService:
         
         return query.order_by(LeadProcessingLog.created_at.desc()).all()
     
+    @staticmethod
+    def get_logs_page(company_id: int, filters: Optional[Dict] = None, cursor: Optional[str] = None,
+                      limit: Optional[int] = None) -> tuple[List[Dict], Optional[str]]:
+        """
+        Get one page of a company's logs, newest first.
+        
+        Uses keyset pagination on (created_at, id) and selects plain columns
+        instead of model instances.
+        
+        Args:
+            company_id: The company ID
+            filters: Optional dictionary with filter criteria (status, start_date, end_date)
+            cursor: Cursor from the previous page
+            limit: Page size
+            
+        Returns:
+            Tuple of (log dictionaries, next_cursor)
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        query = reporting_session().query(
+            LeadProcessingLog.id,
+            LeadProcessingLog.lead_id,
+            LeadProcessingLog.status,
+            LeadProcessingLog.worker_id,
+            LeadProcessingLog.ghl_contact_id,
+            LeadProcessingLog.error_message,
+            LeadProcessingLog.attempt_count,
+            LeadProcessingLog.created_at,
+            LeadProcessingLog.updated_at
+        ).filter(LeadProcessingLog.company_id == company_id)
+        
+        if filters:
+            if 'status' in filters:
+                query = query.filter(LeadProcessingLog.status == filters['status'])
+            
+            if 'start_date' in filters:
+                query = query.filter(LeadProcessingLog.created_at >= filters['start_date'])
+            
+            if 'end_date' in filters:
+                query = query.filter(LeadProcessingLog.created_at <= filters['end_date'])
+        
+        rows, next_cursor = keyset_page(
+            query, LeadProcessingLog.created_at, LeadProcessingLog.id, cursor, limit
+        )
+        
+        logs = []
+        for row in rows:
+            log = dict(row._mapping)
+            log['created_at'] = log['created_at'].isoformat() if log['created_at'] else None
+            log['updated_at'] = log['updated_at'].isoformat() if log['updated_at'] else None
+            logs.append(log)
+        
+        return logs, next_cursor
+    
     @staticmethod
     def get_log_by_lead(lead_id: int) -> Optional[LeadProcessingLog]:
         """
@@ -0,0 +1,193 @@
+"""Retention service for archiving old leads and logs."""
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, exists, insert, literal, select
+from app.extensions import db
+from app.db_utils import reporting_session
+from app.models import (ArchivedLead, ArchivedLeadProcessingLog, CompanyProfile, Lead,
+                        LeadProcessingLog, RetentionPolicy)
+from app.pagination import keyset_page
+from app.services.version_service import VersionService
+
+
+LEAD_COLUMNS = ('id', 'company_id', 'name', 'phone', 'notes', 'created_at')
+LOG_COLUMNS = ('id', 'lead_id', 'company_id', 'status', 'worker_id', 'ghl_contact_id',
+               'error_message', 'attempt_count', 'created_at', 'updated_at')
+
+
+class RetentionService:
+    """Service for per-company retention policies and archival."""
+    
+    @staticmethod
+    def get_retention_days(company_id: int) -> int:
+        """
+        Get a company's retention period.
+        
+        Args:
+            company_id: The company ID
+            
+        Returns:
+            Days to keep leads in the hot tables (0 keeps them forever)
+        """
+        days = db.session.query(RetentionPolicy.retention_days).filter_by(company_id=company_id).scalar()
+        return current_app.config['RETENTION_DEFAULT_DAYS'] if days is None else days
+    
+    @staticmethod
+    def set_policy(company_id: int, data: dict) -> tuple[Optional[RetentionPolicy], Optional[dict]]:
+        """
+        Set a company's retention period.
+        
+        Args:
+            company_id: The company ID
+            data: Dictionary with retention_days (0 keeps leads forever)
+            
+        Returns:
+            Tuple of (RetentionPolicy, error_dict)
+        """
+        retention_days = data.get('retention_days')
+        if isinstance(retention_days, bool) or not isinstance(retention_days, int) or retention_days < 0:
+            return None, {'retention_days': ['retention_days must be a non-negative integer']}
+        
+        if not db.session.query(exists().where(CompanyProfile.id == company_id)).scalar():
+            return None, {'company_id': ['Company not found']}
+        
+        policy = db.session.query(RetentionPolicy).filter_by(company_id=company_id).first()
+        if policy:
+            policy.retention_days = retention_days
+        else:
+            policy = RetentionPolicy(company_id=company_id, retention_days=retention_days)
+            db.session.add(policy)
+        
+        db.session.commit()
+        
+        return policy, None
+    
+    @staticmethod
+    def archive_company(company_id: int, now: Optional[datetime] = None) -> int:
+        """
+        Move a company's leads older than its retention period, with their
+        logs, into the archive tables.
+        
+        Leads are moved in batches of RETENTION_BATCH_SIZE, one short
+        transaction per batch. Leads still pending or processing are left
+        in place. Status counters and rollups are not changed, so totals
+        and charts still include archived history.
+        
+        Args:
+            company_id: The company ID
+            now: Reference time (defaults to now)
+            
+        Returns:
+            Number of leads archived
+        """
+        retention_days = RetentionService.get_retention_days(company_id)
+        if retention_days <= 0:
+            return 0
+        
+        cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+        batch_size = current_app.config['RETENTION_BATCH_SIZE']
+        in_flight = exists().where(
+            LeadProcessingLog.lead_id == Lead.id,
+            LeadProcessingLog.status.in_(('pending', 'processing'))
+        )
+        
+        archived = 0
+        while True:
+            lead_ids = [lead_id for lead_id, in db.session.query(Lead.id).filter(
+                Lead.company_id == company_id,
+                Lead.created_at < cutoff,
+                ~in_flight
+            ).order_by(Lead.created_at, Lead.id).limit(batch_size).all()]
+            
+            if not lead_ids:
+                break
+            
+            archived_at = literal(datetime.utcnow())
+            db.session.execute(insert(ArchivedLead).from_select(
+                [*LEAD_COLUMNS, 'archived_at'],
+                select(*[getattr(Lead, column) for column in LEAD_COLUMNS], archived_at).where(Lead.id.in_(lead_ids))
+            ))
+            db.session.execute(insert(ArchivedLeadProcessingLog).from_select(
+                [*LOG_COLUMNS, 'archived_at'],
+                select(*[getattr(LeadProcessingLog, column) for column in LOG_COLUMNS], archived_at).where(
+                    LeadProcessingLog.lead_id.in_(lead_ids)
+                )
+            ))
+            db.session.execute(delete(LeadProcessingLog).where(LeadProcessingLog.lead_id.in_(lead_ids)))
+            db.session.execute(delete(Lead).where(Lead.id.in_(lead_ids)))
+            VersionService.bump(company_id)
+            db.session.commit()
+            
+            archived += len(lead_ids)
+        
+        return archived
+    
+    @staticmethod
+    def archive_all(now: Optional[datetime] = None) -> int:
+        """
+        Apply retention to every company with a non-zero retention period.
+        
+        Args:
+            now: Reference time (defaults to now)
+            
+        Returns:
+            Number of leads archived
+        """
+        policies = dict(db.session.query(RetentionPolicy.company_id, RetentionPolicy.retention_days).all())
+        default_days = current_app.config['RETENTION_DEFAULT_DAYS']
+        
+        if default_days > 0:
+            company_ids = [company_id for company_id, in db.session.query(CompanyProfile.id).all()]
+        else:
+            company_ids = list(policies)
+        
+        archived = 0
+        for company_id in company_ids:
+            if policies.get(company_id, default_days) > 0:
+                archived += RetentionService.archive_company(company_id, now)
+        
+        return archived
+    
+    @staticmethod
+    def get_archived_leads_page(company_id: int, cursor: Optional[str] = None,
+                                limit: Optional[int] = None) -> tuple[List[Dict], Optional[str]]:
+        """
+        Get one page of a company's archived leads with their final status, newest first.
+        
+        Args:
+            company_id: The company ID
+            cursor: Cursor from the previous page
+            limit: Page size
+            
+        Returns:
+            Tuple of (archived lead dictionaries, next_cursor)
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        query = reporting_session().query(
+            ArchivedLead.id,
+            ArchivedLead.name,
+            ArchivedLead.phone,
+            ArchivedLead.notes,
+            ArchivedLead.created_at,
+            ArchivedLead.archived_at,
+            ArchivedLeadProcessingLog.status,
+            ArchivedLeadProcessingLog.ghl_contact_id,
+            ArchivedLeadProcessingLog.error_message,
+            ArchivedLeadProcessingLog.attempt_count
+        ).outerjoin(
+            ArchivedLeadProcessingLog, ArchivedLeadProcessingLog.lead_id == ArchivedLead.id
+        ).filter(ArchivedLead.company_id == company_id)
+        
+        rows, next_cursor = keyset_page(query, ArchivedLead.created_at, ArchivedLead.id, cursor, limit)
+        
+        leads = []
+        for row in rows:
+            lead = dict(row._mapping)
+            lead['created_at'] = lead['created_at'].isoformat() if lead['created_at'] else None
+            lead['archived_at'] = lead['archived_at'].isoformat() if lead['archived_at'] else None
+            leads.append(lead)
+        
+        return leads, next_cursor
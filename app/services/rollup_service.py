@@ -0,0 +1,180 @@
+"""Rollup service for time-series lead outcome buckets."""
+import itertools
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.db_utils import reporting_session, upsert_increment
+from app.models import ArchivedLeadProcessingLog, LeadOutcomeRollup, LeadProcessingLog
+
+
+GRANULARITIES = {
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+}
+
+TERMINAL_STATUSES = ('success', 'failed')
+
+
+def bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    """Truncate a timestamp to the start of its hour or day bucket."""
+    if granularity == 'hour':
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class RollupService:
+    """Service for hourly and daily lead outcome rollups."""
+    
+    MAX_BUCKETS = 2400
+    
+    @staticmethod
+    def record(company_id: int, status: str, attempt_count: int = 0,
+               ghl_latency_ms: int = 0, timestamp: Optional[datetime] = None):
+        """
+        Record a log entering a status in the hour and day buckets.
+        
+        Joins the current transaction; the caller commits together with
+        the log change that caused it.
+        
+        Args:
+            company_id: The company ID
+            status: Status the log entered
+            attempt_count: GHL attempts made (terminal statuses only)
+            ghl_latency_ms: Total GHL call time in milliseconds (terminal statuses only)
+            timestamp: Event time (defaults to now)
+        """
+        timestamp = timestamp or datetime.utcnow()
+        
+        increments = {f'{status}_count': 1}
+        if status in TERMINAL_STATUSES:
+            increments['attempt_count'] = attempt_count
+            increments['ghl_latency_ms'] = ghl_latency_ms
+        
+        for granularity in GRANULARITIES:
+            upsert_increment(
+                LeadOutcomeRollup,
+                {
+                    'company_id': company_id,
+                    'granularity': granularity,
+                    'bucket_start': bucket_start(timestamp, granularity)
+                },
+                increments
+            )
+    
+    @staticmethod
+    def get_range(company_id: int, granularity: str, start_date: datetime, end_date: datetime) -> List[Dict]:
+        """
+        Get buckets for a company and time range, with empty buckets filled in.
+        
+        Reads at most one row per bucket, so cost depends on the number of
+        buckets rather than the number of leads.
+        
+        Args:
+            company_id: The company ID
+            granularity: 'hour' or 'day'
+            start_date: Range start (inclusive)
+            end_date: Range end (inclusive)
+            
+        Returns:
+            List of bucket dictionaries in chronological order
+            
+        Raises:
+            ValueError: If the granularity is unknown or the range is too large
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"granularity must be one of: {', '.join(GRANULARITIES)}")
+        
+        step = GRANULARITIES[granularity]
+        first = bucket_start(start_date, granularity)
+        last = bucket_start(end_date, granularity)
+        
+        if last < first:
+            raise ValueError('end_date must be after start_date')
+        if (last - first) // step + 1 > RollupService.MAX_BUCKETS:
+            raise ValueError(f'Range too large: at most {RollupService.MAX_BUCKETS} {granularity} buckets')
+        
+        rows = reporting_session().query(LeadOutcomeRollup).filter(
+            LeadOutcomeRollup.company_id == company_id,
+            LeadOutcomeRollup.granularity == granularity,
+            LeadOutcomeRollup.bucket_start >= first,
+            LeadOutcomeRollup.bucket_start <= last
+        ).all()
+        by_start = {row.bucket_start: row for row in rows}
+        
+        buckets = []
+        current = first
+        while current <= last:
+            row = by_start.get(current)
+            if row:
+                buckets.append(row.to_dict())
+            else:
+                buckets.append(LeadOutcomeRollup(
+                    bucket_start=current,
+                    pending_count=0,
+                    processing_count=0,
+                    success_count=0,
+                    failed_count=0,
+                    attempt_count=0,
+                    ghl_latency_ms=0
+                ).to_dict())
+            current += step
+        
+        return buckets
+    
+    @staticmethod
+    def rebuild(company_id: int) -> int:
+        """
+        Rebuild a company's buckets from hot and archived processing logs.
+        
+        Used to backfill history recorded before rollups existed. Logs are
+        bucketed by created_at (pending) and updated_at (current status);
+        GHL latency is not stored on logs and is left at zero.
+        
+        Args:
+            company_id: The company ID
+            
+        Returns:
+            Number of logs replayed
+        """
+        db.session.query(LeadOutcomeRollup).filter_by(company_id=company_id).delete()
+        
+        totals = {}
+        rows = itertools.chain.from_iterable(
+            db.session.query(
+                log_model.status,
+                log_model.attempt_count,
+                log_model.created_at,
+                log_model.updated_at
+            ).filter_by(company_id=company_id).yield_per(1000)
+            for log_model in (LeadProcessingLog, ArchivedLeadProcessingLog)
+        )
+        
+        replayed = 0
+        for status, attempt_count, created_at, updated_at in rows:
+            replayed += 1
+            events = [('pending', created_at)]
+            if status != 'pending':
+                events.append((status, updated_at))
+            
+            for event_status, timestamp in events:
+                for granularity in GRANULARITIES:
+                    bucket = totals.setdefault(
+                        (granularity, bucket_start(timestamp, granularity)),
+                        {'pending_count': 0, 'processing_count': 0, 'success_count': 0,
+                         'failed_count': 0, 'attempt_count': 0, 'ghl_latency_ms': 0}
+                    )
+                    bucket[f'{event_status}_count'] += 1
+                    if event_status in TERMINAL_STATUSES:
+                        bucket['attempt_count'] += attempt_count
+        
+        for (granularity, start), counts in totals.items():
+            db.session.add(LeadOutcomeRollup(
+                company_id=company_id,
+                granularity=granularity,
+                bucket_start=start,
+                **counts
+            ))
+        
+        db.session.commit()
+        
+        return replayed
@@ -0,0 +1,62 @@
+"""Version service for per-company data versions."""
+from typing import Dict, List
+from app.extensions import db
+from app.db_utils import reporting_session, upsert_increment
+from app.models import CompanyDataVersion
+
+
+class VersionService:
+    """Service for per-company data versions used in ETags and cache keys."""
+    
+    @staticmethod
+    def bump(company_id: int) -> int:
+        """
+        Increment a company's data version.
+        
+        Joins the current transaction; the caller commits together with
+        the data change that caused it.
+        
+        Args:
+            company_id: The company ID
+            
+        Returns:
+            The new version, which identifies this change (the row stays
+            locked until the caller commits)
+        """
+        upsert_increment(CompanyDataVersion, {'company_id': company_id}, {'version': 1})
+        return db.session.query(CompanyDataVersion.version).filter_by(company_id=company_id).scalar()
+    
+    @staticmethod
+    def get(company_id: int) -> int:
+        """
+        Get a company's current data version.
+        
+        Read through the reporting session, so ETags and cached dashboard
+        statistics always come from the same database.
+        
+        Args:
+            company_id: The company ID
+            
+        Returns:
+            Version number (0 if the company has no data yet)
+        """
+        version = reporting_session().query(CompanyDataVersion.version).filter_by(company_id=company_id).scalar()
+        return version or 0
+    
+    @staticmethod
+    def get_many(company_ids: List[int]) -> Dict[int, int]:
+        """
+        Get the current data versions of several companies in one query.
+        
+        Args:
+            company_ids: List of company IDs
+            
+        Returns:
+            Dictionary mapping company ID to version (companies without data are omitted)
+        """
+        if not company_ids:
+            return {}
+        
+        return dict(reporting_session().query(CompanyDataVersion.company_id, CompanyDataVersion.version).filter(
+            CompanyDataVersion.company_id.in_(company_ids)
+        ).all())
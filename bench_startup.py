@@ -0,0 +1,72 @@
+"""Startup time benchmark for the app factory.
+
+Each run boots a fresh interpreter, imports the app and calls create_app,
+so the numbers match a cold start during a deploy or autoscaling event.
+
+Usage:
+    python bench_startup.py            # 5 runs per role
+    python bench_startup.py 10         # 10 runs per role
+    python bench_startup.py 5 --imports  # also list the slowest imports
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+
+BOOT = (
+    "import time; started = time.perf_counter(); "
+    "from app.app import create_app; imported = time.perf_counter(); "
+    "create_app(role='{role}'); finished = time.perf_counter(); "
+    "print(imported - started, finished - imported)"
+)
+
+
+def boot(role: str, importtime: bool = False):
+    """
+    Boot the app once in a new interpreter.
+    
+    Args:
+        role: App role to create
+        importtime: Run with -X importtime and return its report
+        
+    Returns:
+        Tuple of (import_seconds, create_seconds, total_seconds, importtime_report)
+    """
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-c', BOOT.format(role=role)]
+    
+    env = dict(os.environ, FLASK_ENV=os.getenv('FLASK_ENV', 'production'))
+    result = subprocess.run(command, capture_output=True, text=True, env=env, check=True)
+    import_seconds, create_seconds = (float(value) for value in result.stdout.split()[-2:])
+    
+    return import_seconds, create_seconds, import_seconds + create_seconds, result.stderr
+
+
+def slowest_imports(report: str, count: int = 15):
+    """Get the modules with the largest cumulative import time from a -X importtime report."""
+    rows = []
+    for line in report.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = (part.strip() for part in line[len('import time:'):].split('|'))
+        rows.append((int(cumulative), module.strip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+if __name__ == '__main__':
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 5
+    
+    print(f"{'role':<8} {'import ms':>10} {'create ms':>10} {'total ms':>10}  (median of {runs} runs)")
+    for role in ('web', 'worker'):
+        timings = [boot(role)[:3] for _ in range(runs)]
+        medians = [statistics.median(column) * 1000 for column in zip(*timings)]
+        print(f"{role:<8} {medians[0]:>10.1f} {medians[1]:>10.1f} {medians[2]:>10.1f}")
+    
+    if '--imports' in sys.argv:
+        for role in ('web', 'worker'):
+            print(f"\nSlowest imports ({role}, cumulative ms):")
+            for microseconds, module in slowest_imports(boot(role, importtime=True)[3]):
+                print(f"  {microseconds / 1000:>8.1f}  {module}")
@@ -13,13 +13,21 @@ class Config:
     # Database
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///roofing_leads.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    AUTO_CREATE_TABLES = os.getenv('AUTO_CREATE_TABLES', 'false').lower() == 'true'  # create_all on boot; deploys run `flask create-tables`
     SQLALCHEMY_ENGINE_OPTIONS = {
         'pool_pre_ping': True,
         'pool_recycle': 300,
     }
     
+    # Optional read replica for reporting and listing queries
+    SQLALCHEMY_BINDS = {'replica': os.getenv('DATABASE_REPLICA_URL')} if os.getenv('DATABASE_REPLICA_URL') else {}
+    REPLICA_MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', 10))  # staler replicas fall back to the primary
+    REPLICA_CHECK_INTERVAL = float(os.getenv('REPLICA_CHECK_INTERVAL', 5))  # seconds between lag checks
+    
     # Redis
     REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    REDIS_MAX_CONNECTIONS = int(os.getenv('REDIS_MAX_CONNECTIONS', 50))
+    REDIS_CONNECT_TIMEOUT = float(os.getenv('REDIS_CONNECT_TIMEOUT', 2))  # seconds
     
     # GoHighLevel
     GHL_API_KEY = os.getenv('GHL_API_KEY', '')
@@ -27,17 +35,87 @@ class Config:
     
     # API Authentication
     API_KEY_SALT = os.getenv('API_KEY_SALT', 'default-salt-change-in-production')
+    API_KEY_CACHE_TTL = float(os.getenv('API_KEY_CACHE_TTL', 60))  # seconds, also how long revoked keys stay valid elsewhere
+    API_KEYS_ALLOW_UNREGISTERED = os.getenv('API_KEYS_ALLOW_UNREGISTERED', 'false').lower() == 'true'  # accept any non-empty key
+    
+    # API Rate Limits (per key, sliding window shared through Redis)
+    RATE_LIMIT_WINDOW = int(os.getenv('RATE_LIMIT_WINDOW', 60))  # seconds
+    RATE_LIMIT_REQUESTS = int(os.getenv('RATE_LIMIT_REQUESTS', 120))  # requests per window, 0 disables
+    RATE_LIMIT_ROWS = int(os.getenv('RATE_LIMIT_ROWS', 10000))  # lead rows per window, 0 disables
+    RATE_LIMIT_REDIS_BACKOFF = float(os.getenv('RATE_LIMIT_REDIS_BACKOFF', 30))  # seconds of per-process limits after a Redis error
     
     # Worker Configuration
     WORKER_COUNT = int(os.getenv('WORKER_COUNT', 4))
     
+    # Health Checks
+    HEALTH_PROBE_INTERVAL = float(os.getenv('HEALTH_PROBE_INTERVAL', 5))  # seconds
+    
+    # Dashboard
+    DASHBOARD_CACHE_TTL = float(os.getenv('DASHBOARD_CACHE_TTL', 5))  # seconds, 0 disables
+    GLOBAL_COUNTS_CACHE_TTL = float(os.getenv('GLOBAL_COUNTS_CACHE_TTL', 60))  # seconds, landing page totals
+    EXACT_COUNT_THRESHOLD = int(os.getenv('EXACT_COUNT_THRESHOLD', 100000))  # larger tables use planner estimates (PostgreSQL)
+    FRAGMENT_CACHE_TTL = float(os.getenv('FRAGMENT_CACHE_TTL', 300))  # seconds, rendered company cards, 0 disables
+    FRAGMENT_CACHE_REDIS = os.getenv('FRAGMENT_CACHE_REDIS', 'false').lower() == 'true'  # share rendered cards across processes
+    FRAGMENT_CACHE_REDIS_BACKOFF = float(os.getenv('FRAGMENT_CACHE_REDIS_BACKOFF', 30))  # seconds to skip Redis after an error
+    
+    # Live Events (Server-Sent Events)
+    SSE_HEARTBEAT_INTERVAL = float(os.getenv('SSE_HEARTBEAT_INTERVAL', 15))  # seconds
+    SSE_POLL_INTERVAL = float(os.getenv('SSE_POLL_INTERVAL', 2))  # seconds, used while Redis is unavailable
+    SSE_MAX_STREAM_SECONDS = int(os.getenv('SSE_MAX_STREAM_SECONDS', 300))  # browsers reconnect automatically
+    SSE_MAX_STREAMS = int(os.getenv('SSE_MAX_STREAMS', 4))  # open streams per web process, keep below GUNICORN_THREADS; 0 = unlimited
+    SSE_FALLBACK_RETRY = float(os.getenv('SSE_FALLBACK_RETRY', 10))  # seconds between snapshots for clients over SSE_MAX_STREAMS
+    EVENT_PUBLISH_BACKOFF = float(os.getenv('EVENT_PUBLISH_BACKOFF', 30))  # seconds to skip publishing after a Redis error
+    
+    # Templates
+    JINJA_BYTECODE_CACHE_DIR = os.getenv('JINJA_BYTECODE_CACHE_DIR') or None  # None uses the system temp directory
+    
+    # Response Compression
+    COMPRESS_RESPONSES = os.getenv('COMPRESS_RESPONSES', 'true').lower() == 'true'  # gzip/brotli for HTML, JSON and CSS
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 500))  # bytes, smaller bodies are sent as is
+    
+    # Metrics (Prometheus; set PROMETHEUS_MULTIPROC_DIR to aggregate gunicorn workers)
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'  # /metrics, request and DB timings
+    WORKER_METRICS_PORT = int(os.getenv('WORKER_METRICS_PORT', 0))  # worker exporter port, 0 disables
+    
+    # Profiling (folded stacks and tracemalloc snapshots; off unless a token or sample rate is set)
+    PROFILE_TOKEN = os.getenv('PROFILE_TOKEN', '')  # X-Profile-Token value that profiles a request
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0))  # fraction of requests profiled
+    PROFILE_JOB_SAMPLE_RATE = float(os.getenv('PROFILE_JOB_SAMPLE_RATE', 0))  # fraction of lead jobs profiled
+    PROFILE_MEMORY = os.getenv('PROFILE_MEMORY', 'false').lower() == 'true'  # tracemalloc for sampled requests/jobs
+    PROFILE_DIR = os.getenv('PROFILE_DIR') or None  # None uses <system temp>/lead-manager-profiles
+    PROFILE_INTERVAL = float(os.getenv('PROFILE_INTERVAL', 0.005))  # seconds between stack samples
+    PROFILE_MAX_SECONDS = float(os.getenv('PROFILE_MAX_SECONDS', 60))  # stop sampling long requests after this
+    PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', 200))  # oldest profile files are deleted beyond this
+    
     # Application Settings
     MAX_CSV_SIZE_MB = int(os.getenv('MAX_CSV_SIZE_MB', 10))
     MAX_CONTENT_LENGTH = MAX_CSV_SIZE_MB * 1024 * 1024  # Convert to bytes
+    STATUS_LOOKUP_MAX_IDS = int(os.getenv('STATUS_LOOKUP_MAX_IDS', 1000))  # job + lead IDs per status request
+    COMPANY_SEARCH_CACHE_TTL = float(os.getenv('COMPANY_SEARCH_CACHE_TTL', 60))  # seconds, company typeahead index
+    LATENCY_REPORT_MAX_ROWS = int(os.getenv('LATENCY_REPORT_MAX_ROWS', 100000))  # newest logs used for percentiles
+    
+    # Retention
+    RETENTION_DEFAULT_DAYS = int(os.getenv('RETENTION_DEFAULT_DAYS', 0))  # archive leads older than this, 0 keeps forever
+    RETENTION_BATCH_SIZE = int(os.getenv('RETENTION_BATCH_SIZE', 1000))  # leads moved per transaction
     
     # Queue Settings
     RQ_QUEUE_NAME = 'lead_processing'
+    QUEUE_BACKEND = os.getenv('QUEUE_BACKEND', 'rq')  # rq, database, thread
+    QUEUE_FALLBACK_BACKEND = os.getenv('QUEUE_FALLBACK_BACKEND', 'database')  # empty to disable failover
+    DB_QUEUE_BATCH_SIZE = int(os.getenv('DB_QUEUE_BATCH_SIZE', 10))
+    DB_QUEUE_POLL_INTERVAL = float(os.getenv('DB_QUEUE_POLL_INTERVAL', 1.0))  # seconds
+    THREAD_POOL_WORKERS = int(os.getenv('THREAD_POOL_WORKERS', WORKER_COUNT))
+    THREAD_POOL_MAX_BACKLOG = int(os.getenv('THREAD_POOL_MAX_BACKLOG', 1000))
     JOB_TIMEOUT = 300  # 5 minutes
+    
+    # Admission control (0 disables a high-water mark)
+    QUEUE_HIGH_WATER = int(os.getenv('QUEUE_HIGH_WATER', 10000))  # queued jobs before uploads are refused (503)
+    QUEUE_COMPANY_HIGH_WATER = int(os.getenv('QUEUE_COMPANY_HIGH_WATER', 2000))  # pending leads per company (429)
+    QUEUE_LOW_WATER = int(os.getenv('QUEUE_LOW_WATER', 5000))  # deferred jobs are released below this depth
+    QUEUE_DRAIN_RATE = float(os.getenv('QUEUE_DRAIN_RATE', 10))  # jobs per second, used for Retry-After
+    QUEUE_DEPTH_CACHE_TTL = float(os.getenv('QUEUE_DEPTH_CACHE_TTL', 2))  # seconds
+    ADMISSION_MAX_RETRY_AFTER = int(os.getenv('ADMISSION_MAX_RETRY_AFTER', 600))  # seconds
+    DEFERRED_RELEASE_INTERVAL = float(os.getenv('DEFERRED_RELEASE_INTERVAL', 15))  # seconds between worker releases
     JOB_RESULT_TTL = 86400  # 24 hours
     
     # Retry Settings
@@ -49,6 +127,8 @@ class DevelopmentConfig(Config):
     """Development configuration."""
     DEBUG = True
     TESTING = False
+    AUTO_CREATE_TABLES = os.getenv('AUTO_CREATE_TABLES', 'true').lower() == 'true'
+    API_KEYS_ALLOW_UNREGISTERED = os.getenv('API_KEYS_ALLOW_UNREGISTERED', 'true').lower() == 'true'
 
 
 class ProductionConfig(Config):
@@ -61,6 +141,9 @@ class TestingConfig(Config):
     """Testing configuration."""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_BINDS = {}
+    AUTO_CREATE_TABLES = True
+    API_KEYS_ALLOW_UNREGISTERED = True
     REDIS_URL = 'redis://localhost:6379/1'  # Use different Redis DB for testing
 
 
@@ -0,0 +1,65 @@
+"""Gunicorn settings for the web process (read automatically from the working directory).
+
+Usage:
+    gunicorn run:app
+    
+Set PROMETHEUS_MULTIPROC_DIR so /metrics aggregates every worker.
+
+Workers are threaded: each open progress page holds a thread for up to
+SSE_MAX_STREAM_SECONDS, so a sync worker would block every other request
+and be killed at the worker timeout. At most WEB_CONCURRENCY *
+GUNICORN_THREADS requests (streams included) are served at once; keep
+SSE_MAX_STREAMS below GUNICORN_THREADS so open streams always leave
+threads for other requests (pages over the cap poll instead).
+"""
+import glob
+import os
+
+
+# Load the app once in the master; workers are forked with it already imported
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+# Threaded workers; the timeout only applies to a stuck worker process, not to long requests
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+threads = int(os.getenv('GUNICORN_THREADS', 8))  # stays within the default database pool (5 + 10 overflow)
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+
+
+def on_starting(server):
+    """Start each server with an empty Prometheus multiprocess directory."""
+    multiproc_dir = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+    if not multiproc_dir:
+        return
+    
+    os.makedirs(multiproc_dir, exist_ok=True)
+    for path in glob.glob(os.path.join(multiproc_dir, '*.db')):
+        os.remove(path)
+
+
+def when_ready(server):
+    """Compile all templates in the master so every forked worker shares them."""
+    if not preload_app:
+        return
+    
+    from app.app import warm_templates
+    warm_templates(server.app.wsgi())
+
+
+def post_fork(server, worker):
+    """Drop database connections inherited from the master; each worker opens its own."""
+    if not preload_app:
+        return
+    
+    from app.extensions import db
+    app = server.app.wsgi()
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    """Drop a dead worker's live gauges from the aggregated metrics."""
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
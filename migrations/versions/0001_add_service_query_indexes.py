@@ -0,0 +1,46 @@
+"""Add indexes used by service queries
+
+Databases created before these indexes were declared on the models
+lack them: lead_processing_logs had no lead_id index (looked up by every
+job) and no (company_id, created_at) index for date-filtered and
+paginated dashboard queries. Indexes that already exist (for example on
+databases created by db.create_all) are skipped.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('idx_logs_lead', 'lead_processing_logs', ['lead_id']),
+    ('idx_logs_company_created', 'lead_processing_logs', ['company_id', 'created_at', 'id']),
+    ('idx_logs_company_status_created', 'lead_processing_logs', ['company_id', 'status', 'created_at', 'id']),
+    ('idx_leads_company_created', 'leads', ['company_id', 'created_at', 'id']),
+]
+
+
+def existing_indexes(table):
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        if name not in existing_indexes(table):
+            op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, columns in reversed(INDEXES):
+        if name in existing_indexes(table):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,69 @@
+"""Add retention policy and archive tables
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def has_table(table):
+    return sa.inspect(op.get_bind()).has_table(table)
+
+
+def upgrade():
+    if not has_table('retention_policies'):
+        op.create_table(
+            'retention_policies',
+            sa.Column('company_id', sa.Integer(), sa.ForeignKey('company_profiles.id'), primary_key=True),
+            sa.Column('retention_days', sa.Integer(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=False)
+        )
+
+    if not has_table('archived_leads'):
+        op.create_table(
+            'archived_leads',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('company_id', sa.Integer(), sa.ForeignKey('company_profiles.id'), nullable=False),
+            sa.Column('name', sa.String(100), nullable=False),
+            sa.Column('phone', sa.String(20), nullable=False),
+            sa.Column('notes', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('archived_at', sa.DateTime(), nullable=False)
+        )
+        op.create_index('idx_archived_leads_company_created', 'archived_leads', ['company_id', 'created_at', 'id'])
+
+    if not has_table('archived_lead_processing_logs'):
+        op.create_table(
+            'archived_lead_processing_logs',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('lead_id', sa.Integer(), nullable=False),
+            sa.Column('company_id', sa.Integer(), sa.ForeignKey('company_profiles.id'), nullable=False),
+            sa.Column('status', sa.String(20), nullable=False),
+            sa.Column('worker_id', sa.String(50), nullable=True),
+            sa.Column('ghl_contact_id', sa.String(100), nullable=True),
+            sa.Column('error_message', sa.Text(), nullable=True),
+            sa.Column('attempt_count', sa.Integer(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=False),
+            sa.Column('archived_at', sa.DateTime(), nullable=False)
+        )
+        op.create_index('idx_archived_logs_company_created', 'archived_lead_processing_logs',
+                        ['company_id', 'created_at', 'id'])
+        op.create_index('idx_archived_logs_company_status', 'archived_lead_processing_logs', ['company_id', 'status'])
+        op.create_index('idx_archived_logs_lead', 'archived_lead_processing_logs', ['lead_id'])
+
+
+def downgrade():
+    op.drop_table('archived_lead_processing_logs')
+    op.drop_table('archived_leads')
+    op.drop_table('retention_policies')
@@ -0,0 +1,37 @@
+"""Add hashed per-company API keys
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table('api_keys'):
+        op.create_table(
+            'api_keys',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('company_id', sa.Integer(), sa.ForeignKey('company_profiles.id'), nullable=False),
+            sa.Column('name', sa.String(100), nullable=True),
+            sa.Column('prefix', sa.String(16), nullable=False, unique=True),
+            sa.Column('key_hash', sa.String(64), nullable=False),
+            sa.Column('requests_per_window', sa.Integer(), nullable=True),
+            sa.Column('rows_per_window', sa.Integer(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('revoked_at', sa.DateTime(), nullable=True)
+        )
+        op.create_index('ix_api_keys_company_id', 'api_keys', ['company_id'])
+
+
+def downgrade():
+    op.drop_table('api_keys')
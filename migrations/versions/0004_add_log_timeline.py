@@ -0,0 +1,39 @@
+"""Add processing timeline offsets to lead processing logs
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = ['enqueued_ms', 'dequeued_ms', 'first_attempt_ms', 'ghl_response_ms', 'completed_ms']
+
+
+def existing_columns():
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns('lead_processing_logs')}
+
+
+def upgrade():
+    existing = existing_columns()
+    with op.batch_alter_table('lead_processing_logs') as batch_op:
+        for name in COLUMNS:
+            if name not in existing:
+                batch_op.add_column(sa.Column(name, sa.Integer(), nullable=True))
+
+
+def downgrade():
+    existing = existing_columns()
+    with op.batch_alter_table('lead_processing_logs') as batch_op:
+        for name in reversed(COLUMNS):
+            if name in existing:
+                batch_op.drop_column(name)
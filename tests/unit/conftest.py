@@ -0,0 +1,122 @@
+"""Fixtures for unit tests."""
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import event
+from app.app import create_app
+from app.extensions import db
+from app.models import CompanyProfile, Lead, LeadProcessingLog
+from app import rate_limit
+from app.services.api_key_service import ApiKeyService
+from app.services.counter_service import CounterService
+from app.services.rollup_service import RollupService
+from app.services import admission_service, api_key_service, company_service, dashboard_service, fragment_service
+
+
+STATUSES = ['pending', 'processing', 'success', 'failed']
+
+
+@pytest.fixture
+def app():
+    """Application with an empty in-memory database."""
+    app = create_app('testing')
+    
+    with app.app_context():
+        dashboard_service._dashboard_cache.clear()
+        dashboard_service._global_counts_cache.clear()
+        company_service._search_index.clear()
+        fragment_service._card_cache.clear()
+        api_key_service._key_cache.clear()
+        admission_service._depth_cache.clear()
+        rate_limit._local_counts.clear()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def seeded_app(app):
+    """Application with a few companies, leads and logs in every status."""
+    start = datetime(2026, 1, 1)
+    
+    for company_number in range(3):
+        company = CompanyProfile(
+            company_name=f'Company {company_number}',
+            owner_name='Owner',
+            owner_phone='5551234567',
+            owner_email=f'owner{company_number}@example.com',
+            ghl_location_id=f'location-{company_number}'
+        )
+        db.session.add(company)
+        db.session.flush()
+        
+        for lead_number in range(40):
+            created_at = start + timedelta(hours=lead_number)
+            lead = Lead(
+                company_id=company.id,
+                name=f'Lead {lead_number}',
+                phone='5551234567',
+                created_at=created_at
+            )
+            db.session.add(lead)
+            db.session.flush()
+            
+            status = STATUSES[lead_number % len(STATUSES)]
+            db.session.add(LeadProcessingLog(
+                lead_id=lead.id,
+                company_id=company.id,
+                status=status,
+                attempt_count=1 if status in ('success', 'failed') else 0,
+                error_message='GHL error' if status == 'failed' else None,
+                created_at=created_at,
+                updated_at=created_at + timedelta(minutes=5)
+            ))
+    
+    db.session.commit()
+    
+    CounterService.reconcile()
+    for company in db.session.query(CompanyProfile).all():
+        RollupService.rebuild(company.id)
+    
+    return app
+
+
+@pytest.fixture
+def company_key(app):
+    """
+    A company with one API key; unregistered keys are refused.
+    
+    Returns:
+        Tuple of (company ID, API key)
+    """
+    app.config['API_KEYS_ALLOW_UNREGISTERED'] = False
+    
+    company = CompanyProfile(
+        company_name='Acme Roofing',
+        owner_name='Owner',
+        owner_phone='5551234567',
+        owner_email='owner@acme.example.com',
+        ghl_location_id='location-acme'
+    )
+    db.session.add(company)
+    db.session.commit()
+    
+    _, key, _ = ApiKeyService.create_key(company.id, 'Default')
+    return company.id, key
+
+
+@pytest.fixture
+def captured_queries(app):
+    """
+    List that collects (statement, parameters) for every SELECT executed.
+    
+    Cleared by the test before the calls it wants to inspect.
+    """
+    queries = []
+    
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            queries.append((statement, parameters))
+    
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    yield queries
+    event.remove(db.engine, 'before_cursor_execute', capture)
@@ -0,0 +1,98 @@
+"""Tests for hashed per-company API keys."""
+import pytest
+from app.services.api_key_service import ApiKeyService
+
+
+def test_verify_returns_key_principal(app, company_key):
+    company_id, api_key = company_key
+    
+    principal = ApiKeyService.verify(api_key)
+    
+    assert principal['company_id'] == company_id
+    assert principal['identity'] == f"key:{principal['key_id']}"
+
+
+def test_keys_are_stored_hashed(app, company_key):
+    company_id, api_key = company_key
+    stored = ApiKeyService.list_keys(company_id)[0]
+    
+    assert stored.key_hash == ApiKeyService.hash_key(api_key)
+    assert api_key not in stored.key_hash
+    assert 'api_key' not in stored.to_dict() and 'key_hash' not in stored.to_dict()
+
+
+def test_right_prefix_with_wrong_secret_is_rejected(app, company_key):
+    _, api_key = company_key
+    prefix = '_'.join(api_key.split('_', 2)[:2])
+    
+    assert ApiKeyService.verify(f'{prefix}_not-the-secret') is None
+    # The cached miss does not affect the real key
+    assert ApiKeyService.verify(api_key) is not None
+
+
+@pytest.mark.parametrize('api_key', ['', 'rlm', 'rlm_', 'rlm__', 'nope_0123456789ab_secret', 'just-some-string'])
+def test_malformed_keys_are_rejected(app, company_key, api_key):
+    assert ApiKeyService.verify(api_key) is None
+
+
+def test_revoked_key_is_rejected_even_if_cached(app, company_key):
+    company_id, api_key = company_key
+    key_id = ApiKeyService.verify(api_key)['key_id']
+    
+    assert ApiKeyService.revoke_key(company_id, key_id).revoked_at is not None
+    assert ApiKeyService.verify(api_key) is None
+
+
+def test_revoke_needs_the_owning_company(app, company_key):
+    company_id, api_key = company_key
+    key_id = ApiKeyService.verify(api_key)['key_id']
+    
+    assert ApiKeyService.revoke_key(company_id + 1, key_id) is None
+    assert ApiKeyService.verify(api_key) is not None
+
+
+def test_api_rejects_wrong_secret_and_revoked_keys(app, company_key):
+    company_id, api_key = company_key
+    client = app.test_client()
+    url = f'/company/{company_id}/api-keys'
+    prefix = '_'.join(api_key.split('_', 2)[:2])
+    
+    assert client.get(url, headers={'X-API-Key': f'{prefix}_not-the-secret'}).status_code == 401
+    
+    second = client.post(url, json={'name': 'CRM sync'}, headers={'X-API-Key': api_key}).get_json()
+    assert client.delete(f"{url}/{second['id']}", headers={'X-API-Key': api_key}).status_code == 200
+    
+    assert client.get(url, headers={'X-API-Key': second['api_key']}).status_code == 401
+    assert client.get(url, headers={'X-API-Key': api_key}).status_code == 200
+
+
+def test_key_cannot_manage_another_company(app, company_key):
+    company_id, api_key = company_key
+    client = app.test_client()
+    
+    response = client.get(f'/company/{company_id + 1}/api-keys', headers={'X-API-Key': api_key})
+    
+    assert response.status_code == 403
+
+
+def test_retention_needs_the_company_key(app, company_key):
+    company_id, api_key = company_key
+    client = app.test_client()
+    url = f'/company/{company_id}/retention'
+    
+    assert client.put(url, json={'retention_days': 30}).status_code == 401
+    assert client.get(f'/company/{company_id + 1}/retention', headers={'X-API-Key': api_key}).status_code == 403
+    
+    response = client.put(url, json={'retention_days': 30}, headers={'X-API-Key': api_key})
+    assert response.status_code == 200
+    assert client.get(url, headers={'X-API-Key': api_key}).get_json()['retention_days'] == 30
+
+
+def test_export_needs_the_company_key(app, company_key):
+    company_id, api_key = company_key
+    client = app.test_client()
+    url = f'/dashboard/api/{company_id}/export/leads'
+    
+    assert client.get(url).status_code == 401
+    assert client.get(f'/dashboard/api/{company_id + 1}/export/leads', headers={'X-API-Key': api_key}).status_code == 403
+    assert client.get(url, headers={'X-API-Key': api_key}).status_code == 200
@@ -0,0 +1,63 @@
+"""Tests for live status event streams."""
+import pytest
+from app.models import Lead
+from app.services.event_service import EventBroker, EventService
+from app.services.logging_service import LoggingService
+
+
+@pytest.fixture
+def broker(seeded_app, monkeypatch):
+    """Connected event broker without a Redis subscription; published events are collected instead."""
+    published = []
+    monkeypatch.setattr(EventService, 'publish_transition', staticmethod(lambda *args: published.append(args)))
+    monkeypatch.setattr(EventBroker, '_loop', lambda self: None)
+    seeded_app.config['SSE_HEARTBEAT_INTERVAL'] = 0.05
+    seeded_app.config['SSE_MAX_STREAM_SECONDS'] = 0.5
+    
+    with seeded_app.test_request_context():
+        broker = EventService.get_broker()
+        broker.connected = True
+        broker.published = published
+        yield broker
+
+
+def delta(published):
+    """Broker event for the last published transition."""
+    _, lead_id, old_status, new_status, version = published[-1]
+    return {'lead_id': lead_id, 'from': old_status, 'to': new_status, 'version': version}
+
+
+def test_stream_drops_deltas_already_in_the_snapshot(broker):
+    stream = EventService.stream(1)
+    next(stream)
+    listener = next(iter(broker._listeners[1]))
+    
+    # Committed after the stream subscribed but before it read the snapshot
+    lead = Lead.query.filter_by(company_id=1).first()
+    log = LoggingService.create_log(lead.id, 1)
+    listener.put(delta(broker.published))
+    
+    assert '"pending": 11' in next(stream)
+    
+    LoggingService.update_log_status(log.id, 'success')
+    listener.put(delta(broker.published))
+    
+    messages = [message for message in stream if not message.startswith(':')]
+    assert len(messages) == 1
+    assert messages[0].startswith('event: delta') and '"to": "success"' in messages[0]
+
+
+def test_streams_over_the_cap_fall_back_to_polling(broker, seeded_app):
+    seeded_app.config['SSE_MAX_STREAMS'] = 1
+    seeded_app.config['SSE_FALLBACK_RETRY'] = 10
+    open_stream = EventService.stream(1)
+    next(open_stream)
+    
+    assert list(EventService.stream(1))[0] == 'retry: 10000\n\n'
+    assert len(broker._listeners[1]) == 1
+    
+    # Closing the open stream frees its slot
+    open_stream.close()
+    next_stream = EventService.stream(1)
+    assert next(next_stream) == 'retry: 3000\n\n'
+    next_stream.close()
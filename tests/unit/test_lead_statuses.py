@@ -0,0 +1,87 @@
+"""Tests for batch job and lead status lookups."""
+from datetime import datetime
+import pytest
+from app.extensions import db
+from app.jobs.process_lead import process_lead_job
+from app.models import Lead
+from app.queue import get_queue_backend
+from app.services.api_key_service import ApiKeyService
+from app.services.lead_service import LeadService
+from app.services.retention_service import RetentionService
+
+
+@pytest.fixture
+def jobs(seeded_app):
+    """
+    Database queue jobs for one success lead of company 1 and one of company 2.
+    
+    Returns:
+        Tuple of (company 1 job ID, company 1 lead ID, company 2 job ID, company 2 lead ID)
+    """
+    backend = get_queue_backend('database')
+    own_lead, other_lead = (
+        db.session.query(Lead.id).filter_by(company_id=company_id).order_by(Lead.id).offset(2).limit(1).scalar()
+        for company_id in (1, 2)
+    )
+    return (backend.enqueue(process_lead_job, own_lead), own_lead,
+            backend.enqueue(process_lead_job, other_lead), other_lead)
+
+
+def test_unscoped_lookup_sees_every_company(jobs):
+    own_job, own_lead, other_job, other_lead = jobs
+    
+    statuses = LeadService.get_statuses([own_job, other_job], [])
+    
+    assert statuses['jobs'] == {own_job: {'state': 'queued', 'lead_id': own_lead},
+                                other_job: {'state': 'queued', 'lead_id': other_lead}}
+    assert statuses['leads'][own_lead]['status'] == 'success'
+    assert statuses['leads'][other_lead]['status'] == 'success'
+
+
+def test_company_lookup_hides_other_companies_jobs_and_leads(jobs):
+    own_job, own_lead, other_job, other_lead = jobs
+    
+    statuses = LeadService.get_statuses([own_job, other_job, 'db-999999'], [own_lead, other_lead], company_id=1)
+    
+    assert statuses['jobs'] == {
+        own_job: {'state': 'queued', 'lead_id': own_lead},
+        other_job: {'state': 'not_found', 'lead_id': None},
+        'db-999999': {'state': 'not_found', 'lead_id': None},
+    }
+    assert statuses['leads'][own_lead]['status'] == 'success'
+    assert statuses['leads'][other_lead] == {'status': 'not_found'}
+
+
+def test_company_lookup_does_not_leak_leads_through_jobs(jobs):
+    _, _, other_job, other_lead = jobs
+    
+    statuses = LeadService.get_statuses([other_job], [], company_id=1)
+    
+    assert statuses['jobs'][other_job]['lead_id'] is None
+    assert other_lead not in statuses['leads']
+
+
+def test_company_lookup_hides_other_companies_archived_leads(jobs):
+    _, _, _, other_lead = jobs
+    RetentionService.set_policy(2, {'retention_days': 1})
+    RetentionService.archive_company(2, now=datetime(2026, 1, 3))
+    
+    assert LeadService.get_statuses([], [other_lead], company_id=2)['leads'][other_lead]['status'] == 'success'
+    assert LeadService.get_statuses([], [other_lead], company_id=1)['leads'][other_lead] == {'status': 'not_found'}
+
+
+def test_status_api_is_scoped_to_the_key_company(seeded_app, jobs):
+    own_job, own_lead, other_job, other_lead = jobs
+    seeded_app.config['API_KEYS_ALLOW_UNREGISTERED'] = False
+    _, api_key, _ = ApiKeyService.create_key(1)
+    
+    response = seeded_app.test_client().post('/api/leads/status', headers={'X-API-Key': api_key}, json={
+        'job_ids': [own_job, other_job],
+        'lead_ids': [own_lead, other_lead]
+    })
+    
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body['jobs'][other_job] == {'state': 'not_found', 'lead_id': None}
+    assert body['leads'][str(other_lead)] == {'status': 'not_found'}
+    assert body['leads'][str(own_lead)]['status'] == 'success'
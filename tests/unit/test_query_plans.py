@@ -0,0 +1,123 @@
+"""
+Query plan regression tests.
+
+Each case calls a service method against a seeded SQLite database,
+captures every SELECT it runs and checks EXPLAIN QUERY PLAN for full
+table or index scans. A scan is only accepted on tables listed in the
+case's allowlist.
+"""
+from datetime import datetime
+import pytest
+from app.extensions import db
+from app.queue import release_deferred
+from app.services.api_key_service import ApiKeyService
+from app.services.company_service import CompanyService
+from app.services.counter_service import CounterService
+from app.services.dashboard_service import DashboardService
+from app.services.export_service import ExportService
+from app.services.latency_service import LatencyService
+from app.services.lead_service import LeadService
+from app.services.logging_service import LoggingService
+from app.services.retention_service import RetentionService
+from app.services.rollup_service import RollupService
+from app.services.version_service import VersionService
+
+
+DATE_FILTERS = {'start_date': datetime(2026, 1, 1, 5), 'end_date': datetime(2026, 1, 2, 10)}
+
+
+def second_page(get_page, company_id, filters=None):
+    """Fetch the first page, then the page after its cursor."""
+    _, cursor = get_page(company_id, filters, None, 5)
+    get_page(company_id, filters, cursor, 5)
+
+
+def archive(company_id):
+    """Archive a company's seeded leads older than one day."""
+    RetentionService.set_policy(company_id, {'retention_days': 1})
+    RetentionService.archive_company(company_id, now=datetime(2026, 1, 3))
+
+
+def archived_leads_page(company_id, filters, cursor, limit):
+    """Adapt get_archived_leads_page to the second_page signature."""
+    return RetentionService.get_archived_leads_page(company_id, cursor, limit)
+
+
+CASES = [
+    ('company_by_id', lambda: CompanyService.get_company(1), set()),
+    ('company_by_email', lambda: CompanyService.get_company_by_email('owner1@example.com'), set()),
+    ('api_key_lookup', lambda: ApiKeyService.verify('rlm_0123456789ab_secret'), set()),
+    ('api_keys_by_company', lambda: ApiKeyService.list_keys(1), set()),
+    ('log_by_lead', lambda: LoggingService.get_log_by_lead(7), set()),
+    ('logs_by_company', lambda: LoggingService.get_logs_by_company(1, DATE_FILTERS), set()),
+    ('logs_page', lambda: second_page(LoggingService.get_logs_page, 1), set()),
+    ('logs_page_status', lambda: second_page(LoggingService.get_logs_page, 1, {'status': 'failed'}), set()),
+    ('logs_page_dates', lambda: second_page(LoggingService.get_logs_page, 1, dict(DATE_FILTERS)), set()),
+    ('leads_page', lambda: second_page(LeadService.get_leads_page, 1), set()),
+    ('lead_statuses', lambda: LeadService.get_statuses(['db-1', 'db-2'], [1, 2, 3]), set()),
+    ('lead_statuses_company', lambda: LeadService.get_statuses(['db-1'], [1, 2, 3], company_id=1), set()),
+    ('leads_page_status', lambda: second_page(LeadService.get_leads_page, 1, {'status': 'success'}), set()),
+    ('failed_leads', lambda: DashboardService.get_failed_leads(1), set()),
+    ('failed_leads_page', lambda: second_page(DashboardService.get_failed_leads_page, 1), set()),
+    ('company_stats', lambda: DashboardService.get_company_stats(1), set()),
+    ('company_stats_dates', lambda: DashboardService.get_company_stats(1, DATE_FILTERS), set()),
+    ('dashboard', lambda: DashboardService.get_dashboard(1), set()),
+    ('status_counts', lambda: CounterService.get_counts_for_companies([1, 2]), set()),
+    ('reconcile_company', lambda: CounterService.reconcile(1), set()),
+    ('release_deferred', lambda: release_deferred(10), set()),
+    ('data_version', lambda: VersionService.get(1), set()),
+    ('data_versions', lambda: VersionService.get_many([1, 2]), set()),
+    ('latency', lambda: LatencyService.get_percentiles(1, datetime(2026, 1, 1), datetime(2026, 1, 3)), set()),
+    ('latency_status', lambda: LatencyService.get_percentiles(1, datetime(2026, 1, 1), datetime(2026, 1, 3), 'failed'),
+     set()),
+    ('timeseries', lambda: RollupService.get_range(1, 'hour', datetime(2026, 1, 1), datetime(2026, 1, 3)), set()),
+    ('rebuild_rollups', lambda: RollupService.rebuild(1), set()),
+    ('export_logs', lambda: list(ExportService.iter_rows('logs', 1)), set()),
+    ('export_leads', lambda: list(ExportService.iter_rows('leads', 1)), set()),
+    ('archive_company', lambda: archive(1), set()),
+    ('archived_leads_page', lambda: (archive(1), second_page(archived_leads_page, 1)), set()),
+    # Listing every company, building the search index and exact counts scan by design
+    ('company_search', lambda: CompanyService.search_companies('comp'), {'company_profiles'}),
+    ('company_summaries', lambda: DashboardService.get_company_summaries(sort='lead_count'), {'company_profiles'}),
+    ('global_counts', lambda: DashboardService.get_global_counts(), {'company_profiles', 'leads'}),
+]
+
+
+def full_scans(statement, parameters):
+    """
+    Get the tables a statement reads with a full table or index scan.
+    
+    Args:
+        statement: SQL statement
+        parameters: Statement parameters
+        
+    Returns:
+        Set of table names that are scanned
+    """
+    plan = db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+    
+    scanned = set()
+    for row in plan:
+        words = row[-1].split()
+        # e.g. "SCAN leads" or "SCAN leads USING COVERING INDEX ..."; subqueries are not tables
+        if words[0] == 'SCAN' and words[1] in db.metadata.tables:
+            scanned.add(words[1])
+    
+    return scanned
+
+
+@pytest.mark.parametrize('name, call, allowed', CASES, ids=[case[0] for case in CASES])
+def test_service_queries_avoid_full_scans(seeded_app, captured_queries, name, call, allowed):
+    captured_queries.clear()
+    call()
+    
+    assert captured_queries, f'{name} ran no queries'
+    
+    for statement, parameters in captured_queries:
+        unexpected = full_scans(statement, parameters) - allowed
+        assert not unexpected, f'{name} scans {sorted(unexpected)}:\n{statement}'
+
+
+def test_full_scan_is_detected(seeded_app):
+    statement = 'SELECT id FROM lead_processing_logs WHERE error_message = ?'
+    assert full_scans(statement, ('GHL error',)) == {'lead_processing_logs'}
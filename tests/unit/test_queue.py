@@ -0,0 +1,40 @@
+"""Tests for queue backend job lookups."""
+import redis
+from rq.job import Job, JobStatus
+from app.jobs.process_lead import process_lead_job
+from app.queue import RQBackend
+
+
+def stored_hash(job_id, status):
+    """
+    Build a job hash as HGETALL returns it from Redis.
+    
+    Args:
+        job_id: Job ID
+        status: Stored job status
+        
+    Returns:
+        Dictionary of bytes keys to bytes values
+    """
+    connection = redis.Redis()
+    job = Job.create(process_lead_job, args=(7, 1700000000.0), id=job_id, connection=connection)
+    job.set_status(status, pipeline=connection.pipeline())  # buffered, never sent
+    encoder = connection.get_encoder()
+    return {encoder.encode(key): encoder.encode(value) for key, value in job.to_dict().items()}
+
+
+def test_rq_fetch_many_reports_restored_status(app, monkeypatch):
+    hashes = {'job-queued': stored_hash('job-queued', JobStatus.QUEUED),
+              'job-failed': stored_hash('job-failed', JobStatus.FAILED)}
+    job_ids = ['job-queued', 'job-missing', 'job-failed']
+    
+    # Answer the pipelined HGETALLs without a Redis server
+    monkeypatch.setattr(redis.client.Pipeline, 'execute',
+                        lambda self, raise_on_error=True: [hashes.get(job_id, {}) for job_id in job_ids])
+    
+    jobs = RQBackend().fetch_many(job_ids)
+    
+    assert jobs == {
+        'job-queued': {'status': 'queued', 'args': [7, 1700000000.0]},
+        'job-failed': {'status': 'failed', 'args': [7, 1700000000.0]},
+    }
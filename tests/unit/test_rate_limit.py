@@ -0,0 +1,145 @@
+"""Tests for sliding-window API rate limits."""
+import pytest
+import redis
+from app import rate_limit
+from app.extensions import db
+from app.rate_limit import check_rate_limit, retry_after
+from app.services.api_key_service import ApiKeyService
+
+
+WINDOW = 60
+WINDOW_START = 600.0  # start of window 10
+
+
+class FakeClock:
+    """Stands in for the time module inside rate_limit."""
+    
+    def __init__(self, now):
+        self.now = now
+        self.monotonic_now = 1000.0
+    
+    def time(self):
+        return self.now
+    
+    def monotonic(self):
+        return self.monotonic_now
+
+
+@pytest.fixture
+def clock(app, monkeypatch):
+    """Fake clock at the start of a window, with Redis unavailable."""
+    redis_calls = []
+    
+    def redis_down(*args):
+        redis_calls.append(args)
+        raise redis.ConnectionError('Connection refused')
+    
+    clock = FakeClock(WINDOW_START)
+    clock.redis_calls = redis_calls
+    monkeypatch.setattr(rate_limit, 'time', clock)
+    monkeypatch.setattr(rate_limit, '_check_redis', redis_down)
+    monkeypatch.setattr(rate_limit, '_redis_paused_until', 0.0)
+    app.config['RATE_LIMIT_WINDOW'] = WINDOW
+    return clock
+
+
+def charge(requests=1, rows=0, limit_requests=3, limit_rows=0, identity='key:1'):
+    """Charge one request against small quotas."""
+    return check_rate_limit(identity, {'requests': limit_requests, 'rows': limit_rows},
+                            {'requests': requests, 'rows': rows})
+
+
+@pytest.mark.parametrize('previous, current, elapsed, limit, cost, expected', [
+    # Previous window still counts 50%; fits once its weight drops to 0.395
+    (200, 20, 30, 100, 1, 7),
+    # Nothing carried over: wait for the rollover, then for 1% of the window
+    (0, 100, 15, 100, 1, 46),
+    # Full previous window at the very start of a window: fits a fraction of a second later
+    (100, 0, 0, 100, 1, 1),
+    # No room left after the cost: the whole current window has to slide out
+    (0, 3, 10, 5, 5, 110),
+    # Larger than the whole quota
+    (0, 0, 10, 100, 101, 60),
+])
+def test_retry_after(previous, current, elapsed, limit, cost, expected):
+    weight = 1 - elapsed / WINDOW
+    assert retry_after(previous, current, weight, elapsed, WINDOW, limit, cost) == expected
+
+
+def test_limit_allows_up_to_quota_then_rejects(clock):
+    assert [charge() for _ in range(3)] == [None, None, None]
+    assert charge() == ('requests', 80)
+    
+    # A rejected request is not charged
+    assert charge(identity='key:2') is None
+    assert charge() == ('requests', 80)
+
+
+def test_rejected_request_fits_exactly_after_retry_after(clock):
+    for _ in range(3):
+        charge()
+    _, wait = charge()
+    
+    clock.now = WINDOW_START + wait - 1
+    assert charge() is not None
+    
+    clock.now = WINDOW_START + wait
+    assert charge() is None
+
+
+def test_previous_window_slides_out(clock):
+    for _ in range(3):
+        charge()
+    
+    # Half the previous window still counts: 1.5 + 1 fits in 3, a second request does not
+    clock.now = WINDOW_START + WINDOW * 1.5
+    assert charge() is None
+    assert charge() is not None
+    
+    # The previous window has fully slid out
+    clock.now = WINDOW_START + WINDOW * 2
+    assert charge() is None
+
+
+def test_all_quotas_checked_before_charging(clock):
+    # Row quota exceeded: the request quota is not charged either
+    assert charge(rows=11, limit_rows=10) == ('rows', WINDOW)
+    assert charge(rows=10, limit_rows=10) is None
+    assert charge(rows=1, limit_rows=10)[0] == 'rows'
+    assert [charge(limit_rows=10) for _ in range(2)] == [None, None]
+    assert charge(limit_rows=10)[0] == 'requests'
+
+
+def test_zero_limit_is_unlimited(clock):
+    assert all(charge(limit_requests=0) is None for _ in range(100))
+
+
+def test_falls_back_to_per_process_counts_while_redis_is_down(app, clock):
+    app.config['RATE_LIMIT_REDIS_BACKOFF'] = 30
+    
+    assert charge() is None
+    assert len(clock.redis_calls) == 1
+    
+    # Redis is skipped during the backoff, the local counts still enforce the limit
+    assert charge() is None
+    assert charge() is None
+    assert charge()[0] == 'requests'
+    assert len(clock.redis_calls) == 1
+    
+    # Retried after the backoff
+    clock.monotonic_now += 31
+    charge(identity='key:2')
+    assert len(clock.redis_calls) == 2
+
+
+def test_rate_limited_request_gets_retry_after(app, clock, company_key):
+    company_id, api_key = company_key
+    ApiKeyService.list_keys(company_id)[0].requests_per_window = 2
+    db.session.commit()
+    
+    client = app.test_client()
+    responses = [client.get(f'/company/{company_id}/api-keys', headers={'X-API-Key': api_key}) for _ in range(3)]
+    
+    assert [response.status_code for response in responses] == [200, 200, 429]
+    assert responses[2].headers['Retry-After'] == '90'
+    assert responses[2].get_json()['quota'] == 'requests'
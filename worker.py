@@ -1,12 +1,38 @@
-"""RQ worker startup script."""
+"""Queue worker startup script.
+
+Usage:
+    python worker.py            # worker for the configured QUEUE_BACKEND
+    python worker.py rq         # RQ worker
+    python worker.py database   # database queue worker (also drains failed-over jobs)
+    
+With QUEUE_BACKEND=thread there is nothing to run: jobs run in the web process.
+    
+Set WORKER_METRICS_PORT to serve Prometheus metrics from the worker. RQ
+then runs jobs in the worker process itself (SimpleWorker) instead of a
+forked child per job, so job metrics are recorded where they are served.
+"""
 import os
 import sys
-import redis
-from rq import Worker, Queue, Connection
+from rq import SimpleWorker, Worker, Queue, Connection
 from app.app import create_app
+from app.metrics import metrics_registry
+from app.queue import DatabaseWorker, get_redis_connection
+from app.services.admission_service import AdmissionService
+
+# Create Flask app to get configuration (no routes or templates)
+app = create_app(role='worker')
+
+
+def start_metrics_exporter():
+    """Serve Prometheus metrics on WORKER_METRICS_PORT (if set)."""
+    port = app.config['WORKER_METRICS_PORT']
+    if not port or not app.config['METRICS_ENABLED']:
+        return
+    
+    from prometheus_client import start_http_server
+    start_http_server(port, registry=metrics_registry())
+    print(f"Serving metrics on port {port}")
 
-# Create Flask app to get configuration
-app = create_app()
 
 def start_worker():
     """Start RQ worker."""
@@ -14,8 +40,8 @@ def start_worker():
         redis_url = app.config['REDIS_URL']
         queue_name = app.config['RQ_QUEUE_NAME']
         
-        # Connect to Redis
-        redis_conn = redis.from_url(redis_url)
+        # Connect to Redis (shared connection pool)
+        redis_conn = get_redis_connection()
         
         # Create queue
         queue = Queue(queue_name, connection=redis_conn)
@@ -23,15 +49,38 @@ def start_worker():
         print(f"Starting worker for queue: {queue_name}")
         print(f"Redis URL: {redis_url}")
         
-        # Start worker
+        # Start worker; without forking when metrics are exported from this process
+        worker_class = SimpleWorker if app.config['WORKER_METRICS_PORT'] else Worker
         with Connection(redis_conn):
-            worker = Worker([queue])
+            worker = worker_class([queue])
             worker.work()
 
 
+def start_database_worker():
+    """Start database queue worker."""
+    worker = DatabaseWorker(app)
+    
+    print(f"Starting database worker for queue: {app.config['RQ_QUEUE_NAME']}")
+    print(f"Batch size: {worker.batch_size}, poll interval: {worker.poll_interval}s")
+    
+    worker.work()
+
+
 if __name__ == '__main__':
+    backend = sys.argv[1] if len(sys.argv) > 1 else app.config['QUEUE_BACKEND']
+    
+    if backend == 'thread':
+        # Jobs run (and deferred jobs are released) inside the web process
+        print("QUEUE_BACKEND=thread runs jobs in the web process; no worker is needed")
+        sys.exit(0)
+    
     try:
-        start_worker()
+        start_metrics_exporter()
+        AdmissionService.start_releaser(app)
+        if backend == 'database':
+            start_database_worker()
+        else:
+            start_worker()
     except KeyboardInterrupt:
         print("\nWorker stopped by user")
         sys.exit(0)